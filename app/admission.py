@@ -0,0 +1,248 @@
+"""
+Admission control: adaptive concurrency limits with bounded wait queues.
+
+Every HTTP request is put in a route class (see classify()):
+
+    auth   password hashing/verification (login, register, change password)
+    bulk   uploads and bulk operations (import, batch, bulk delete/update)
+    read   other GET/HEAD requests
+    write  everything else
+
+Each class has its own AdaptiveLimiter. Up to `limit` requests of a class
+run at once; further requests wait in a FIFO queue. A request is answered
+503 with a Retry-After header immediately if the queue is full or its
+expected wait already exceeds the queue timeout, and after the timeout if no
+slot frees up in time. Failing fast keeps latency bounded for the requests
+that are admitted, instead of letting every request slow down until clients
+time out and retry.
+
+The limit adapts with AIMD on observed service time (time to response
+start). Every request at or below the class's target latency while the limit
+is saturated grows it by 1/limit, about +1 per round of requests. A slower
+request multiplies it by ADMISSION_BACKOFF, at most once per target-latency
+window. Bulk requests take as long as their body or row count makes them,
+which says nothing about load, so their class has a fixed limit and their
+service time never shrinks the write limit. Health checks, metrics, static
+files and /admin are never queued.
+
+Per-class settings can be overridden with ADMISSION_<CLASS>_<FIELD>, e.g.
+ADMISSION_AUTH_MAX_LIMIT=8 or ADMISSION_READ_TARGET_MS=50.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+
+from starlette.responses import JSONResponse
+
+from app import metrics, server_timing
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() not in ("0", "false", "no")
+ADMISSION_BACKOFF = float(os.getenv("ADMISSION_BACKOFF", "0.9"))
+
+# POST endpoints that hash or verify a password
+AUTH_PATHS = {"/login", "/register", "/change-password", "/users/", "/users/register", "/users/login"}
+# POST endpoints whose service time grows with the request body or the rows touched
+BULK_PATHS = {
+    "/api/calculations/import",
+    "/api/calculations/bulk-delete",
+    "/api/calculations/bulk-update",
+    "/api/jobs/import",
+    "/api/batch",
+}
+EXEMPT_PATHS = {"/health", "/ready", "/metrics"}
+EXEMPT_PREFIXES = ("/static/", "/admin/")
+
+
+@dataclass(frozen=True)
+class Policy:
+    """Limits of one route class; limits are concurrent requests"""
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    max_queue: int
+    queue_timeout_ms: float
+    target_ms: float
+
+
+DEFAULT_POLICIES = {
+    "auth": Policy(initial_limit=4, min_limit=1, max_limit=32, max_queue=64, queue_timeout_ms=1000, target_ms=250),
+    "read": Policy(initial_limit=32, min_limit=4, max_limit=256, max_queue=256, queue_timeout_ms=1000, target_ms=200),
+    "write": Policy(initial_limit=16, min_limit=2, max_limit=128, max_queue=128, queue_timeout_ms=1000, target_ms=250),
+    # min == max: no AIMD, the limit only caps how many run at once
+    "bulk": Policy(initial_limit=4, min_limit=4, max_limit=4, max_queue=16, queue_timeout_ms=30000, target_ms=5000),
+}
+
+
+def policy_from_env(route_class: str, default: Policy) -> Policy:
+    """Apply ADMISSION_<CLASS>_<FIELD> overrides, e.g. ADMISSION_AUTH_QUEUE_TIMEOUT_MS"""
+    overrides = {}
+    for field in fields(Policy):
+        value = os.getenv(f"ADMISSION_{route_class.upper()}_{field.name.upper()}")
+        if value:
+            overrides[field.name] = field.type(value)
+    return replace(default, **overrides)
+
+
+def classify(method: str, path: str) -> str | None:
+    """Route class of a request, or None if it bypasses admission control"""
+    if path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES):
+        return None
+    if method == "POST" and path in AUTH_PATHS:
+        return "auth"
+    if method == "POST" and path in BULK_PATHS:
+        return "bulk"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; retry_after is in whole seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded FIFO wait queue (event-loop only, not thread safe)"""
+
+    def __init__(self, policy: Policy):
+        self.policy = policy
+        self.limit = float(policy.initial_limit)
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        # Mean service time, used to predict queue waits
+        self.avg_latency = policy.target_ms / 1000
+        self._last_decrease = 0.0
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at queue `position` gets a slot, at the current pace"""
+        return (position + 1) / max(int(self.limit), 1) * self.avg_latency
+
+    def _retry_after(self, wait: float) -> int:
+        return max(1, math.ceil(wait))
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed; return the seconds waited or raise Overloaded"""
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+            return 0.0
+        position = len(self.waiters)
+        timeout = self.policy.queue_timeout_ms / 1000
+        if position >= self.policy.max_queue:
+            raise Overloaded("queue_full", self._retry_after(self.expected_wait(position)))
+        wait = self.expected_wait(position)
+        if wait > timeout:
+            raise Overloaded("deadline", self._retry_after(wait))
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        started = time.perf_counter()
+        try:
+            # release() hands the slot over by resolving the future (in_flight already counts us)
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise Overloaded("timeout", self._retry_after(self.expected_wait(len(self.waiters))))
+        except BaseException:
+            # Cancelled (client went away) just as a slot was handed over: pass it on
+            if future.done() and not future.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if future in self.waiters:
+                self.waiters.remove(future)
+        return time.perf_counter() - started
+
+    def release(self, latency: float | None) -> None:
+        """Free a slot, feeding the request's service time (None if unknown) into AIMD"""
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if latency is not None:
+            self._observe(latency, saturated)
+        self._wake()
+
+    def _observe(self, latency: float, saturated: bool) -> None:
+        self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+        policy = self.policy
+        target = policy.target_ms / 1000
+        if latency > target:
+            now = time.monotonic()
+            if now - self._last_decrease >= target:
+                self.limit = max(policy.min_limit, self.limit * ADMISSION_BACKOFF)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(policy.max_limit, self.limit + 1 / self.limit)
+
+    def _wake(self) -> None:
+        while self.waiters and self.in_flight < int(self.limit):
+            future = self.waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+def build_limiters() -> dict[str, AdaptiveLimiter]:
+    return {name: AdaptiveLimiter(policy_from_env(name, policy)) for name, policy in DEFAULT_POLICIES.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware queueing or shedding requests per route class"""
+
+    def __init__(self, app, limiters: dict[str, AdaptiveLimiter] | None = None):
+        self.app = app
+        self.limiters = build_limiters() if limiters is None else limiters
+        metrics.REGISTRY.add_collector(self._collect)
+
+    def _collect(self) -> None:
+        for name, limiter in self.limiters.items():
+            metrics.ADMISSION_LIMIT.labels(name).set(int(limiter.limit))
+            metrics.ADMISSION_IN_FLIGHT.labels(name).set(limiter.in_flight)
+            metrics.ADMISSION_QUEUE.labels(name).set(len(limiter.waiters))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        try:
+            waited = await limiter.acquire()
+        except Overloaded as exc:
+            metrics.ADMISSION_REJECTED.labels(route_class, exc.reason).inc()
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        metrics.ADMISSION_WAIT.labels(route_class).observe(waited)
+        timings = server_timing.current()
+        if timings is not None and waited:
+            timings.add("queue", waited)
+
+        started = time.perf_counter()
+        first_byte: float | None = None
+
+        async def send_wrapper(message):
+            nonlocal first_byte
+            if message["type"] == "http.response.start":
+                # Service time for AIMD ends at the response start, so long streams do not count as slow
+                first_byte = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(first_byte)
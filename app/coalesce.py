@@ -0,0 +1,138 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When several identical reads are in flight at once (a user with many tabs
+open, a frontend firing the same request twice), only the first one
+(the leader) runs; the others wait for it and receive the same result or
+the same exception. Requests are identical when their key matches:
+
+    (route, user email, query parameters, data version)
+
+The user comes from the verified JWT, so results are never shared between
+users. The data version is a process-wide counter bumped by every INSERT,
+UPDATE or DELETE and again once a Session's COMMIT has returned, so a read
+that starts after a write is visible never joins a flight that started
+before it. (The Engine "commit" event fires before the DBAPI commit, so a
+flight started in between would read the old rows under the new version.) Coalescing is per
+worker process; writes committed by another worker are only seen by flights
+that start after them, as without coalescing.
+
+Flights run in the leader's threadpool thread and hand out plain pydantic
+models, never ORM objects bound to the leader's session.
+"""
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import metrics, server_timing
+
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# ---------- Data version ----------
+
+_version = itertools.count(1)
+_current_version = 0
+
+
+def data_version() -> int:
+    """Counter that changes whenever data may have changed"""
+    return _current_version
+
+
+def bump_version() -> None:
+    global _current_version
+    # next() on itertools.count is atomic under the GIL
+    _current_version = next(_version)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:7].upper().startswith(_WRITES):
+        bump_version()
+
+
+def _after_commit(session):
+    bump_version()
+
+
+def track_writes() -> None:
+    """Bump the data version on writes of every Engine and after every Session commit (idempotent)"""
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Session, "after_commit", _after_commit)
+
+
+# ---------- Single flight ----------
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome with concurrent callers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """Return (result, shared); shared is True if another caller's execution was reused"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # Later arrivals start a new flight; only callers already waiting share this one
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+FLIGHTS = SingleFlight()
+
+
+def coalesce(route: str, user: str, params: tuple, fn: Callable[[], Any]) -> Any:
+    """Run fn once for all identical concurrent (route, user, params) reads"""
+    if not COALESCE_ENABLED:
+        return fn()
+    key = (route, user, params, data_version())
+    started = time.perf_counter()
+    result, shared = FLIGHTS.do(key, fn)
+    metrics.COALESCE_REQUESTS.labels(route, "follower" if shared else "leader").inc()
+    if shared:
+        timings = server_timing.current()
+        if timings is not None:
+            timings.add("coalesced", time.perf_counter() - started)
+    return result
@@ -1,5 +1,6 @@
+from sqlalchemy import and_, delete, func, literal, update
 from sqlalchemy.orm import Session
-from . import models, schemas, security
+from . import models, schemas, security, server_timing, tracing
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
@@ -15,6 +16,8 @@ def _to_dict(pydantic_obj, **kwargs) -> dict:
 
 # ---------- USER CRUD ----------
 
+@tracing.traced()
+@server_timing.timed("crud")
 def create_user(db: Session, user_in: schemas.UserCreate) -> models.User:
     hashed_pw = security.hash_password(user_in.password)
     db_user = models.User(
@@ -36,19 +39,27 @@ def create_user(db: Session, user_in: schemas.UserCreate) -> models.User:
     return db_user
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def get_user_by_id(db: Session, user_id: int) -> models.User | None:
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def get_user_by_username(db: Session, username: str) -> models.User | None:
     return db.query(models.User).filter(models.User.username == username).first()
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def get_user_by_email(db: Session, email: str) -> models.User | None:
     """Get user by email address"""
     return db.query(models.User).filter(models.User.email == email).first()
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def authenticate_user(db: Session, email: str | None = None, username: str | None = None, password: str = None) -> models.User | None:
     """Authenticate user by email or username. Returns user if valid, None otherwise."""
     user = None
@@ -64,6 +75,8 @@ def authenticate_user(db: Session, email: str | None = None, username: str | Non
 
 # ---------- CALCULATION CRUD ----------
 
+@tracing.traced()
+@server_timing.timed("crud")
 def create_calculation(db: Session, calc_in: schemas.CalculationCreate, user_id: int | None = None) -> models.Calculation:
     data = _to_dict(calc_in)
     db_calc = models.Calculation(**data, user_id=user_id)
@@ -73,19 +86,82 @@ def create_calculation(db: Session, calc_in: schemas.CalculationCreate, user_id:
     return db_calc
 
 
-def get_user_calculations(db: Session, user_id: int) -> list[models.Calculation]:
-    """Get all calculations for a specific user"""
-    return db.query(models.Calculation).filter(models.Calculation.user_id == user_id).all()
-
+@tracing.traced()
+@server_timing.timed("crud")
+def get_user_calculations(
+    db: Session,
+    user_id: int,
+    include_archived: bool = False,
+    after_id: int = 0,
+    limit: int | None = None,
+) -> list[models.Calculation | models.CalculationArchive]:
+    """
+    Get all calculations for a specific user, optionally followed by archived ones.
 
+    With limit, return one keyset page instead: the first `limit` calculations
+    with an id above after_id, in id order. Archived rows keep their original
+    id, so with include_archived they are merged into the same sequence.
+    """
+    if limit is None:
+        calculations = db.query(models.Calculation).filter(models.Calculation.user_id == user_id).all()
+        if include_archived:
+            calculations += db.query(models.CalculationArchive).filter(
+                models.CalculationArchive.user_id == user_id
+            ).order_by(models.CalculationArchive.id).all()
+        return calculations
+
+    tables = (models.Calculation, models.CalculationArchive) if include_archived else (models.Calculation,)
+    page = []
+    for table in tables:
+        page += db.query(table).filter(
+            table.user_id == user_id, table.id > after_id
+        ).order_by(table.id).limit(limit).all()
+    return sorted(page, key=lambda calc: calc.id)[:limit]
+
+
+@tracing.traced()
+@server_timing.timed("crud")
 def get_all_calculations(db: Session) -> list[models.Calculation]:
     return db.query(models.Calculation).all()
 
 
+def iter_calculation_rows(
+    db: Session,
+    user_id: int | None = None,
+    after_id: int = 0,
+    batch_size: int = 1000,
+    limit: int | None = None,
+):
+    """
+    Stream (id, a, b, type, user_id) tuples ordered by id.
+
+    Uses yield_per so rows are fetched in batches through a server-side
+    cursor instead of being materialized all at once. Pass user_id=None to
+    stream every user's calculations, and limit to read one keyset page.
+    """
+    query = db.query(
+        models.Calculation.id,
+        models.Calculation.a,
+        models.Calculation.b,
+        models.Calculation.type,
+        models.Calculation.user_id,
+    ).filter(models.Calculation.id > after_id)
+    if user_id is not None:
+        query = query.filter(models.Calculation.user_id == user_id)
+    query = query.order_by(models.Calculation.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.yield_per(batch_size)
+
+
+@tracing.traced()
+@server_timing.timed("crud")
 def get_calculation_by_id(db: Session, calc_id: int) -> models.Calculation | None:
     return db.query(models.Calculation).filter(models.Calculation.id == calc_id).first()
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def get_calculation_by_id_and_user(db: Session, calc_id: int, user_id: int) -> models.Calculation | None:
     """Get a calculation by ID, ensuring it belongs to the user"""
     return db.query(models.Calculation).filter(
@@ -94,6 +170,18 @@ def get_calculation_by_id_and_user(db: Session, calc_id: int, user_id: int) -> m
     ).first()
 
 
+@tracing.traced()
+@server_timing.timed("crud")
+def get_archived_calculation(db: Session, calc_id: int, user_id: int) -> models.CalculationArchive | None:
+    """Get an archived calculation by its original ID, ensuring it belongs to the user"""
+    return db.query(models.CalculationArchive).filter(
+        models.CalculationArchive.id == calc_id,
+        models.CalculationArchive.user_id == user_id
+    ).first()
+
+
+@tracing.traced()
+@server_timing.timed("crud")
 def update_calculation(
     db: Session,
     calc_id: int,
@@ -118,6 +206,8 @@ def update_calculation(
     return calc
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def delete_calculation(db: Session, calc_id: int, user_id: int | None = None) -> bool:
     if user_id is not None:
         calc = get_calculation_by_id_and_user(db, calc_id, user_id)
@@ -132,8 +222,88 @@ def delete_calculation(db: Session, calc_id: int, user_id: int | None = None) ->
     return True
 
 
+def _calculation_filter_clauses(user_id: int, calc_filter: schemas.CalculationFilter) -> list:
+    """Translate a CalculationFilter into WHERE clauses scoped to one user"""
+    calc = models.Calculation
+    clauses = [calc.user_id == user_id]
+    if calc_filter.ids is not None:
+        clauses.append(calc.id.in_(calc_filter.ids))
+    if calc_filter.type is not None:
+        clauses.append(calc.type == calc_filter.type.value)
+    if calc_filter.a_min is not None:
+        clauses.append(calc.a >= calc_filter.a_min)
+    if calc_filter.a_max is not None:
+        clauses.append(calc.a <= calc_filter.a_max)
+    if calc_filter.b_min is not None:
+        clauses.append(calc.b >= calc_filter.b_min)
+    if calc_filter.b_max is not None:
+        clauses.append(calc.b <= calc_filter.b_max)
+    return clauses
+
+
+@tracing.traced()
+@server_timing.timed("crud")
+def bulk_delete_calculations(db: Session, user_id: int, calc_filter: schemas.CalculationFilter) -> int:
+    """Delete every calculation of the user matching the filter in one statement"""
+    stmt = (
+        delete(models.Calculation)
+        .where(*_calculation_filter_clauses(user_id, calc_filter))
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+@tracing.traced()
+@server_timing.timed("crud")
+def bulk_update_calculations(
+    db: Session,
+    user_id: int,
+    calc_filter: schemas.CalculationFilter,
+    calc_in: schemas.CalculationUpdate,
+) -> int:
+    """
+    Update every calculation of the user matching the filter in one statement.
+
+    Raises 400 without touching any row if the update would leave a Divide
+    calculation with a zero divisor.
+    """
+    values = _to_dict(calc_in, exclude_unset=True)
+    if "type" in values:
+        values["type"] = schemas.CalcType(values["type"]).value
+    clauses = _calculation_filter_clauses(user_id, calc_filter)
+
+    if "type" in values or "b" in values:
+        calc = models.Calculation
+        new_type = literal(values["type"]) if "type" in values else calc.type
+        new_b = literal(values["b"]) if "b" in values else calc.b
+        would_divide_by_zero = db.query(func.count(calc.id)).filter(
+            *clauses,
+            and_(new_type == schemas.CalcType.Divide.value, new_b == 0),
+        ).scalar()
+        if would_divide_by_zero:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Update would set a zero divisor on {would_divide_by_zero} Divide calculation(s)",
+            )
+
+    stmt = (
+        update(models.Calculation)
+        .where(*clauses)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
 # ---------- USER PROFILE CRUD ----------
 
+@tracing.traced()
+@server_timing.timed("crud")
 def update_user_profile(db: Session, user_id: int, profile_update: schemas.UserProfileUpdate) -> models.User | None:
     """Update user profile information (bio, email)"""
     from datetime import datetime, timezone
@@ -165,6 +335,8 @@ def update_user_profile(db: Session, user_id: int, profile_update: schemas.UserP
     return user
 
 
+@tracing.traced()
+@server_timing.timed("crud")
 def change_user_password(db: Session, user_id: int, new_password_hash: str) -> models.User | None:
     """Update user password hash"""
     user = get_user_by_id(db, user_id)
@@ -1,19 +1,72 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import time
 
-from . import schemas, crud
-from .database import engine, Base, get_db
-from app.routers import auth_router, calculations_router  # Include both routers
-from fastapi.staticfiles import StaticFiles
+_import_started = time.perf_counter()
 
-# Create tables once at startup
-Base.metadata.create_all(bind=engine)
+from contextlib import asynccontextmanager
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
+from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from . import schemas, crud, admission, coalesce, metrics, profiler, runtime_metrics, server_timing, tracing, warmup
+from .static_assets import StaticAssets
+from .database import get_db, init_db
+from app.routers import admin_router, auth_router, calculations_router, batch_router, jobs_router, monitoring_router
+from app.services import jobs, retention
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create tables and start background workers with the server; stop them on shutdown"""
+    started = time.perf_counter()
+    init_db()
+    metrics.STARTUP_PHASE.labels("init_db").set(time.perf_counter() - started)
+    if warmup.WARMUP_ENABLED:
+        # /ready answers 503 until warm-up is done
+        warmup.WARMUP.start()
+    runtime_metrics.configure_threadpool()
+    lag_monitor = runtime_metrics.LoopLagMonitor()
+    lag_monitor.start()
+    retention_worker = retention.start_background_worker()
+    job_runner = jobs.start_background_runner()
+    yield
+    if job_runner:
+        job_runner.stop()
+    if retention_worker:
+        retention_worker.stop()
+    await lag_monitor.stop()
+    await warmup.WARMUP.wait()
+    await run_in_threadpool(tracing.STORE.flush)
+
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = server_timing.TimedRoute
+# Innermost, so metrics, Server-Timing and traces include queue waits and 503s
+if admission.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_sqlalchemy()
+metrics.REGISTRY.add_collector(runtime_metrics.collect)
+runtime_metrics.install_gc_callbacks()
+if coalesce.COALESCE_ENABLED:
+    coalesce.track_writes()
+if server_timing.SERVER_TIMING_ENABLED:
+    app.add_middleware(server_timing.ServerTimingMiddleware)
+    server_timing.instrument_sqlalchemy()
+if tracing.TRACING_ENABLED:
+    app.add_middleware(tracing.TracingMiddleware)
+    tracing.instrument_sqlalchemy()
+if profiler.PROFILE_SECRET:
+    app.add_middleware(profiler.ProfilerMiddleware)
+# Prefers the build from `python -m app.tools.build_static`, falls back to ./static
+app.mount("/static", StaticAssets(), name="static")
 # Include routers
 app.include_router(auth_router.router)
 app.include_router(calculations_router.router)
+app.include_router(batch_router.router)
+app.include_router(jobs_router.router)
+app.include_router(monitoring_router.router)
+app.include_router(admin_router.router)
 
 # ---------- User Endpoints (backward compatible) ----------
 
@@ -103,3 +156,6 @@ def delete_calculation(calc_id: int, db: Session = Depends(get_db)):
     if not success:
         raise HTTPException(status_code=404, detail="Calculation not found")
     return None
+
+
+metrics.STARTUP_PHASE.labels("import").set(time.perf_counter() - _import_started)
@@ -0,0 +1,138 @@
+"""
+tracemalloc snapshots and diffs for finding what holds worker memory.
+
+tracemalloc is off by default because it slows down every allocation. To
+find what a request pattern allocates, an admin starts it, takes a baseline
+snapshot, exercises the suspect endpoint, and diffs against a second
+snapshot. The diff lists the source lines whose live allocations grew the
+most:
+
+    POST /admin/memory/start
+    POST /admin/memory/snapshots            -> {"id": 1, ...}
+    GET  /api/calculations/ (as a big user)
+    GET  /admin/memory/diff?base=1          -> diff against a fresh snapshot
+
+Snapshots are held in memory (MEMORY_SNAPSHOT_LIMIT, oldest dropped first).
+Each traceback keeps up to MEMORY_TRACE_FRAMES frames.
+"""
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "10"))
+MEMORY_SNAPSHOT_LIMIT = int(os.getenv("MEMORY_SNAPSHOT_LIMIT", "5"))
+
+# Allocations made by tracemalloc itself and the import machinery are noise
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size of this process (Linux only, None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def status() -> dict:
+    traced, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing": tracemalloc.is_tracing(),
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_bytes": traced,
+        "peak_traced_bytes": peak,
+        "rss_bytes": rss_bytes(),
+        "snapshots": STORE.summaries(),
+    }
+
+
+def start(frames: int = MEMORY_TRACE_FRAMES) -> None:
+    """Start tracing (restarting if the frame limit changes) and reset the peak"""
+    if tracemalloc.is_tracing() and tracemalloc.get_traceback_limit() != frames:
+        tracemalloc.stop()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    tracemalloc.reset_peak()
+
+
+def stop() -> None:
+    """Stop tracing; stored snapshots stay available"""
+    tracemalloc.stop()
+
+
+def _statistic(stat, group_by: str) -> dict:
+    frame = stat.traceback[0]
+    entry = {
+        "file": frame.filename,
+        "line": frame.lineno if group_by != "filename" else None,
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_bytes"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    if group_by == "traceback":
+        entry["traceback"] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+    return entry
+
+
+def top(snapshot: tracemalloc.Snapshot, group_by: str = "lineno", limit: int = 20) -> list[dict]:
+    """Largest live allocations of a snapshot grouped by line, file or traceback"""
+    return [_statistic(stat, group_by) for stat in snapshot.statistics(group_by)[:limit]]
+
+
+def diff(base: tracemalloc.Snapshot, target: tracemalloc.Snapshot,
+         group_by: str = "lineno", limit: int = 20) -> list[dict]:
+    """Allocations that grew (or shrank) most between two snapshots"""
+    return [_statistic(stat, group_by) for stat in target.compare_to(base, group_by)[:limit]]
+
+
+class SnapshotStore:
+    """Numbered, bounded collection of tracemalloc snapshots"""
+
+    def __init__(self, limit: int = MEMORY_SNAPSHOT_LIMIT):
+        self.limit = limit
+        self.snapshots: OrderedDict[int, tuple[tracemalloc.Snapshot, dict]] = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def take(self) -> tuple[int, tracemalloc.Snapshot]:
+        """Snapshot the traced allocations; raises RuntimeError if tracemalloc is off"""
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        info = {
+            "taken_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+            "rss_bytes": rss_bytes(),
+        }
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots[snapshot_id] = (snapshot, info)
+            while len(self.snapshots) > self.limit:
+                self.snapshots.popitem(last=False)
+        return snapshot_id, snapshot
+
+    def get(self, snapshot_id: int) -> tracemalloc.Snapshot | None:
+        entry = self.snapshots.get(snapshot_id)
+        return entry[0] if entry else None
+
+    def summary(self, snapshot_id: int) -> dict:
+        return {"id": snapshot_id, **self.snapshots[snapshot_id][1]}
+
+    def summaries(self) -> list[dict]:
+        return [self.summary(snapshot_id) for snapshot_id in list(self.snapshots)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.snapshots.clear()
+
+
+STORE = SnapshotStore()
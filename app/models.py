@@ -2,6 +2,6 @@
 # Import them from app.models subpackages
 from app.models.user import User
 from app.models.calculation import Calculation
+from app.models.calculation_archive import CalculationArchive
 
-__all__ = ["User", "Calculation"]
-
+__all__ = ["User", "Calculation", "CalculationArchive"]
@@ -1,4 +1,6 @@
 from .user import User
 from .calculation import Calculation
+from .calculation_archive import CalculationArchive
+from .job import Job
 
-__all__ = ["User", "Calculation"]
+__all__ = ["User", "Calculation", "CalculationArchive", "Job"]
@@ -1,16 +1,23 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class Calculation(Base):
     __tablename__ = "calculations"
+    __table_args__ = (
+        # Serves per-user listing and the per-user retention sweep
+        Index("ix_calculations_user_id_created_at", "user_id", "created_at"),
+        # Archived rows keep their id, so SQLite must never hand an archived id out again
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     a = Column(Float, nullable=False)
     b = Column(Float, nullable=False)
     type = Column(String(20), nullable=False)  # "Add", "Sub", "Multiply", "Divide"
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     # Relationship back to User
     user = relationship("User", back_populates="calculations")
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, func
+from app.database import Base
+
+
+class CalculationArchive(Base):
+    """
+    Calculations moved out of the live table by the retention sweep.
+    Rows keep their original id (the live table never reuses ids, see
+    Calculation); there is no foreign key so archived data
+    never blocks changes to users.
+    """
+    __tablename__ = "calculations_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    a = Column(Float, nullable=False)
+    b = Column(Float, nullable=False)
+    type = Column(String(20), nullable=False)
+    user_id = Column(Integer, index=True, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Lets CalculationRead tell archived rows apart from live ones
+    archived = True
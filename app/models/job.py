@@ -0,0 +1,44 @@
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
+from app.database import Base
+
+
+class Job(Base):
+    """
+    A unit of background work run by app.services.jobs.
+
+    status goes queued -> running -> succeeded | failed | cancelled. Rows stay
+    after they finish so clients can poll the outcome; a running job whose
+    heartbeat stops (its process died) is put back in the queue.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Serves the runner's "next queued job by priority" query
+        Index("ix_jobs_status_priority_id", "status", "priority", "id"),
+        Index("ix_jobs_user_id_status", "user_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    # Higher runs first
+    priority = Column(Integer, nullable=False, default=0)
+    params = Column(JSON, nullable=False, default=dict)
+    progress_done = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    message = Column(String(255), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def progress(self) -> float | None:
+        """Fraction done, if the job reported a total"""
+        if not self.progress_total:
+            return 1.0 if self.status == "succeeded" else None
+        return min(1.0, self.progress_done / self.progress_total)
@@ -0,0 +1,216 @@
+"""
+On-demand sampling profiler for single requests.
+
+When PROFILE_SECRET is set, ProfilerMiddleware profiles any request carrying
+that secret in the X-Profile-Secret header. A background thread samples the
+stacks that serve the request every PROFILE_INTERVAL_MS. That covers the
+event loop while it runs the request's coroutines, plus the threadpool
+workers running its sync dependencies and endpoint, so the call tree covers
+routers, crud, SQLAlchemy and pydantic. The result is written to PROFILE_DIR
+as a speedscope JSON file (or collapsed stacks for flamegraph.pl). The
+response carries a link to it:
+
+    X-Profile-Url: /admin/profiles/<name>
+    Link: </admin/profiles/<name>>; rel="profile"
+
+Without PROFILE_SECRET the middleware is not installed at all.
+"""
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import Context, ContextVar
+from datetime import datetime, timezone
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+PROFILE_SECRET = os.getenv("PROFILE_SECRET", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope")  # speedscope | collapsed
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+
+SECRET_HEADER = b"x-profile-secret"
+EXTENSIONS = {"speedscope": ".speedscope.json", "collapsed": ".collapsed.txt"}
+
+_active: ContextVar["SamplingProfiler | None"] = ContextVar("profiler", default=None)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # Trim to a readable path: project-relative or below site-packages
+    marker = filename.rfind("site-packages" + os.sep)
+    if marker != -1:
+        filename = filename[marker + len("site-packages") + 1:]
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampler restricted to the threads working on one request.
+
+    The event loop thread counts while the request's root coroutine frame is
+    on its stack; a threadpool worker counts while it runs a function inside
+    a copy of the request's context (anyio passes it to context.run()).
+    """
+
+    def __init__(self, root_frame, interval: float):
+        self.root_frame = root_frame
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._thread.ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            stack.reverse()
+            if thread_id == self.loop_thread:
+                root = "[event loop]"
+                start = next((i for i, f in enumerate(stack) if f is self.root_frame), None)
+            else:
+                root = "[threadpool]"
+                start = self._worker_entry(stack)
+            if start is not None:
+                self.samples[(root, *(_label(f) for f in stack[start:]))] += 1
+
+    def _worker_entry(self, stack: list) -> int | None:
+        """Index of the first frame a worker runs on behalf of this request"""
+        for index, frame in enumerate(stack):
+            if frame.f_code.co_name == "run" and "context" in frame.f_code.co_varnames:
+                context = frame.f_locals.get("context")
+                if isinstance(context, Context) and context.get(_active) is self:
+                    return index + 1
+        return None
+
+    # ---------- Output ----------
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: one 'a;b;c count' line per stack"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def speedscope(self, name: str) -> dict:
+        """Sampled profile in the speedscope file format"""
+        frames: dict[str, int] = {}
+        samples, weights = [], []
+        interval_ms = self.interval * 1000
+        for stack, count in self.samples.most_common():
+            samples.append([frames.setdefault(label, len(frames)) for label in stack])
+            weights.append(count * interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "app.profiler",
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.duration * 1000, 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write(self, path: str, fmt: str, name: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as fh:
+            if fmt == "collapsed":
+                fh.write(self.collapsed())
+            else:
+                json.dump(self.speedscope(name), fh)
+
+
+def profile_name(method: str, path: str, fmt: str) -> str:
+    """Sortable, unique file name such as 20250101T120000-GET-api-calculations-1a2b3c4d.speedscope.json"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{method}-{slug}-{uuid.uuid4().hex[:8]}{EXTENSIONS[fmt]}"
+
+
+def is_valid_secret(value: str | bytes | None, secret: str | None = None) -> bool:
+    """Constant-time check of a caller-supplied secret"""
+    secret = PROFILE_SECRET if secret is None else secret
+    if not secret or not value:
+        return False
+    if isinstance(value, str):
+        value = value.encode()
+    return hmac.compare_digest(value, secret.encode())
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling requests that present the profile secret"""
+
+    def __init__(self, app, secret: str | None = None, directory: str | None = None,
+                 fmt: str | None = None, interval_ms: float | None = None):
+        self.app = app
+        self.secret = PROFILE_SECRET if secret is None else secret
+        self.directory = PROFILE_DIR if directory is None else directory
+        self.fmt = PROFILE_FORMAT if fmt is None else fmt
+        if self.fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported profile format: {self.fmt}")
+        self.interval = (PROFILE_INTERVAL_MS if interval_ms is None else interval_ms) / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = profile_name(scope["method"], scope["path"], self.fmt)
+        url = f"/admin/profiles/{name}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Profile-Url", url)
+                headers.append("Link", f'<{url}>; rel="profile"')
+            await send(message)
+
+        profiler = SamplingProfiler(sys._getframe(), self.interval)
+        token = _active.set(profiler)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            _active.reset(token)
+            path = os.path.join(self.directory, name)
+            await run_in_threadpool(profiler.write, path, self.fmt, f"{scope['method']} {scope['path']}")
+
+    def _requested(self, scope) -> bool:
+        if scope["path"].startswith("/admin/profiles"):
+            return False  # downloading a profile should not create another one
+        for key, value in scope["headers"]:
+            if key == SECRET_HEADER:
+                return is_valid_secret(value, self.secret)
+        return False
@@ -0,0 +1,150 @@
+# app/routers/admin_router.py
+import os
+import tracemalloc
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app import memory_profiler, profiler, security, tracing
+from app.server_timing import TimedRoute
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute)
+
+
+def require_admin(email: str = Depends(security.get_current_user_email)) -> str:
+    """Allow only users listed in ADMIN_EMAILS"""
+    if not security.is_admin(email):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return email
+
+
+def require_profile_secret(x_profile_secret: str | None = Header(default=None)) -> None:
+    """Allow only callers presenting PROFILE_SECRET"""
+    if not profiler.PROFILE_SECRET:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if not profiler.is_valid_secret(x_profile_secret):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profile secret")
+
+
+@router.get("/profiles", response_model=list[str], dependencies=[Depends(require_profile_secret)])
+def list_profiles():
+    """List stored request profiles, newest first"""
+    if not os.path.isdir(profiler.PROFILE_DIR):
+        return []
+    names = [name for name in os.listdir(profiler.PROFILE_DIR) if name.endswith(tuple(profiler.EXTENSIONS.values()))]
+    return sorted(names, reverse=True)
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_profile_secret)])
+def read_profile(name: str):
+    """Download one stored profile (open .speedscope.json files at https://www.speedscope.app)"""
+    path = os.path.join(profiler.PROFILE_DIR, name)
+    if name != os.path.basename(name) or not name.endswith(tuple(profiler.EXTENSIONS.values())) \
+            or not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    media_type = "application/json" if name.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
+
+
+@router.get("/traces", dependencies=[Depends(require_admin)])
+def list_traces():
+    """Summaries of the sampled traces in the in-memory ring buffer, newest first"""
+    return tracing.STORE.summaries()
+
+
+@router.get("/traces/{trace_id}", dependencies=[Depends(require_admin)])
+def read_trace(trace_id: str):
+    """One buffered trace as an OTLP/JSON ExportTraceServiceRequest"""
+    trace = tracing.STORE.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found")
+    return tracing.STORE.to_otlp([trace])
+
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+def _get_snapshot(snapshot_id: int) -> tracemalloc.Snapshot:
+    snapshot = memory_profiler.STORE.get(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    return snapshot
+
+
+def _take_snapshot() -> tuple[int, tracemalloc.Snapshot]:
+    if not tracemalloc.is_tracing():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="tracemalloc is not running, POST /admin/memory/start first",
+        )
+    return memory_profiler.STORE.take()
+
+
+@router.get("/memory", dependencies=[Depends(require_admin)])
+def memory_status():
+    """tracemalloc state, traced/peak bytes, process RSS and stored snapshots"""
+    return memory_profiler.status()
+
+
+@router.post("/memory/start", dependencies=[Depends(require_admin)])
+def start_memory_tracing(frames: int = Query(memory_profiler.MEMORY_TRACE_FRAMES, ge=1, le=100)):
+    """Start tracemalloc (slows every allocation until stopped)"""
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+
+@router.post("/memory/stop", dependencies=[Depends(require_admin)])
+def stop_memory_tracing():
+    """Stop tracemalloc; stored snapshots stay available for diffs"""
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshots", status_code=201, dependencies=[Depends(require_admin)])
+def take_memory_snapshot(group_by: GroupBy = "lineno", limit: int = Query(20, ge=1, le=500)):
+    """Take a snapshot and return its largest allocations"""
+    snapshot_id, snapshot = _take_snapshot()
+    return {**memory_profiler.STORE.summary(snapshot_id), "top": memory_profiler.top(snapshot, group_by, limit)}
+
+
+@router.get("/memory/snapshots", dependencies=[Depends(require_admin)])
+def list_memory_snapshots():
+    """Stored snapshots, oldest first"""
+    return memory_profiler.STORE.summaries()
+
+
+@router.delete("/memory/snapshots", status_code=204, dependencies=[Depends(require_admin)])
+def clear_memory_snapshots():
+    """Drop every stored snapshot"""
+    memory_profiler.STORE.clear()
+    return None
+
+
+@router.get("/memory/snapshots/{snapshot_id}", dependencies=[Depends(require_admin)])
+def read_memory_snapshot(snapshot_id: int, group_by: GroupBy = "lineno", limit: int = Query(20, ge=1, le=500)):
+    """Largest allocations of a stored snapshot"""
+    snapshot = _get_snapshot(snapshot_id)
+    return {**memory_profiler.STORE.summary(snapshot_id), "top": memory_profiler.top(snapshot, group_by, limit)}
+
+
+@router.get("/memory/diff", dependencies=[Depends(require_admin)])
+def diff_memory_snapshots(
+    base: int = Query(..., description="Snapshot to compare against"),
+    target: int | None = Query(None, description="Later snapshot; omitted takes a new one now"),
+    group_by: GroupBy = "lineno",
+    limit: int = Query(20, ge=1, le=500),
+):
+    """Allocations that grew most between two snapshots"""
+    base_snapshot = _get_snapshot(base)
+    # Summarise base first, taking a new target may evict it from the store
+    base_summary = memory_profiler.STORE.summary(base)
+    if target is None:
+        target, target_snapshot = _take_snapshot()
+    else:
+        target_snapshot = _get_snapshot(target)
+    return {
+        "base": base_summary,
+        "target": memory_profiler.STORE.summary(target),
+        "diff": memory_profiler.diff(base_snapshot, target_snapshot, group_by, limit),
+    }
@@ -2,10 +2,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app import schemas, crud, security
+from app import coalesce, schemas, crud, security
 from app.database import get_db
+from app.server_timing import TimedRoute
 
-router = APIRouter(tags=["auth"])
+router = APIRouter(tags=["auth"], route_class=TimedRoute)
 
 
 @router.post("/register", response_model=schemas.Token)
@@ -61,13 +62,16 @@ def get_profile(
     db: Session = Depends(get_db)
 ):
     """Get current user profile"""
-    user = crud.get_user_by_email(db, current_user_email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    return user
+    def load():
+        user = crud.get_user_by_email(db, current_user_email)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        return schemas.UserProfile.model_validate(user)
+
+    return coalesce.coalesce("GET /profile", current_user_email, (), load)
 
 
 @router.put("/profile", response_model=schemas.UserProfile)
@@ -0,0 +1,36 @@
+# app/routers/batch_router.py
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app import schemas, crud, security
+from app.database import get_db
+from app.server_timing import TimedRoute
+from app.services.batch import run_batch
+
+router = APIRouter(prefix="/api", tags=["batch"], route_class=TimedRoute)
+
+
+@router.post("/batch", response_model=schemas.BatchResponse)
+def run_calculation_batch(
+    batch: schemas.BatchRequest,
+    response: Response,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """
+    Run several calculation operations with one auth check and one commit.
+
+    Returns 200 with per-operation results, or 409 if an atomic batch was
+    rolled back because one of its operations failed.
+    """
+    user = crud.get_user_by_email(db, current_user_email)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    result = run_batch(db, user.id, batch)
+    if not result["committed"]:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
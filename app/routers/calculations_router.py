@@ -1,11 +1,27 @@
 # app/routers/calculations_router.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import codecs
+import zlib
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app import schemas, crud, security
+from app import coalesce, schemas, crud, security
 from app.database import get_db
+from app.server_timing import TimedRoute
+from app.services import exporter
+from app.services.importer import CalculationImporter, DEFAULT_BATCH_SIZE, inflate, inflate_rest
+
+router = APIRouter(
+    prefix="/api/calculations",
+    tags=["calculations-authenticated"],
+    route_class=TimedRoute,
+)
 
-router = APIRouter(prefix="/api/calculations", tags=["calculations-authenticated"])
+# Largest page GET /api/calculations/?limit= returns
+MAX_PAGE_SIZE = 1000
 
 
 @router.post("/", response_model=schemas.CalculationRead, status_code=201)
@@ -29,25 +45,154 @@ def create_calculation(
 
 @router.get("/", response_model=list[schemas.CalculationRead])
 def read_calculations(
+    include_archived: bool = Query(False, description="Also return calculations moved to the archive"),
+    after_id: int = Query(0, ge=0, description="Only calculations with a larger id (keyset paging)"),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Return one page of at most this many, in id order"),
     current_user_email: str = Depends(security.get_current_user_email),
     db: Session = Depends(get_db),
 ):
-    """Browse (READ) all calculations for the logged-in user"""
-    # Get user by email
+    """Browse (READ) all calculations for the logged-in user, or one page of them"""
+    def load():
+        # Get user by email
+        user = crud.get_user_by_email(db, current_user_email)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+
+        calculations = crud.get_user_calculations(
+            db, user.id, include_archived=include_archived, after_id=after_id, limit=limit
+        )
+        # Shared with coalesced requests, so detach from this request's session
+        return [schemas.CalculationRead.model_validate(calc) for calc in calculations]
+
+    return coalesce.coalesce(
+        "GET /api/calculations/", current_user_email, (include_archived, after_id, limit), load
+    )
+
+
+@router.get("/export")
+def export_calculations(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    after_id: int = Query(0, ge=0, description="Resume after this calculation id"),
+    all_users: bool = Query(False, description="Export every user's calculations (admin only)"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Stream the logged-in user's calculations as NDJSON or CSV, ordered by id"""
     user = crud.get_user_by_email(db, current_user_email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    
-    calculations = crud.get_user_calculations(db, user.id)
-    return calculations
+    if all_users and not security.is_admin(user.email):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can export all calculations",
+        )
+
+    rows = crud.iter_calculation_rows(db, None if all_users else user.id, after_id=after_id)
+    if fmt == "csv":
+        body, media_type = exporter.csv_chunks(rows), "text/csv"
+    else:
+        body, media_type = exporter.ndjson_chunks(rows), "application/x-ndjson"
+
+    headers = {"Content-Disposition": f'attachment; filename="calculations.{fmt}"'}
+    if gzip:
+        body = exporter.gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+@router.post("/import", response_model=schemas.ImportReport)
+async def import_calculations(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=50_000),
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk import calculations for the logged-in user from an NDJSON or CSV body.
+
+    The body is parsed as a stream and inserted in chunked transactions; a
+    gzip Content-Encoding is decompressed on the fly in bounded pieces.
+    Invalid or over-long lines are reported without aborting the rest of
+    the file.
+    """
+    user = await run_in_threadpool(crud.get_user_by_email, db, current_user_email)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    importer = CalculationImporter(db, user.id, fmt=fmt, batch_size=batch_size)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    inflater = zlib.decompressobj(31) if request.headers.get("content-encoding") == "gzip" else None
+    try:
+        async for chunk in request.stream():
+            for piece in inflate(inflater, chunk) if inflater is not None else (chunk,):
+                # Validation and inserts are blocking, keep them off the event loop
+                await run_in_threadpool(importer.feed_text, decoder.decode(piece))
+        rest = inflate_rest(inflater) if inflater is not None else b""
+    except zlib.error:
+        # Batches before the corrupt part are already committed
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid gzip body; {importer.imported} calculations were imported before it",
+        )
+    return await run_in_threadpool(_finish_import, importer, decoder.decode(rest, final=True))
+
+
+def _finish_import(importer: CalculationImporter, text: str) -> dict:
+    importer.feed_text(text)
+    return importer.finish()
+
+
+@router.post("/bulk-delete", response_model=schemas.BulkOperationResult)
+def bulk_delete_calculations(
+    calc_filter: schemas.CalculationFilter,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Delete every calculation of the logged-in user matching the filter"""
+    user = crud.get_user_by_email(db, current_user_email)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    affected = crud.bulk_delete_calculations(db, user.id, calc_filter)
+    return {"affected": affected}
+
+
+@router.post("/bulk-update", response_model=schemas.BulkOperationResult)
+def bulk_update_calculations(
+    bulk_in: schemas.CalculationBulkUpdate,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Apply the same partial update to every calculation matching the filter"""
+    user = crud.get_user_by_email(db, current_user_email)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    affected = crud.bulk_update_calculations(db, user.id, bulk_in.filter, bulk_in.update)
+    return {"affected": affected}
 
 
 @router.get("/{calc_id}", response_model=schemas.CalculationRead)
 def read_calculation(
     calc_id: int,
+    include_archived: bool = Query(False, description="Fall back to the archive if the calculation was retired"),
     current_user_email: str = Depends(security.get_current_user_email),
     db: Session = Depends(get_db),
 ):
@@ -61,6 +206,8 @@ def read_calculation(
         )
     
     calculation = crud.get_calculation_by_id_and_user(db, calc_id, user.id)
+    if not calculation and include_archived:
+        calculation = crud.get_archived_calculation(db, calc_id, user.id)
     if not calculation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,169 @@
+# app/routers/jobs_router.py
+import os
+import tempfile
+import zlib
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas, security
+from app.database import get_db
+from app.server_timing import TimedRoute
+from app.services import jobs
+from app.services.importer import DEFAULT_BATCH_SIZE, inflate, inflate_rest
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"],
+    route_class=TimedRoute,
+)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _current_user(db: Session, email: str) -> models.User:
+    user = crud.get_user_by_email(db, email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+def _own_job(db: Session, job_id: int, email: str) -> models.Job:
+    job = jobs.get_job(db, job_id, _current_user(db, email).id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("", response_model=schemas.JobRead, status_code=202)
+def create_job(
+    job_in: schemas.JobCreate,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Queue a background job; poll GET /api/jobs/{id} for its progress and result"""
+    user = _current_user(db, current_user_email)
+    kind = jobs.HANDLERS.get(job_in.kind)
+    if kind is not None and kind.admin_only and not security.is_admin(current_user_email):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    if kind is not None and kind.upload_only:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Upload the file to POST /api/jobs/{job_in.kind} instead",
+        )
+    try:
+        return jobs.enqueue(db, user.id, job_in.kind, job_in.params, job_in.priority)
+    except jobs.JobError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.post("/import", response_model=schemas.JobRead, status_code=202)
+async def create_import_job(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=50_000),
+    priority: int = Query(0, ge=-10, le=10),
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue an import of an NDJSON or CSV body (same format as /api/calculations/import).
+
+    The body is stored as it arrives (a gzip Content-Encoding is decompressed
+    in bounded pieces, and at most JOB_MAX_UPLOAD_BYTES are kept) and the
+    response returns as soon as it is saved; the job's result is the import
+    report.
+    """
+    user = await run_in_threadpool(_current_user, db, current_user_email)
+    os.makedirs(jobs.JOB_OUTPUT_DIR, exist_ok=True)
+    inflater = zlib.decompressobj(31) if request.headers.get("content-encoding") == "gzip" else None
+    fd, upload = tempfile.mkstemp(dir=jobs.JOB_OUTPUT_DIR, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            size = 0
+            async for chunk in request.stream():
+                for piece in inflate(inflater, chunk) if inflater is not None else (chunk,):
+                    size += len(piece)
+                    if size > jobs.JOB_MAX_UPLOAD_BYTES:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                            detail=f"Upload is larger than {jobs.JOB_MAX_UPLOAD_BYTES} bytes",
+                        )
+                    await run_in_threadpool(fh.write, piece)
+            if inflater is not None:
+                await run_in_threadpool(fh.write, inflate_rest(inflater))
+        return await run_in_threadpool(
+            jobs.enqueue, db, user.id, "import", {"format": fmt, "batch_size": batch_size}, priority,
+            lambda job_id: os.replace(upload, jobs.output_path(job_id, "input")),
+        )
+    except zlib.error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid gzip body")
+    finally:
+        if os.path.exists(upload):
+            os.remove(upload)
+
+
+@router.get("", response_model=list[schemas.JobRead])
+def list_jobs(
+    limit: int = Query(50, ge=1, le=200),
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """The logged-in user's most recent jobs, newest first"""
+    return jobs.list_jobs(db, _current_user(db, current_user_email).id, limit)
+
+
+@router.get("/{job_id}", response_model=schemas.JobRead)
+def read_job(
+    job_id: int,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Status, progress and result of one job"""
+    return _own_job(db, job_id, current_user_email)
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.JobRead)
+def cancel_job(
+    job_id: int,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Cancel a queued job, or ask a running one to stop (it ends as "cancelled" shortly after)"""
+    return jobs.request_cancel(db, _own_job(db, job_id, current_user_email))
+
+
+@router.delete("/{job_id}", status_code=204)
+def delete_job(
+    job_id: int,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Delete a finished job and its output file"""
+    job = _own_job(db, job_id, current_user_email)
+    if job.status not in jobs.FINISHED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Cancel the job before deleting it")
+    jobs.delete_job(db, job)
+    return Response(status_code=204)
+
+
+@router.get("/{job_id}/download")
+def download_job_output(
+    job_id: int,
+    current_user_email: str = Depends(security.get_current_user_email),
+    db: Session = Depends(get_db),
+):
+    """Download the file written by a finished export job"""
+    job = _own_job(db, job_id, current_user_email)
+    if job.kind != "export" or job.status != "succeeded":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job has no output to download")
+    fmt = job.params.get("format", "ndjson")
+    suffix = f"{fmt}.gz" if job.params.get("gzip") else fmt
+    path = jobs.output_path(job.id, suffix)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Output file no longer exists")
+    media_type = "application/gzip" if suffix.endswith(".gz") else MEDIA_TYPES[fmt]
+    return FileResponse(path, media_type=media_type, filename=f"calculations-job-{job.id}.{suffix}")
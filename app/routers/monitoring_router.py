@@ -0,0 +1,39 @@
+# app/routers/monitoring_router.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import metrics, warmup
+from app.database import get_db
+from app.server_timing import TimedRoute
+
+router = APIRouter(tags=["monitoring"], route_class=TimedRoute)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Expose process metrics in the Prometheus text format"""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/health", include_in_schema=False)
+def health():
+    """Liveness check: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+def ready(db: Session = Depends(get_db)):
+    """Readiness check: warm-up has finished and the database answers a trivial query"""
+    if not warmup.WARMUP.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Warming up")
+    try:
+        db.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    return {"status": "ready", "database": "ok"}
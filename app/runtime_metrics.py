@@ -0,0 +1,126 @@
+"""
+Concurrency health metrics: threadpool saturation, event-loop lag and GC pauses.
+
+Every sync `def` endpoint and dependency runs in AnyIO's default threadpool.
+When all of its tokens are borrowed, further requests wait for a thread
+without any trace in the request metrics, which looks exactly like a slow
+database. These metrics tell the cases apart:
+
+    threadpool_tokens_borrowed == threadpool_tokens_total, tasks waiting > 0
+                                  -> threads exhausted (raise THREADPOOL_TOKENS
+                                     or the DB pool, or shed load)
+    event_loop_lag_seconds high   -> something blocks the event loop
+    gc_pause_seconds high         -> allocation-heavy requests stall the process
+
+THREADPOOL_TOKENS sets the threadpool capacity at startup (AnyIO's default is
+40). Keep it at or below the database pool size plus overflow, or threads
+just move the queue to the connection pool. The lag probe sleeps for
+LOOP_LAG_INTERVAL seconds in a loop and records how late it wakes up.
+"""
+import asyncio
+import collections
+import gc
+import os
+import time
+
+import anyio.to_thread
+
+from app import metrics
+
+THREADPOOL_TOKENS = int(os.getenv("THREADPOOL_TOKENS", "40"))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.25"))
+
+_limiter = None
+
+
+def configure_threadpool(tokens: int = THREADPOOL_TOKENS):
+    """Size the default AnyIO threadpool; must run on the server's event loop"""
+    global _limiter
+    _limiter = anyio.to_thread.current_default_thread_limiter()
+    _limiter.total_tokens = tokens
+    return _limiter
+
+
+def collect() -> None:
+    """Fold in GC stats and refresh the threadpool gauges (registered as a metrics collector)"""
+    flush_gc_stats()
+    if _limiter is None:
+        return
+    stats = _limiter.statistics()
+    metrics.THREADPOOL_TOKENS_TOTAL.set(stats.total_tokens)
+    metrics.THREADPOOL_TOKENS_BORROWED.set(stats.borrowed_tokens)
+    metrics.THREADPOOL_TASKS_WAITING.set(stats.tasks_waiting)
+
+
+class LoopLagMonitor:
+    """Periodic task measuring how late the event loop runs a scheduled wake-up"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            metrics.LOOP_LAG.observe(lag)
+            metrics.LOOP_LAG_LAST.set(lag)
+
+
+# ---------- Garbage collector ----------
+
+# A collection can start in any thread at any allocation, including one that
+# holds a metrics lock, so the callback must not touch the metrics (their
+# locks are not reentrant). It only appends to these, and flush_gc_stats()
+# folds them into GC_PAUSE / GC_COLLECTED at scrape time.
+GC_PENDING_MAX = 4096
+_gc_started: float | None = None
+_gc_pauses: collections.deque = collections.deque(maxlen=GC_PENDING_MAX)  # (generation, seconds)
+_gc_collected = [0, 0, 0]  # per generation, only written by the callback
+_gc_collected_flushed = [0, 0, 0]
+
+
+def _gc_callback(phase: str, info: dict) -> None:
+    global _gc_started
+    # Collections never overlap (the GC holds the GIL), so one start time is enough
+    if phase == "start":
+        _gc_started = time.perf_counter()
+    elif _gc_started is not None:
+        generation = info["generation"]
+        _gc_pauses.append((generation, time.perf_counter() - _gc_started))
+        _gc_collected[generation] += info["collected"]
+        _gc_started = None
+
+
+def flush_gc_stats() -> None:
+    """Move pauses and collected counts recorded by the GC callback into the metrics"""
+    while True:
+        try:
+            generation, pause = _gc_pauses.popleft()
+        except IndexError:
+            break
+        metrics.GC_PAUSE.labels(str(generation)).observe(pause)
+    for generation, total in enumerate(_gc_collected):
+        delta = total - _gc_collected_flushed[generation]
+        if delta:
+            metrics.GC_COLLECTED.labels(str(generation)).inc(delta)
+            _gc_collected_flushed[generation] = total
+
+
+def install_gc_callbacks() -> None:
+    """Record every collection's pause and collected objects (idempotent); flushed on scrape"""
+    if _gc_callback not in gc.callbacks:
+        gc.callbacks.append(_gc_callback)
@@ -1,10 +1,19 @@
 from .user import UserCreate, UserRegister, UserRead, UserLogin, UserProfile, UserProfileUpdate, PasswordChange
-from .calculation import CalculationCreate, CalculationRead, CalculationUpdate, CalcType
+from .calculation import (
+    CalculationCreate, CalculationRead, CalculationUpdate, CalcType,
+    ImportLineError, ImportReport,
+    CalculationFilter, CalculationBulkUpdate, BulkOperationResult,
+)
+from .batch import BatchOperation, BatchRequest, BatchOperationResult, BatchResponse
+from .job import JobCreate, JobRead
 from .token import Token
 
 __all__ = [
     "UserCreate", "UserRegister", "UserRead", "UserLogin", 
     "UserProfile", "UserProfileUpdate", "PasswordChange",
     "CalculationCreate", "CalculationRead", "CalculationUpdate", 
-    "CalcType", "Token"
+    "CalcType", "ImportLineError", "ImportReport",
+    "CalculationFilter", "CalculationBulkUpdate", "BulkOperationResult",
+    "BatchOperation", "BatchRequest", "BatchOperationResult", "BatchResponse",
+    "JobCreate", "JobRead", "Token"
 ]
@@ -0,0 +1,50 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from .calculation import CalculationRead
+
+MAX_BATCH_OPERATIONS = 500
+
+
+class BatchOperation(BaseModel):
+    """A single calculation operation inside a batch"""
+    op: Literal["create", "read", "update", "delete"]
+    id: int | None = None
+    data: dict[str, Any] | None = None
+
+    @model_validator(mode='after')
+    def check_arguments(self):
+        """Ensure each operation carries the arguments it needs"""
+        if self.op in ("read", "update", "delete") and self.id is None:
+            raise ValueError(f"'{self.op}' operations require an id")
+        if self.op in ("create", "update") and self.data is None:
+            raise ValueError(f"'{self.op}' operations require data")
+        return self
+
+
+class BatchRequest(BaseModel):
+    """
+    Ordered list of operations run in one transaction.
+
+    atomic: the first failure rolls back everything.
+    best_effort: each operation runs in its own savepoint and failures are skipped.
+    """
+    mode: Literal["atomic", "best_effort"] = "atomic"
+    operations: list[BatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+class BatchOperationResult(BaseModel):
+    """Outcome of one batch operation, using HTTP-like status codes"""
+    index: int
+    op: str
+    status: int
+    data: CalculationRead | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    """Per-operation results and whether the batch was committed"""
+    mode: str
+    committed: bool
+    results: list[BatchOperationResult]
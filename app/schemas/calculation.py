@@ -1,4 +1,5 @@
 from pydantic import BaseModel, model_validator, computed_field, ConfigDict
+from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel
 from typing import Optional
@@ -33,6 +34,8 @@ class CalculationRead(BaseModel):
     b: float
     type: CalcType
     user_id: int | None = None
+    created_at: datetime | None = None
+    archived: bool = False
 
     model_config = ConfigDict(from_attributes=True)
     
@@ -64,3 +67,57 @@ class CalculationUpdate(BaseModel):
     b: Optional[float] = None
     type: Optional[CalcType] = None
 
+
+
+class ImportLineError(BaseModel):
+    """A line that could not be imported"""
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Summary returned by a bulk calculation import"""
+    imported: int
+    failed: int
+    errors: list[ImportLineError]
+    errors_truncated: bool = False
+
+
+class CalculationFilter(BaseModel):
+    """
+    Predicate selecting a subset of the user's calculations.
+    All provided criteria must match; at least one is required.
+    """
+    ids: Optional[list[int]] = None
+    type: Optional[CalcType] = None
+    a_min: Optional[float] = None
+    a_max: Optional[float] = None
+    b_min: Optional[float] = None
+    b_max: Optional[float] = None
+
+    @model_validator(mode='after')
+    def at_least_one_criterion(self):
+        """Refuse empty filters so a bulk operation never silently hits every row"""
+        if all(value is None for value in self.__dict__.values()):
+            raise ValueError("At least one filter criterion must be provided")
+        return self
+
+
+class CalculationBulkUpdate(BaseModel):
+    """Schema for updating every calculation matching a filter"""
+    filter: CalculationFilter
+    update: CalculationUpdate
+
+    @model_validator(mode='after')
+    def check_update(self):
+        """Require at least one field and reject updates that always divide by zero"""
+        if not self.update.model_fields_set:
+            raise ValueError("At least one field to update must be provided")
+        if self.update.type == CalcType.Divide and self.update.b == 0:
+            raise ValueError("Divisor (b) cannot be zero for Divide operation")
+        return self
+
+
+class BulkOperationResult(BaseModel):
+    """Number of calculations affected by a bulk operation"""
+    affected: int
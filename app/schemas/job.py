@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobCreate(BaseModel):
+    """Schema for queueing a background job"""
+    kind: str = Field(description="export, bulk_update, bulk_delete or retention (admin)")
+    priority: int = Field(0, ge=-10, le=10, description="Higher runs first")
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class JobRead(BaseModel):
+    """Schema for polling a background job"""
+    id: int
+    kind: str
+    status: str
+    priority: int
+    params: dict[str, Any]
+    progress: float | None = None
+    progress_done: int
+    progress_total: int | None = None
+    message: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    cancel_requested: bool
+    attempts: int
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
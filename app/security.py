@@ -1,33 +1,65 @@
+import functools
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 
+from app import metrics, server_timing, tracing
+
 # Configuration
 SECRET_KEY = "change-me-to-a-long-random-secret"  # move to env later if you want
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-# Use PBKDF2-SHA256 instead of bcrypt to avoid backend issues
-pwd_context = CryptContext(
-    schemes=["pbkdf2_sha256"],
-    deprecated="auto",
-)
+# Comma-separated list of emails allowed to use admin-only features
+ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
 
 # Security scheme for bearer token
 security = HTTPBearer()
 
+
+# passlib and python-jose (which pulls in cryptography) are imported on first
+# use rather than at startup; app.warmup loads them before the worker is ready.
+
+@functools.cache
+def get_pwd_context():
+    """The password hashing context, built on first use"""
+    from passlib.context import CryptContext
+
+    # Use PBKDF2-SHA256 instead of bcrypt to avoid backend issues
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+    )
+
+
+def __getattr__(name: str):
+    # Keeps `security.pwd_context` working for existing callers
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    with metrics.PASSWORD_HASHING.labels("hash").time(), server_timing.measure("hash"), \
+            tracing.span("password.hash"):
+        return get_pwd_context().hash(plain_password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with metrics.PASSWORD_HASHING.labels("verify").time(), server_timing.measure("hash"), \
+            tracing.span("password.verify"):
+        return get_pwd_context().verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
@@ -38,6 +70,8 @@ def decode_token(token: str) -> dict:
     Decode a JWT token and return the payload.
     Returns empty dict if token is invalid.
     """
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -51,7 +85,8 @@ def get_current_user_email(credentials: HTTPAuthorizationCredentials = Depends(s
     Raises HTTPException if token is invalid.
     """
     token = credentials.credentials
-    payload = decode_token(token)
+    with server_timing.measure("auth"), tracing.span("auth.decode"):
+        payload = decode_token(token)
     email = payload.get("sub")
     
     if not email:
@@ -61,3 +96,8 @@ def get_current_user_email(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     return email
+
+
+def is_admin(email: str) -> bool:
+    """Check whether the given email belongs to a configured admin"""
+    return email.lower() in ADMIN_EMAILS
@@ -0,0 +1,270 @@
+"""
+Production entry point: a pre-forking uvicorn supervisor.
+
+    python -m app.serve                       # one worker per available CPU
+    python -m app.serve --workers 4 --limit-concurrency 200
+
+The worker count defaults to WEB_CONCURRENCY or, failing that, the CPUs this
+process may actually use: the smaller of the CPU affinity mask and the
+cgroup (v2 cpu.max or v1 cfs quota) limit, so a container capped at 2 CPUs
+on a 64-core host runs 2 workers. PBKDF2 hashing is CPU bound, so more
+workers than cores only adds contention.
+
+The supervisor binds the listening socket once (with --backlog), optionally
+imports the app before forking (--preload: import errors fail fast and
+workers share the imported code copy-on-write), and restarts workers that
+die. On SIGTERM/SIGINT every worker stops accepting connections and drains
+in-flight requests for up to --graceful-timeout seconds before being killed.
+
+Platforms without fork() fall back to uvicorn's own multi-process mode.
+"""
+import argparse
+import logging
+import math
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+from uvicorn.server import STARTUP_FAILURE
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = os.getenv("WEB_CONCURRENCY", "")
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+KEEP_ALIVE = int(os.getenv("KEEP_ALIVE", "5"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0")) or None
+PRELOAD = os.getenv("PRELOAD", "true").lower() not in ("0", "false", "no")
+
+APP = "app.main:app"
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# uvicorn configures this logger, so supervisor messages match the workers' format
+logger = logging.getLogger("uvicorn.error")
+
+
+# ---------- Sizing ----------
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> float | None:
+    """CPUs allowed by the cgroup CPU quota, or None if unlimited/unknown"""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max":
+            try:
+                return int(quota) / int(period or 100_000)
+            except ValueError:
+                return None
+        return None
+    # cgroup v1: quota of -1 means unlimited
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    try:
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    except ValueError:
+        pass
+    return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    """CPUs this process can use: affinity mask capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    if limit:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def default_workers(root: str = CGROUP_ROOT) -> int:
+    """WEB_CONCURRENCY if set, otherwise one worker per available CPU"""
+    if WEB_CONCURRENCY.strip():
+        return max(1, int(WEB_CONCURRENCY))
+    return available_cpus(root)
+
+
+# ---------- Supervisor ----------
+
+class Supervisor:
+    """Fork workers sharing one listening socket, restart them, and drain them on shutdown"""
+
+    def __init__(self, config: uvicorn.Config, workers: int, graceful_timeout: int = GRACEFUL_TIMEOUT):
+        self.config = config
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children: dict[int, float] = {}
+        self.should_exit = False
+        self.exit_code = 0
+
+    def run(self, preload: bool = PRELOAD) -> int:
+        # Create tables once here rather than racing to do it in every worker's lifespan
+        from app.database import engine, init_db
+        init_db()
+        if preload:
+            self.config.load()
+        # Connections opened so far must not be shared with children
+        engine.dispose()
+        self.socket = self.config.bind_socket()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._handle_exit)
+        logger.info("Starting %d workers on %s:%d (pid %d)", self.workers, self.config.host, self.config.port, os.getpid())
+
+        for _ in range(self.workers):
+            self._spawn()
+        while not self.should_exit:
+            self._reap()
+            time.sleep(0.2)
+        self._shutdown()
+        self.socket.close()
+        return self.exit_code
+
+    def _handle_exit(self, sig, frame) -> None:
+        self.should_exit = True
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:  # worker
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 0
+            try:
+                server = uvicorn.Server(self.config)
+                server.run(sockets=[self.socket])
+                if not server.started:
+                    code = STARTUP_FAILURE
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _reap(self) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.children.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            if self.should_exit:
+                continue
+            if code == STARTUP_FAILURE:
+                # The app cannot start (bad config, database down); restarting would just loop
+                logger.error("Worker %d failed to start, shutting down", pid)
+                self.exit_code = STARTUP_FAILURE
+                self.should_exit = True
+                continue
+            logger.warning("Worker %d exited with code %d, restarting", pid, code)
+            self._spawn()
+
+    def _shutdown(self) -> None:
+        """SIGTERM every worker (uvicorn stops accepting and drains), then SIGKILL stragglers"""
+        for pid in self.children:
+            _kill(pid, signal.SIGTERM)
+        # uvicorn gives in-flight requests graceful_timeout seconds, allow a little slack on top
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                break
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in list(self.children):
+            logger.warning("Worker %d did not drain in time, killing it", pid)
+            _kill(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.children.clear()
+
+
+def _kill(pid: int, sig: int) -> None:
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+# ---------- CLI ----------
+
+def build_config(args: argparse.Namespace) -> uvicorn.Config:
+    return uvicorn.Config(
+        APP,
+        host=args.host,
+        port=args.port,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limit_concurrency,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=args.proxy_headers,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        log_level=args.log_level,
+        access_log=args.access_log,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API with auto-sized uvicorn workers")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: WEB_CONCURRENCY or available CPUs)")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=PRELOAD,
+                        help="import the app before forking workers")
+    parser.add_argument("--backlog", type=int, default=BACKLOG, help="listen() backlog of the shared socket")
+    parser.add_argument("--keep-alive", type=int, default=KEEP_ALIVE, help="idle keep-alive timeout in seconds")
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_TIMEOUT,
+                        help="seconds to drain in-flight requests on shutdown")
+    parser.add_argument("--limit-concurrency", type=int, default=LIMIT_CONCURRENCY,
+                        help="per-worker connection cap; beyond it uvicorn answers 503")
+    parser.add_argument("--proxy-headers", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS"))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args(argv)
+    if args.workers is None:
+        args.workers = default_workers()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    config = build_config(args)
+    if not hasattr(os, "fork"):
+        config.workers = args.workers
+        server = uvicorn.Server(config)
+        if args.workers == 1:
+            server.run()
+        else:
+            from uvicorn.supervisors import Multiprocess
+            Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+        return 0
+    return Supervisor(config, args.workers, args.graceful_timeout).run(preload=args.preload)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Per-request Server-Timing breakdown.
+
+ServerTimingMiddleware starts a RequestTimings accumulator for every HTTP
+request and writes it out as a standard Server-Timing header, e.g.
+
+    Server-Timing: auth;dur=0.41, db;dur=1.93;desc="3 queries", crud;dur=2.60, ser;dur=0.35, app;dur=4.12
+
+The accumulator lives in a context variable, so hooks in security.py,
+crud.py, the SQLAlchemy cursor events and TimedRoute can record into it
+from the threadpool without any plumbing. Outside a request (or when
+SERVER_TIMING_ENABLED=false) every hook is a single context lookup.
+"""
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app import tracing
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+class RequestTimings:
+    """Durations (in seconds) accumulated for the current request"""
+    __slots__ = ("durations", "db_queries", "_depth")
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.db_queries = 0
+        self._depth: dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header_value(self) -> str:
+        parts = []
+        for name, seconds in self.durations.items():
+            entry = f"{name};dur={seconds * 1000:.2f}"
+            if name == "db":
+                entry += f';desc="{self.db_queries} {"query" if self.db_queries == 1 else "queries"}"'
+            parts.append(entry)
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("server_timing", default=None)
+_route: ContextVar[str | None] = ContextVar("route", default=None)
+# Set per request by TimedRoute; the endpoint wrapper appends the time it returned
+_endpoint_done: ContextVar[list[float] | None] = ContextVar("endpoint_done", default=None)
+
+
+def current() -> RequestTimings | None:
+    """Return the timings of the request being served, if any"""
+    return _current.get()
+
+
+def current_route() -> str | None:
+    """Return the matched route of the request being served, e.g. 'GET /api/calculations/{calc_id}'"""
+    return _route.get()
+
+
+class measure:
+    """
+    Context manager adding the elapsed time of its block to the named entry.
+
+    Nested blocks with the same name are only counted once (outermost wins),
+    so crud helpers calling each other do not double count.
+    """
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timings = _current.get()
+
+    def __enter__(self):
+        timings = self.timings
+        if timings is not None:
+            depth = timings._depth.get(self.name, 0)
+            timings._depth[self.name] = depth + 1
+            self.started = time.perf_counter() if depth == 0 else None
+        return self
+
+    def __exit__(self, *exc_info):
+        timings = self.timings
+        if timings is not None:
+            timings._depth[self.name] -= 1
+            if self.started is not None:
+                timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def timed(name: str):
+    """Decorator form of measure() for plain functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with measure(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware emitting the Server-Timing header for every HTTP response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                timings.add("app", time.perf_counter() - started)
+                MutableHeaders(scope=message).append("Server-Timing", timings.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+
+# ---------- Serialization timing ----------
+
+def _timed_endpoint(endpoint):
+    """Wrap an endpoint in a trace span and record the moment it returns"""
+    if getattr(endpoint, "_server_timed", False):
+        return endpoint
+    span_name = f"endpoint {endpoint.__name__}"
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            with tracing.span(span_name):
+                result = await endpoint(*args, **kwargs)
+            _mark_endpoint_done()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            with tracing.span(span_name):
+                result = endpoint(*args, **kwargs)
+            _mark_endpoint_done()
+            return result
+
+    wrapper._server_timed = True
+    return wrapper
+
+
+def _mark_endpoint_done() -> None:
+    done = _endpoint_done.get()
+    if done is not None:
+        done.append(time.perf_counter())
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute reporting response serialization as the "ser" Server-Timing entry
+    and as a "serialize" trace span, with the whole handler traced as a
+    "route" span. It also exposes the matched route to current_route() while
+    it is handled.
+
+    Serialization is everything between the endpoint returning and the route
+    handler producing a Response: response_model validation, JSON encoding
+    and rendering.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            route = f"{request.method} {self.path_format}"
+            done: list[float] = []
+            route_token = _route.set(route)
+            done_token = _endpoint_done.set(done)
+            try:
+                with tracing.span(f"route {route}"):
+                    response = await handler(request)
+                    if done:
+                        serialization = time.perf_counter() - done[0]
+                        now = time.time_ns()
+                        tracing.record_span("serialize", now - int(serialization * 1e9), now)
+            finally:
+                _route.reset(route_token)
+                _endpoint_done.reset(done_token)
+            timings = _current.get()
+            if timings is not None and done:
+                timings.add("ser", serialization)
+            return response
+
+        return timed_handler
+
+
+# ---------- SQLAlchemy instrumentation ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("server_timing_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    starts = conn.info.get("server_timing_start")
+    if timings is not None and starts:
+        timings.add("db", time.perf_counter() - starts.pop())
+        timings.db_queries += 1
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("server_timing_start"):
+        conn.info["server_timing_start"].pop()
+
+
+def instrument_sqlalchemy() -> None:
+    """Attribute statement time to the current request for every Engine (idempotent)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
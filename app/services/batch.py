@@ -0,0 +1,112 @@
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.services.importer import describe_error
+
+# Status reported for operations skipped or undone because an atomic batch was aborted
+NOT_EXECUTED = 424
+
+
+class BatchOperationError(Exception):
+    """A single batch operation failed with an HTTP-like status code"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def run_batch(db: Session, user_id: int, batch: schemas.BatchRequest) -> dict:
+    """
+    Run the batch operations in order inside a single transaction.
+
+    Nothing is committed until every operation ran. In atomic mode the first
+    failure rolls the whole batch back; in best_effort mode each operation
+    gets its own savepoint so only the failing one is undone.
+    """
+    atomic = batch.mode == "atomic"
+    results = []
+    for index, operation in enumerate(batch.operations):
+        savepoint = None if atomic else db.begin_nested()
+        try:
+            status_code, data = _apply(db, user_id, operation)
+        except (BatchOperationError, SQLAlchemyError) as exc:
+            failure = _failure(index, operation, exc)
+            if atomic:
+                db.rollback()
+                # The earlier operations ran but were rolled back with the rest
+                results = [
+                    {
+                        "index": done["index"],
+                        "op": done["op"],
+                        "status": NOT_EXECUTED,
+                        "error": "Rolled back because a later operation failed",
+                    }
+                    for done in results
+                ]
+                results.append(failure)
+                results.extend(
+                    {
+                        "index": skipped_index,
+                        "op": skipped.op,
+                        "status": NOT_EXECUTED,
+                        "error": "Not executed because an earlier operation failed",
+                    }
+                    for skipped_index, skipped in enumerate(batch.operations[index + 1:], start=index + 1)
+                )
+                return {"mode": batch.mode, "committed": False, "results": results}
+            savepoint.rollback()
+            results.append(failure)
+            continue
+        if savepoint is not None:
+            savepoint.commit()
+        results.append({"index": index, "op": operation.op, "status": status_code, "data": data})
+
+    db.commit()
+    return {"mode": batch.mode, "committed": True, "results": results}
+
+
+def _apply(db: Session, user_id: int, operation: schemas.BatchOperation) -> tuple[int, schemas.CalculationRead | None]:
+    if operation.op == "create":
+        calc_in = _validate(schemas.CalculationCreate, operation.data)
+        calc = models.Calculation(a=calc_in.a, b=calc_in.b, type=calc_in.type.value, user_id=user_id)
+        db.add(calc)
+        db.flush()
+        return 201, schemas.CalculationRead.model_validate(calc)
+
+    calc = crud.get_calculation_by_id_and_user(db, operation.id, user_id)
+    if not calc:
+        raise BatchOperationError(404, "Calculation not found or you don't have permission to access it")
+
+    if operation.op == "read":
+        return 200, schemas.CalculationRead.model_validate(calc)
+
+    if operation.op == "update":
+        calc_in = _validate(schemas.CalculationUpdate, operation.data)
+        for field, value in calc_in.model_dump(exclude_unset=True).items():
+            setattr(calc, field, value.value if isinstance(value, schemas.CalcType) else value)
+        if calc.type == schemas.CalcType.Divide.value and calc.b == 0:
+            raise BatchOperationError(422, "Divisor (b) cannot be zero for Divide operation")
+        db.flush()
+        return 200, schemas.CalculationRead.model_validate(calc)
+
+    db.delete(calc)
+    db.flush()
+    return 204, None
+
+
+def _validate(schema, data: dict):
+    try:
+        return schema.model_validate(data)
+    except ValidationError as exc:
+        raise BatchOperationError(422, describe_error(exc))
+
+
+def _failure(index: int, operation: schemas.BatchOperation, exc: Exception) -> dict:
+    if isinstance(exc, BatchOperationError):
+        status_code, detail = exc.status_code, exc.detail
+    else:
+        status_code, detail = 500, f"Database error: {exc.__class__.__name__}"
+    return {"index": index, "op": operation.op, "status": status_code, "error": detail}
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from app.services.factory import CalculationFactory
+
+EXPORT_FIELDS = ("id", "a", "b", "type", "user_id", "result")
+
+# Rows are grouped into chunks so the response is not flushed once per row
+CHUNK_ROWS = 500
+
+
+def _result(calc_type: str, a: float, b: float) -> float | None:
+    """Compute the result for a row, or None if the stored operands are invalid"""
+    try:
+        return CalculationFactory.execute(calc_type, a, b)
+    except ValueError:
+        return None
+
+
+def ndjson_chunks(rows: Iterable, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    Serialize (id, a, b, type, user_id) rows as newline-delimited JSON.
+
+    Yields one string per chunk of rows, never the whole export.
+    """
+    dumps = json.dumps
+    lines = []
+    for calc_id, a, b, calc_type, user_id in rows:
+        lines.append(dumps({
+            "id": calc_id,
+            "a": a,
+            "b": b,
+            "type": calc_type,
+            "user_id": user_id,
+            "result": _result(calc_type, a, b),
+        }))
+        if len(lines) >= chunk_rows:
+            lines.append("")
+            yield "\n".join(lines)
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines)
+
+
+def csv_chunks(rows: Iterable, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """Serialize (id, a, b, type, user_id) rows as CSV with a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for calc_id, a, b, calc_type, user_id in rows:
+        writer.writerow((calc_id, a, b, calc_type, user_id, _result(calc_type, a, b)))
+        count += 1
+        if count >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    # Always emit the remainder (at least the header for an empty export)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Compress text chunks on the fly into a single gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
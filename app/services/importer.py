@@ -0,0 +1,207 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+DEFAULT_BATCH_SIZE = 1000
+# Only the first errors are kept so a bad file cannot grow the report without bound
+MAX_REPORTED_ERRORS = 100
+# Longest line accepted from a streamed body; longer lines are reported and skipped
+MAX_LINE_LENGTH = 1024 * 1024
+# Most bytes one gzip chunk is inflated into at a time
+INFLATE_CHUNK_SIZE = 64 * 1024
+
+
+class CalculationImporter:
+    """
+    Validate NDJSON/CSV lines through CalculationCreate and insert them in batches.
+
+    Lines are fed incrementally with feed(); every full batch is inserted and
+    committed in its own transaction, so memory stays bounded by batch_size and
+    a bad line only costs that line instead of the whole file.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        user_id: int | None,
+        fmt: str = "ndjson",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_errors: int = MAX_REPORTED_ERRORS,
+        max_line_length: int = MAX_LINE_LENGTH,
+    ):
+        if fmt not in ("ndjson", "csv"):
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.db = db
+        self.user_id = user_id
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.max_line_length = max_line_length
+        self.line_no = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self.errors_dropped = 0  # error entries past max_errors, not rows
+        self._header: list[str] | None = None
+        self._pending: list[dict] = []
+        self._pending_lines: list[int] = []
+        self._tail = ""  # unfinished last line of the text fed so far
+        self._skipping = False  # dropping the rest of an over-long line
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Parse and validate lines, inserting every time a batch fills up"""
+        for line in lines:
+            self.line_no += 1
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            try:
+                calc = schemas.CalculationCreate.model_validate(self._parse(line))
+            except _HeaderLine:
+                continue
+            except (ValueError, ValidationError) as exc:
+                self._error(self.line_no, describe_error(exc))
+                continue
+            self._pending.append({
+                "a": calc.a,
+                "b": calc.b,
+                "type": calc.type.value,
+                "user_id": self.user_id,
+            })
+            self._pending_lines.append(self.line_no)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def feed_text(self, text: str) -> None:
+        """Feed a piece of a streamed body, holding back the unfinished last line"""
+        if self._skipping:
+            end = text.find("\n")
+            if end < 0:
+                return
+            text = text[end + 1:]
+            self._skipping = False
+        lines = (self._tail + text).split("\n")
+        self._tail = lines.pop()
+        self.feed(lines)
+        if len(self._tail) > self.max_line_length:
+            self.line_no += 1
+            self._error(self.line_no, f"Line longer than {self.max_line_length} characters")
+            self._tail = ""
+            self._skipping = True
+
+    def flush(self) -> None:
+        """Insert pending rows in a single transaction"""
+        if not self._pending:
+            return
+        try:
+            self._insert(self._pending)
+            self.db.commit()
+            self.imported += len(self._pending)
+        except (SQLAlchemyError, self._dbapi_error) as exc:
+            self.db.rollback()
+            first, last = self._pending_lines[0], self._pending_lines[-1]
+            self._error(
+                first,
+                f"Batch of lines {first}-{last} failed: {exc.__class__.__name__}",
+                count=len(self._pending),
+            )
+        self._pending = []
+        self._pending_lines = []
+
+    def finish(self) -> dict:
+        """Flush the last partial batch and return the import report"""
+        if self._tail:
+            self.feed([self._tail])
+            self._tail = ""
+        self.flush()
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_dropped > 0,
+        }
+
+    def _parse(self, line: str) -> dict:
+        if self.fmt == "ndjson":
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            return data
+
+        values = next(csv.reader([line]))
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            raise _HeaderLine()
+        if len(values) != len(self._header):
+            raise ValueError(f"Expected {len(self._header)} columns, got {len(values)}")
+        return dict(zip(self._header, values))
+
+    @property
+    def _dbapi_error(self) -> type[Exception]:
+        # COPY goes through the raw DBAPI cursor, so its errors are not wrapped
+        return getattr(self.db.get_bind().dialect.dbapi, "Error", SQLAlchemyError)
+
+    def _insert(self, rows: list[dict]) -> None:
+        if self.db.get_bind().dialect.driver == "psycopg2":
+            # COPY is several times faster than multi-row INSERT on Postgres
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow((row["a"], row["b"], row["type"], row["user_id"]))
+            buffer.seek(0)
+            with self.db.connection().connection.cursor() as cursor:
+                cursor.copy_expert(
+                    "COPY calculations (a, b, type, user_id) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            return
+        self.db.execute(insert(models.Calculation), rows)
+
+    def _error(self, line_no: int, message: str, count: int = 1) -> None:
+        self.failed += count
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_no, "error": message})
+        else:
+            self.errors_dropped += 1
+
+
+def inflate(inflater, data: bytes, max_length: int = INFLATE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Decompress data in pieces of at most max_length bytes, so a tiny chunk cannot balloon"""
+    while True:
+        piece = inflater.decompress(data, max_length)
+        if piece:
+            yield piece
+        data = inflater.unconsumed_tail
+        if not data and len(piece) < max_length:
+            return
+
+
+def inflate_rest(inflater) -> bytes:
+    """Return what is left in a finished gzip stream; raise zlib.error if it was cut off"""
+    rest = inflater.flush()
+    if not inflater.eof:
+        raise zlib.error("truncated gzip stream")
+    return rest
+
+
+class _HeaderLine(Exception):
+    """Raised internally when a CSV line is consumed as the header"""
+
+
+def describe_error(exc: Exception) -> str:
+    """Flatten a validation or parse error into a single readable message"""
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+            for err in exc.errors()
+        )
+    return str(exc)
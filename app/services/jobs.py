@@ -0,0 +1,569 @@
+"""
+In-process background jobs persisted in the jobs table.
+
+Long-running work (exports, imports, bulk updates and deletes, retention
+sweeps) is queued as a Job row and picked up by a JobRunner: a bounded pool
+of worker threads inside each server process. Because the queue is the
+database, queued jobs survive restarts. A job left "running" by a process
+that died stops getting heartbeats and is queued again after
+JOB_STALE_SECONDS, at most JOB_MAX_ATTEMPTS times.
+
+Workers claim the highest-priority queued job under row locks (SELECT ...
+FOR UPDATE SKIP LOCKED on the job, FOR UPDATE on its user while counting
+the user's running jobs) and a conditional UPDATE, so several processes can
+share one queue. A user's jobs only start while fewer than
+JOB_USER_CONCURRENCY of them are running, so one user's backlog cannot
+occupy every worker. Stale-job recovery writes, so it runs only every
+JOB_RECOVERY_INTERVAL seconds (default JOB_STALE_SECONDS / 2) rather than
+on every poll.
+
+Handlers report progress through JobContext.progress(), which is also where
+cancellation is noticed: once a client asks to cancel, the next progress
+call raises JobCancelled and the job ends as "cancelled".
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app import crud, metrics, models, schemas
+from app.database import SessionLocal
+from app.services import exporter
+from app.services.importer import DEFAULT_BATCH_SIZE, CalculationImporter
+from app.services.retention import RetentionPolicy, sweep
+
+logger = logging.getLogger(__name__)
+
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() not in ("0", "false", "no")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_USER_CONCURRENCY = int(os.getenv("JOB_USER_CONCURRENCY", "1"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+JOB_RECOVERY_INTERVAL = float(os.getenv("JOB_RECOVERY_INTERVAL", str(JOB_STALE_SECONDS / 2)))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "./job_output")
+# Largest decompressed upload POST /api/jobs/import stores
+JOB_MAX_UPLOAD_BYTES = int(os.getenv("JOB_MAX_UPLOAD_BYTES", str(1024 ** 3)))
+
+ACTIVE = ("queued", "running")
+FINISHED = ("succeeded", "failed", "cancelled")
+# Rows per keyset page of an export; progress is reported once per page
+EXPORT_PAGE_ROWS = 5000
+# Lines fed to the importer between progress reports
+IMPORT_FEED_LINES = 1000
+
+# Set when a job is queued, so idle workers of this process start at once
+_work_available = threading.Event()
+
+
+class JobError(Exception):
+    """Fails a job (or rejects its parameters) with a message shown to the user"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation has been requested"""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def output_path(job_id: int, suffix: str) -> str:
+    return os.path.join(JOB_OUTPUT_DIR, f"job-{job_id}.{suffix}")
+
+
+# ---------- Job kinds ----------
+
+@dataclass
+class JobKind:
+    handler: Callable[["JobContext", dict], dict | None]
+    validate: Callable[[dict], None] | None = None
+    admin_only: bool = False
+    # Created only by an upload endpoint, which stores the input file
+    upload_only: bool = False
+
+
+HANDLERS: dict[str, JobKind] = {}
+
+
+def register(kind: str, validate=None, admin_only: bool = False, upload_only: bool = False):
+    """Register the decorated function as the handler of a job kind"""
+    def decorator(handler):
+        HANDLERS[kind] = JobKind(handler, validate, admin_only, upload_only)
+        return handler
+    return decorator
+
+
+class JobContext:
+    """A running job as seen by its handler: parameters, a session, progress and cancellation"""
+
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(self, job: models.Job, db: Session, control: Session):
+        self.job_id = job.id
+        self.user_id = job.user_id
+        self.params = dict(job.params or {})
+        self.db = db
+        # Progress and cancellation use their own session so they never commit the handler's work
+        self._control = control
+        self._last_check = 0.0
+        self._cancel_requested = False
+
+    def progress(self, done: int, total: int | None = None, message: str | None = None,
+                 force: bool = False) -> None:
+        """Record progress (at most every PROGRESS_INTERVAL seconds) and raise JobCancelled if asked to stop"""
+        if force or time.monotonic() - self._last_check >= self.PROGRESS_INTERVAL:
+            values = {"progress_done": done, "heartbeat_at": _now()}
+            if total is not None:
+                values["progress_total"] = total
+            if message is not None:
+                values["message"] = message[:255]
+            self._control.execute(update(models.Job).where(models.Job.id == self.job_id).values(**values))
+            self._control.commit()
+            self._refresh_cancel()
+        if self._cancel_requested:
+            raise JobCancelled()
+
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested (checked at most every PROGRESS_INTERVAL seconds)"""
+        if not self._cancel_requested and time.monotonic() - self._last_check >= self.PROGRESS_INTERVAL:
+            self._refresh_cancel()
+        return self._cancel_requested
+
+    # Lets the context stand in for a threading.Event stop flag (retention.sweep)
+    is_set = cancelled
+
+    def _refresh_cancel(self) -> None:
+        self._last_check = time.monotonic()
+        self._cancel_requested = bool(self._control.scalar(
+            select(models.Job.cancel_requested).where(models.Job.id == self.job_id)
+        ))
+        self._control.rollback()
+
+
+# ---------- Queue operations ----------
+
+def enqueue(
+    db: Session,
+    user_id: int | None,
+    kind: str,
+    params: dict | None = None,
+    priority: int = 0,
+    prepare: Callable[[int], None] | None = None,
+) -> models.Job:
+    """
+    Validate and queue a job; prepare(job_id) runs before the commit (e.g. to store an upload).
+
+    Raises JobError for an unknown kind or invalid parameters.
+    """
+    job_kind = HANDLERS.get(kind)
+    if job_kind is None:
+        raise JobError(f"Unknown job kind {kind!r}; choose from {', '.join(sorted(HANDLERS))}")
+    params = params or {}
+    if job_kind.validate:
+        job_kind.validate(params)
+    job = models.Job(user_id=user_id, kind=kind, params=params, priority=priority, status="queued")
+    db.add(job)
+    db.flush()
+    try:
+        if prepare:
+            prepare(job.id)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    db.refresh(job)
+    _work_available.set()
+    return job
+
+
+def get_job(db: Session, job_id: int, user_id: int | None) -> models.Job | None:
+    """A job by id, only if it belongs to user_id"""
+    return db.scalar(select(models.Job).where(models.Job.id == job_id, models.Job.user_id == user_id))
+
+
+def list_jobs(db: Session, user_id: int, limit: int = 50) -> list[models.Job]:
+    """A user's most recent jobs, newest first"""
+    return list(db.scalars(
+        select(models.Job).where(models.Job.user_id == user_id).order_by(models.Job.id.desc()).limit(limit)
+    ))
+
+
+def request_cancel(db: Session, job: models.Job) -> models.Job:
+    """Cancel a queued job now, or ask a running one to stop at its next progress report"""
+    job_table = models.Job
+    cancelled = db.execute(
+        update(job_table)
+        .where(job_table.id == job.id, job_table.status == "queued")
+        .values(status="cancelled", cancel_requested=True, finished_at=_now())
+    ).rowcount
+    if not cancelled:
+        db.execute(
+            update(job_table)
+            .where(job_table.id == job.id, job_table.status == "running")
+            .values(cancel_requested=True)
+        )
+    db.commit()
+    db.refresh(job)
+    if cancelled:
+        metrics.JOBS_FINISHED.labels(job.kind, "cancelled").inc()
+    return job
+
+
+def delete_job(db: Session, job: models.Job) -> None:
+    """Delete a finished job and its files"""
+    for suffix in ("input", *(f"{fmt}{gz}" for fmt in ("ndjson", "csv") for gz in ("", ".gz"))):
+        try:
+            os.remove(output_path(job.id, suffix))
+        except FileNotFoundError:
+            pass
+    db.delete(job)
+    db.commit()
+
+
+def claim_next(db: Session, user_concurrency: int = JOB_USER_CONCURRENCY) -> int | None:
+    """Atomically mark the next eligible queued job as running and return its id"""
+    job_table = models.Job
+    running = aliased(models.Job)
+    running_for_user = (
+        select(func.count(running.id))
+        .where(running.user_id == job_table.user_id, running.status == "running")
+        .scalar_subquery()
+    )
+    eligible = (job_table.status == "queued", or_(job_table.user_id.is_(None), running_for_user < user_concurrency))
+    candidates = db.scalars(
+        select(job_table.id).where(*eligible).order_by(job_table.priority.desc(), job_table.id).limit(10)
+    ).all()
+    for job_id in candidates:
+        # Skip jobs another worker is claiming right now instead of waiting for it
+        job = db.execute(
+            select(job_table.id, job_table.user_id)
+            .where(job_table.id == job_id, job_table.status == "queued")
+            .with_for_update(skip_locked=True)
+        ).first()
+        if job is None:
+            db.rollback()
+            continue
+        if job.user_id is not None:
+            # Two workers claiming different jobs of one user would each count the other's claim
+            # as not yet running (READ COMMITTED); the user row lock makes them take turns
+            db.execute(select(models.User.id).where(models.User.id == job.user_id).with_for_update())
+            running_now = db.scalar(
+                select(func.count(job_table.id)).where(job_table.user_id == job.user_id, job_table.status == "running")
+            )
+            if running_now >= user_concurrency:
+                db.rollback()
+                continue
+        now = _now()
+        # The same conditions again, for databases without row locks (SQLite serializes writes instead)
+        claimed = db.execute(
+            update(job_table)
+            .where(job_table.id == job_id, *eligible)
+            .values(status="running", started_at=now, heartbeat_at=now, attempts=job_table.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return job_id
+    db.rollback()
+    return None
+
+
+def recover_stale(db: Session, stale_seconds: float = JOB_STALE_SECONDS,
+                  max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+    """Requeue running jobs whose process stopped sending heartbeats; fail those out of attempts"""
+    job_table = models.Job
+    cutoff = _now() - timedelta(seconds=stale_seconds)
+    stale = (job_table.status == "running", job_table.heartbeat_at < cutoff)
+    failed = db.execute(
+        update(job_table)
+        .where(*stale, job_table.attempts >= max_attempts)
+        .values(status="failed", error="Worker stopped while running the job", finished_at=_now())
+    ).rowcount
+    requeued = db.execute(
+        update(job_table).where(*stale).values(status="queued", message="Requeued after worker stopped")
+    ).rowcount
+    db.commit()
+    if requeued or failed:
+        logger.warning("Requeued %d and failed %d stale jobs", requeued, failed)
+    return requeued + failed
+
+
+def run_job(job_id: int, session_factory=SessionLocal) -> str:
+    """Run a claimed job to completion and return its final status"""
+    db, control = session_factory(), session_factory()
+    started = time.perf_counter()
+    kind = "unknown"
+    try:
+        job = db.get(models.Job, job_id)
+        kind = job.kind
+        context = JobContext(job, db, control)
+        values = {}
+        try:
+            if job.cancel_requested:
+                raise JobCancelled()
+            result = HANDLERS[kind].handler(context, context.params)
+            db.commit()
+            # Progress reports are throttled, so the last one may be behind
+            values = {
+                "status": "succeeded",
+                "result": result,
+                "progress_done": func.coalesce(models.Job.progress_total, models.Job.progress_done),
+            }
+        except JobCancelled:
+            db.rollback()
+            values = {"status": "cancelled"}
+        except (JobError, ValidationError, ValueError) as exc:
+            db.rollback()
+            values = {"status": "failed", "error": str(exc)}
+        except HTTPException as exc:
+            db.rollback()
+            values = {"status": "failed", "error": str(exc.detail)}
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Job %d (%s) failed", job_id, kind)
+            values = {"status": "failed", "error": f"Internal error: {exc.__class__.__name__}"}
+        control.execute(
+            update(models.Job).where(models.Job.id == job_id).values(finished_at=_now(), **values)
+        )
+        control.commit()
+        status = values["status"]
+    finally:
+        db.close()
+        control.close()
+    metrics.JOBS_FINISHED.labels(kind, status).inc()
+    metrics.JOB_DURATION.labels(kind).observe(time.perf_counter() - started)
+    return status
+
+
+# ---------- Runner ----------
+
+class JobRunner:
+    """Worker threads that claim and run queued jobs, plus one thread for heartbeats and recovery"""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        session_factory=SessionLocal,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        user_concurrency: int = JOB_USER_CONCURRENCY,
+        stale_seconds: float = JOB_STALE_SECONDS,
+        recovery_interval: float = JOB_RECOVERY_INTERVAL,
+    ):
+        self.workers = workers
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.user_concurrency = user_concurrency
+        self.stale_seconds = stale_seconds
+        self.recovery_interval = recovery_interval
+        self._stop_event = threading.Event()
+        self._running: set[int] = set()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+        self._threads = [threading.Thread(target=self._maintain, name="job-maintenance", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float | None = 5) -> None:
+        """Stop claiming jobs; jobs still running after timeout are requeued by the next process"""
+        self._stop_event.set()
+        _work_available.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_next(self) -> bool:
+        """Claim and run one job in the calling thread; False if none was eligible"""
+        db = self.session_factory()
+        try:
+            job_id = claim_next(db, self.user_concurrency)
+        finally:
+            db.close()
+        if job_id is None:
+            return False
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            run_job(job_id, self.session_factory)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+        return True
+
+    def _work(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Job worker failed to claim a job")
+            _work_available.wait(self.poll_interval)
+            _work_available.clear()
+
+    def _maintain(self) -> None:
+        # Recover once at startup (jobs left by a process that died), then every recovery_interval
+        next_recovery = time.monotonic()
+        while not self._stop_event.wait(self.poll_interval):
+            db = self.session_factory()
+            try:
+                with self._lock:
+                    running = list(self._running)
+                if running:
+                    # Handlers without progress reports still show they are alive
+                    db.execute(update(models.Job).where(models.Job.id.in_(running)).values(heartbeat_at=_now()))
+                    db.commit()
+                if time.monotonic() >= next_recovery:
+                    next_recovery = time.monotonic() + self.recovery_interval
+                    recover_stale(db, self.stale_seconds)
+            except Exception:
+                logger.exception("Job maintenance failed")
+            finally:
+                db.close()
+
+
+def start_background_runner() -> JobRunner | None:
+    """Start the job runner unless JOBS_ENABLED=false"""
+    if not JOBS_ENABLED or JOB_WORKERS < 1:
+        return None
+    runner = JobRunner()
+    runner.start()
+    return runner
+
+
+# ---------- Handlers ----------
+
+def _validate_format(params: dict) -> None:
+    if params.get("format", "ndjson") not in ("ndjson", "csv"):
+        raise JobError("format must be 'ndjson' or 'csv'")
+
+
+@register("export", validate=_validate_format)
+def export_calculations(ctx: JobContext, params: dict) -> dict:
+    """Write the user's calculations to a file served by GET /api/jobs/{id}/download"""
+    fmt = params.get("format", "ndjson")
+    compress = bool(params.get("gzip"))
+    calc = models.Calculation
+    total = ctx.db.scalar(select(func.count(calc.id)).where(calc.user_id == ctx.user_id))
+    ctx.progress(0, total, force=True)
+    done = 0
+
+    def rows():
+        nonlocal done
+        after_id = 0
+        while True:
+            page = list(crud.iter_calculation_rows(ctx.db, ctx.user_id, after_id=after_id, limit=EXPORT_PAGE_ROWS))
+            if not page:
+                return
+            yield from page
+            done += len(page)
+            after_id = page[-1][0]
+            ctx.progress(done, total)
+
+    chunks = exporter.csv_chunks(rows()) if fmt == "csv" else exporter.ndjson_chunks(rows())
+    path = output_path(ctx.job_id, f"{fmt}.gz" if compress else fmt)
+    partial = path + ".partial"
+    try:
+        with open(partial, "wb") as fh:
+            for chunk in exporter.gzip_chunks(chunks) if compress else (c.encode("utf-8") for c in chunks):
+                fh.write(chunk)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return {"rows": done, "bytes": os.path.getsize(path), "download": f"/api/jobs/{ctx.job_id}/download"}
+
+
+@register("import", validate=_validate_format, upload_only=True)
+def import_calculations(ctx: JobContext, params: dict) -> dict:
+    """Import the NDJSON/CSV file uploaded with the job"""
+    path = output_path(ctx.job_id, "input")
+    if not os.path.exists(path):
+        raise JobError("The uploaded file is missing")
+    importer = CalculationImporter(
+        ctx.db, ctx.user_id, fmt=params.get("format", "ndjson"),
+        batch_size=int(params.get("batch_size", DEFAULT_BATCH_SIZE)),
+    )
+    total = os.path.getsize(path)
+    done = 0
+    with open(path, "rb") as fh:
+        lines = []
+        for raw in fh:
+            done += len(raw)
+            lines.append(raw.decode("utf-8", errors="replace"))
+            if len(lines) >= IMPORT_FEED_LINES:
+                importer.feed(lines)
+                lines = []
+                ctx.progress(done, total, message=f"{importer.imported} imported")
+        importer.feed(lines)
+    report = importer.finish()
+    os.remove(path)
+    return report
+
+
+def _validate_bulk_update(params: dict) -> None:
+    try:
+        schemas.CalculationBulkUpdate.model_validate(params)
+    except ValidationError as exc:
+        raise JobError(f"Invalid bulk_update params: {exc.errors()[0]['msg']}")
+
+
+def _validate_bulk_delete(params: dict) -> None:
+    try:
+        schemas.CalculationFilter.model_validate(params)
+    except ValidationError as exc:
+        raise JobError(f"Invalid bulk_delete params: {exc.errors()[0]['msg']}")
+
+
+@register("bulk_update", validate=_validate_bulk_update)
+def bulk_update(ctx: JobContext, params: dict) -> dict:
+    """Apply a partial update to every matching calculation (same body as /api/calculations/bulk-update)"""
+    bulk = schemas.CalculationBulkUpdate.model_validate(params)
+    affected = crud.bulk_update_calculations(ctx.db, ctx.user_id, bulk.filter, bulk.update)
+    ctx.progress(affected, affected, force=True)
+    return {"affected": affected}
+
+
+@register("bulk_delete", validate=_validate_bulk_delete)
+def bulk_delete(ctx: JobContext, params: dict) -> dict:
+    """Delete every matching calculation (same body as /api/calculations/bulk-delete)"""
+    affected = crud.bulk_delete_calculations(ctx.db, ctx.user_id, schemas.CalculationFilter.model_validate(params))
+    ctx.progress(affected, affected, force=True)
+    return {"affected": affected}
+
+
+def _retention_policy(params: dict) -> RetentionPolicy:
+    if not params:
+        policy = RetentionPolicy.from_env()
+    else:
+        try:
+            policy = RetentionPolicy(**params)
+        except TypeError as exc:
+            raise JobError(f"Invalid retention params: {exc}")
+    if policy.mode not in ("archive", "purge"):
+        raise JobError("mode must be 'archive' or 'purge'")
+    if not policy.enabled:
+        raise JobError("Set max_age_days or max_rows_per_user (or the RETENTION_* settings)")
+    return policy
+
+
+@register("retention", validate=_retention_policy, admin_only=True)
+def retention_sweep(ctx: JobContext, params: dict) -> dict:
+    """Run one retention sweep; cancellation stops it between batches"""
+    retired = sweep(ctx.db, _retention_policy(params), stop=ctx)
+    if ctx.cancelled():
+        raise JobCancelled()
+    return {"retired": retired}
+
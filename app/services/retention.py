@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    How long calculations stay in the live table.
+
+    Rows older than max_age_days, or beyond the newest max_rows_per_user of a
+    user, are moved to calculations_archive (mode="archive") or deleted
+    (mode="purge"). Work is done batch_size rows per transaction with a
+    pause in between so the sweep never holds long locks.
+    """
+    max_age_days: int | None = None
+    max_rows_per_user: int | None = None
+    mode: str = "archive"
+    batch_size: int = 500
+    pause_seconds: float = 0.05
+    interval_seconds: float = 3600
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age_days is not None or self.max_rows_per_user is not None
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Build the policy from RETENTION_* environment variables"""
+        mode = os.getenv("RETENTION_MODE", "archive")
+        if mode not in ("archive", "purge"):
+            raise ValueError(f"RETENTION_MODE must be 'archive' or 'purge', got {mode!r}")
+        return cls(
+            max_age_days=_env_int("RETENTION_MAX_AGE_DAYS"),
+            max_rows_per_user=_env_int("RETENTION_MAX_ROWS_PER_USER"),
+            mode=mode,
+            batch_size=_env_int("RETENTION_BATCH_SIZE") or 500,
+            pause_seconds=float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.05")),
+            interval_seconds=float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600")),
+        )
+
+
+def sweep(
+    db: Session,
+    policy: RetentionPolicy,
+    now: datetime | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Apply the retention policy once and return how many rows were moved or purged.
+
+    Each batch is committed on its own; stop can interrupt the sweep between batches.
+    """
+    calc = models.Calculation
+    total = 0
+
+    def drain(ids_query) -> None:
+        nonlocal total
+        while not (stop and stop.is_set()):
+            ids = list(db.scalars(ids_query.limit(policy.batch_size)))
+            if not ids:
+                return
+            total += _retire(db, ids, policy.mode)
+            if policy.pause_seconds:
+                time.sleep(policy.pause_seconds)
+
+    if policy.max_age_days is not None:
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=policy.max_age_days)
+        drain(select(calc.id).where(calc.created_at < cutoff).order_by(calc.id))
+
+    if policy.max_rows_per_user is not None:
+        over_limit = db.scalars(
+            select(calc.user_id)
+            .where(calc.user_id.is_not(None))
+            .group_by(calc.user_id)
+            .having(func.count(calc.id) > policy.max_rows_per_user)
+        ).all()
+        db.rollback()  # end the read transaction before the batched writes
+        for user_id in over_limit:
+            # Everything past the newest max_rows_per_user rows is retired
+            drain(
+                select(calc.id)
+                .where(calc.user_id == user_id)
+                .order_by(calc.created_at.desc(), calc.id.desc())
+                .offset(policy.max_rows_per_user)
+            )
+
+    return total
+
+
+def _retire(db: Session, ids: list[int], mode: str) -> int:
+    calc = models.Calculation
+    if mode == "archive":
+        archive = models.CalculationArchive
+        db.execute(
+            insert(archive).from_select(
+                ["id", "a", "b", "type", "user_id", "created_at", "archived_at"],
+                select(calc.id, calc.a, calc.b, calc.type, calc.user_id, calc.created_at,
+                       literal(datetime.now(timezone.utc), archive.archived_at.type))
+                .where(calc.id.in_(ids)),
+            )
+        )
+    result = db.execute(
+        delete(calc).where(calc.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+class RetentionWorker(threading.Thread):
+    """Background thread that runs the retention sweep every interval_seconds"""
+
+    def __init__(self, policy: RetentionPolicy, session_factory=SessionLocal):
+        super().__init__(name="retention-worker", daemon=True)
+        self.policy = policy
+        self.session_factory = session_factory
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            db = self.session_factory()
+            try:
+                retired = sweep(db, self.policy, stop=self._stop_event)
+                if retired:
+                    logger.info("Retention sweep %sd %d calculations", self.policy.mode, retired)
+            except Exception:
+                logger.exception("Retention sweep failed")
+            finally:
+                db.close()
+            self._stop_event.wait(self.policy.interval_seconds)
+
+    def stop(self, timeout: float | None = 5) -> None:
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def start_background_worker(policy: RetentionPolicy | None = None) -> RetentionWorker | None:
+    """Start the retention worker if a policy is configured, otherwise do nothing"""
+    policy = policy or RetentionPolicy.from_env()
+    if not policy.enabled:
+        return None
+    worker = RetentionWorker(policy)
+    worker.start()
+    return worker
@@ -0,0 +1,198 @@
+"""
+Slow-query log with EXPLAIN capture.
+
+SlowQueryLog hooks an Engine's cursor events and appends one JSON line per
+statement slower than SLOW_QUERY_MS to a rotating file. Each entry has the
+statement, its (redacted) parameters and the originating route. The first
+time a statement shape is seen, the query plan is captured too (EXPLAIN
+QUERY PLAN on SQLite, EXPLAIN on PostgreSQL/MySQL), so the log shows
+whether a slow statement scanned a whole table.
+
+Summarise the log with:
+
+    python -m app.tools.slow_queries logs/slow_queries.jsonl
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from app import server_timing
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "true").lower() not in ("0", "false", "no")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "./logs/slow_queries.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+REDACTED = "[REDACTED]"
+# Modular crypt format hashes such as $pbkdf2-sha256$29000$... or $2b$12$...
+_HASH_PATTERN = re.compile(r"^\$[a-z0-9-]+\$")
+_SENSITIVE_KEYS = ("password", "hash", "secret", "token")
+_MAX_PARAM_LENGTH = 200
+_MAX_PARAM_SETS = 5
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+# SQLite "SCAN calculations" (no index) / PostgreSQL "Seq Scan on calculations"
+_FULL_SCAN = re.compile(r"^SCAN (TABLE )?\w+$|Seq Scan on", re.MULTILINE)
+
+
+def fingerprint(statement: str) -> str:
+    """Identify a statement's shape, ignoring whitespace and IN-list / VALUES lengths"""
+    shape = " ".join(statement.split())
+    shape = re.sub(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)", "(?)", shape)
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+def _redact_value(key, value):
+    if isinstance(key, str) and any(word in key.lower() for word in _SENSITIVE_KEYS):
+        return REDACTED
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str):
+        if _HASH_PATTERN.match(value):
+            return REDACTED
+        if len(value) > _MAX_PARAM_LENGTH:
+            return value[:_MAX_PARAM_LENGTH] + "…"
+        return value
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def redact(parameters):
+    """Make statement parameters JSON-safe, hiding password hashes and secrets"""
+    if isinstance(parameters, dict):
+        return {key: _redact_value(key, value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(None, value) for value in parameters]
+    return _redact_value(None, parameters)
+
+
+def explain(dialect_name: str, dbapi_connection, statement: str, parameters,
+            prefer_indexes: bool = False) -> list[str] | None:
+    """
+    Return the query plan of a statement as a list of lines, or None if the
+    dialect/statement cannot be explained. prefer_indexes disables sequential
+    scans on PostgreSQL, whose planner ignores indexes on tiny tables, so the
+    plan shows whether a usable index exists at all.
+    """
+    prefix = _EXPLAIN_PREFIX.get(dialect_name)
+    if prefix is None or not statement.lstrip()[:6].upper().startswith(_EXPLAINABLE):
+        return None
+    # A separate raw cursor keeps EXPLAIN out of the event hooks and the caller's result
+    explain_cursor = dbapi_connection.cursor()
+    # On PostgreSQL a savepoint keeps a failed EXPLAIN from aborting the caller's
+    # transaction, and rolling back to it undoes SET LOCAL
+    savepoint = dialect_name == "postgresql"
+    try:
+        if savepoint:
+            explain_cursor.execute("SAVEPOINT explain_plan")
+            if prefer_indexes:
+                explain_cursor.execute("SET LOCAL enable_seqscan = off")
+        explain_cursor.execute(prefix + statement, parameters or ())
+        return [str(row[-1]) for row in explain_cursor.fetchall()]
+    except Exception as exc:  # the plan is best effort; never fail the query
+        return [f"EXPLAIN failed: {exc.__class__.__name__}: {exc}"]
+    finally:
+        if savepoint:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT explain_plan")
+            explain_cursor.execute("RELEASE SAVEPOINT explain_plan")
+        explain_cursor.close()
+
+
+def is_full_scan(plan: list[str] | None) -> bool:
+    """Whether a plan reads a whole table instead of searching an index"""
+    return bool(plan) and bool(_FULL_SCAN.search("\n".join(plan)))
+
+
+class SlowQueryLog:
+    """Log statements slower than threshold_ms from the engines it is installed on"""
+
+    def __init__(self, path: str = SLOW_QUERY_LOG, threshold_ms: float = SLOW_QUERY_MS,
+                 max_bytes: int = SLOW_QUERY_LOG_MAX_BYTES, backups: int = SLOW_QUERY_LOG_BACKUPS):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+        self._logger: logging.Logger | None = None
+
+    def install(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def remove(self, engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
+
+    def close(self) -> None:
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                handler.close()
+                self._logger.removeHandler(handler)
+            self._logger = None
+
+    # ---------- Events ----------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["slow_query_start"].pop()
+        if elapsed < self.threshold:
+            return
+        shape = fingerprint(statement)
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(elapsed * 1000, 3),
+            "fingerprint": shape,
+            "route": server_timing.current_route(),
+            "statement": " ".join(statement.split()),
+        }
+        if executemany:
+            entry["parameters"] = [redact(params) for params in parameters[:_MAX_PARAM_SETS]]
+            entry["parameter_sets"] = len(parameters)
+        else:
+            entry["parameters"] = redact(parameters)
+        with self._lock:
+            first_seen = shape not in self._seen
+            self._seen.add(shape)
+        if first_seen:
+            example = parameters[0] if executemany and parameters else parameters
+            entry["plan"] = explain(conn.dialect.name, cursor.connection, statement, example)
+        self._write(entry)
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("slow_query_start"):
+            conn.info["slow_query_start"].pop()
+
+    # ---------- Helpers ----------
+
+    def _write(self, entry: dict) -> None:
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    self._logger = self._build_logger()
+        self._logger.info(json.dumps(entry, default=str))
+
+    def _build_logger(self) -> logging.Logger:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        logger = logging.getLogger(f"app.slow_queries.{id(self)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        return logger
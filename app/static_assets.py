@@ -0,0 +1,131 @@
+"""
+Static file serving with precompressed variants and long-lived caching.
+
+StaticAssets serves the output of `python -m app.tools.build_static`
+(STATIC_BUILD_DIR) and falls back to the source directory (STATIC_DIR), so
+the site works without a build during development:
+
+- A request accepting br or gzip gets the prebuilt .br/.gz variant with
+  Content-Encoding and `Vary: Accept-Encoding`; nothing is compressed per
+  request.
+- Fingerprinted assets (profile.<hash>.js) are sent with
+  `Cache-Control: public, max-age=31536000, immutable`, since a changed
+  file gets a new name.
+- Everything else (HTML) is `Cache-Control: no-cache`: browsers revalidate
+  it each time and get 304 Not Modified while the ETag matches. Built files
+  use their content hash as the ETag, which is the same on every worker and
+  host.
+
+A build whose recorded source hashes no longer match STATIC_DIR is ignored
+(with a warning) rather than serving stale pages.
+"""
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", "build/static")
+MANIFEST = "manifest.json"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings listed in Accept-Encoding, without those refused with q=0"""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def load_manifest(build_dir: str, source_dir: str) -> dict | None:
+    """The build's manifest, or None if there is no build or it is stale"""
+    try:
+        with open(os.path.join(build_dir, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    current = {}
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, "rb") as fh:
+                current[os.path.relpath(path, source_dir)] = hashlib.sha256(fh.read()).hexdigest()
+    recorded = manifest.get("sources", {})
+    if set(current) != set(recorded) or any(
+        not current[name].startswith(digest) for name, digest in recorded.items()
+    ):
+        logger.warning("Static build in %s is stale, serving %s; run python -m app.tools.build_static",
+                       build_dir, source_dir)
+        return None
+    return manifest
+
+
+class StaticAssets(StaticFiles):
+    """StaticFiles serving a fingerprinted, precompressed build first and the sources as fallback"""
+
+    def __init__(self, directory: str = STATIC_DIR, build_directory: str | None = STATIC_BUILD_DIR):
+        super().__init__(directory=directory)
+        self.manifest = load_manifest(build_directory, directory) if build_directory else None
+        self.immutable: set[str] = set()
+        self.etags: dict[str, str] = {}
+        if self.manifest is not None:
+            self.all_directories.insert(0, build_directory)
+            self.immutable = set(self.manifest["assets"].values())
+            self.etags = {
+                os.path.abspath(os.path.join(build_directory, name)): f'"{digest}"'
+                for name, digest in self.manifest["files"].items()
+            }
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        media_type = mimetypes.guess_type(name)[0] or "text/plain"
+        headers = {"cache-control": IMMUTABLE if name in self.immutable else REVALIDATE}
+
+        if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+            headers["vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in ENCODINGS:
+                if encoding in accepted and os.path.isfile(full_path + suffix):
+                    full_path = full_path + suffix
+                    stat_result = os.stat(full_path)
+                    headers["content-encoding"] = encoding
+                    break
+
+        etag = self.etags.get(os.path.abspath(full_path))
+        if etag:
+            headers["etag"] = etag
+        response = FileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
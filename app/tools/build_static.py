@@ -0,0 +1,136 @@
+"""
+Build the static directory for production: fingerprinted, precompressed assets.
+
+    static/profile.js    ->  build/static/profile.<hash>.js (+ .gz, .br)
+    static/profile.html  ->  build/static/profile.html (+ .gz, .br), with
+                             /static/profile.js rewritten to the hashed name
+
+Scripts and stylesheets get their content hash in the file name, so they can
+be cached forever (Cache-Control: immutable) and a changed file is a new URL.
+HTML keeps its name (pages are linked and bookmarked) and is revalidated
+with ETag instead. Every text file also gets gzip and, if the brotli package
+is installed, brotli variants that app.static_assets serves by
+Accept-Encoding without compressing per request.
+
+manifest.json records the hashed names, a content hash per output file (used
+as its ETag) and the hash of every source file, which lets the server notice
+a build that no longer matches the sources. The build is written to a
+temporary directory and swapped in at the end.
+
+Usage:
+    python -m app.tools.build_static
+    python -m app.tools.build_static --src static --out build/static
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built without it
+    brotli = None
+
+from app.static_assets import MANIFEST, STATIC_BUILD_DIR, STATIC_DIR
+
+FINGERPRINTED = (".js", ".css")
+COMPRESSIBLE = (".html", ".js", ".css", ".json", ".svg", ".txt")
+HASH_LENGTH = 12
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def fingerprinted_name(name: str, data: bytes) -> str:
+    """profile.js -> profile.<hash>.js"""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{content_hash(data)}{ext}"
+
+
+def rewrite_references(text: str, assets: dict[str, str]) -> str:
+    """Point /static/<name> references at the fingerprinted names"""
+    for name, hashed in assets.items():
+        text = re.sub(rf"(?<=/static/){re.escape(name)}(?![\w.-])", hashed, text)
+    return text
+
+
+def compressed_variants(data: bytes) -> dict[str, bytes]:
+    """gzip (and brotli) encodings of data, keeping only those that are smaller"""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+
+def build(src: str = STATIC_DIR, out: str = STATIC_BUILD_DIR) -> dict:
+    """Build src into out and return the manifest"""
+    names = sorted(
+        os.path.relpath(os.path.join(root, name), src)
+        for root, _, files in os.walk(src) for name in files
+    )
+    sources = {}
+    for name in names:
+        with open(os.path.join(src, name), "rb") as fh:
+            sources[name] = fh.read()
+
+    assets = {
+        name: fingerprinted_name(name, data) for name, data in sources.items() if name.endswith(FINGERPRINTED)
+    }
+    outputs = {}
+    for name, data in sources.items():
+        if name.endswith(".html"):
+            data = rewrite_references(data.decode("utf-8"), assets).encode("utf-8")
+        outputs[assets.get(name, name)] = data
+
+    staging = out.rstrip("/\\") + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    files = {}
+    for name, data in outputs.items():
+        variants = {"": data}
+        if name.endswith(COMPRESSIBLE):
+            variants.update(compressed_variants(data))
+        for suffix, body in variants.items():
+            path = os.path.join(staging, name + suffix)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(body)
+            files[name + suffix] = content_hash(body)
+
+    manifest = {
+        "assets": assets,
+        "files": files,
+        "sources": {name: content_hash(data) for name, data in sources.items()},
+    }
+    with open(os.path.join(staging, MANIFEST), "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    shutil.rmtree(out, ignore_errors=True)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    os.replace(staging, out)
+    return manifest
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    parser.add_argument("--src", default=STATIC_DIR)
+    parser.add_argument("--out", default=STATIC_BUILD_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = build(args.src, args.out)
+    for name, hashed in manifest["assets"].items():
+        print(f"{name} -> {hashed}")
+    sizes = {name: os.path.getsize(os.path.join(args.out, name)) for name in manifest["files"]}
+    raw = sum(size for name, size in sizes.items() if not name.endswith((".gz", ".br")))
+    gz = sum(sizes.get(name + ".gz", size) for name, size in sizes.items() if not name.endswith((".gz", ".br")))
+    print(f"Built {len(manifest['sources'])} files into {args.out}: {raw} bytes, {gz} gzipped"
+          + ("" if brotli else " (install brotli for .br variants)"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
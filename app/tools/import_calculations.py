@@ -0,0 +1,61 @@
+"""
+Bulk import calculations from an NDJSON or CSV file.
+
+Usage:
+    python -m app.tools.import_calculations calculations.ndjson --email user@example.com
+    python -m app.tools.import_calculations history.csv.gz --email user@example.com --batch-size 5000
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+
+from app import crud
+from app.database import SessionLocal
+from app.services.importer import CalculationImporter, DEFAULT_BATCH_SIZE
+
+
+def _detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "ndjson"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import calculations from NDJSON/CSV")
+    parser.add_argument("path", help="File to import (.ndjson, .csv, optionally .gz)")
+    parser.add_argument("--email", required=True, help="Owner of the imported calculations")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, args.email)
+        if not user:
+            print(f"No user with email {args.email}", file=sys.stderr)
+            return 1
+
+        importer = CalculationImporter(
+            db,
+            user.id,
+            fmt=args.format or _detect_format(args.path),
+            batch_size=args.batch_size,
+        )
+        opener = gzip.open if args.path.endswith(".gz") else open
+        started = time.perf_counter()
+        with opener(args.path, "rt", encoding="utf-8") as handle:
+            importer.feed(handle)
+        report = importer.finish()
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    report["seconds"] = round(elapsed, 3)
+    report["rows_per_sec"] = round(report["imported"] / elapsed) if elapsed else None
+    print(json.dumps(report, indent=2))
+    return 0 if not report["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
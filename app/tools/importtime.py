@@ -0,0 +1,126 @@
+"""
+Report where a module's import time goes (a summary of `python -X importtime`).
+
+Imports the module in a fresh interpreter with -X importtime and prints the
+packages with the most self time (summed over their submodules) and the
+modules with the largest cumulative time. Use it to find dependencies worth
+loading lazily; see app.warmup for loading them before a worker is ready.
+
+Usage:
+    python -m app.tools.importtime
+    python -m app.tools.importtime app.main --top 15 --runs 5
+    python -m app.tools.importtime --budget-ms 1500    # exit 1 if slower
+    python -m app.tools.importtime --json > imports.json
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+
+LINE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse(lines) -> list[ImportRecord]:
+    """Parse -X importtime output, skipping the header and unrelated stderr lines"""
+    records = []
+    for line in lines:
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # One space after "|", then two per nesting level
+            records.append(ImportRecord(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def measure(module: str, python: str = sys.executable) -> list[ImportRecord]:
+    """Import module in a fresh interpreter and return its import-time records"""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    return parse(proc.stderr.splitlines())
+
+
+def total_us(records: list[ImportRecord], module: str) -> int:
+    """Cumulative import time of module itself (excludes interpreter startup)"""
+    for record in records:
+        if record.name == module and record.depth == 0:
+            return record.cumulative_us
+    return sum(record.self_us for record in records)
+
+
+def by_package(records: list[ImportRecord]) -> dict[str, int]:
+    """Self time summed per top-level package, largest first"""
+    packages: dict[str, int] = {}
+    for record in records:
+        package = record.name.split(".")[0]
+        packages[package] = packages.get(package, 0) + record.self_us
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def summarize(records: list[ImportRecord], module: str, top: int = 20) -> dict:
+    slowest = sorted(records, key=lambda record: record.cumulative_us, reverse=True)
+    return {
+        "module": module,
+        "total_ms": round(total_us(records, module) / 1000, 1),
+        "modules_imported": len(records),
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)} for name, us in list(by_package(records).items())[:top]
+        ],
+        "modules": [
+            {**asdict(record), "self_ms": round(record.self_us / 1000, 1),
+             "cumulative_ms": round(record.cumulative_us / 1000, 1)}
+            for record in slowest[:top]
+        ],
+    }
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"import {summary['module']}: {summary['total_ms']:.1f} ms, {summary['modules_imported']} modules", ""]
+    lines.append(f"{'package':<32}{'self ms':>10}")
+    lines += [f"{row['package']:<32}{row['self_ms']:>10.1f}" for row in summary["packages"]]
+    lines += ["", f"{'module':<48}{'self ms':>10}{'cumul ms':>10}"]
+    lines += [f"{row['name']:<48}{row['self_ms']:>10.1f}{row['cumulative_ms']:>10.1f}" for row in summary["modules"]]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report where a module's import time goes")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="import this many times and report the fastest run")
+    parser.add_argument("--budget-ms", type=float, help="exit 1 if the import takes longer than this")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    # The fastest run is the least disturbed by other work on the machine
+    records = min((measure(args.module) for _ in range(max(1, args.runs))),
+                  key=lambda run: total_us(run, args.module))
+    summary = summarize(records, args.module, args.top)
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_summary(summary))
+    if args.budget_ms is not None and summary["total_ms"] > args.budget_ms:
+        print(f"import {args.module} took {summary['total_ms']:.1f} ms, over the {args.budget_ms:.0f} ms budget",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Generate a large synthetic dataset for scale testing.
+
+Inserts N users and M calculations, with calculations spread across users
+by a Zipf distribution (a few heavy users, a long tail of light ones), a
+realistic mix of operation types and operands, and created_at timestamps
+spread over the last --days days. Rows go in with batched Core inserts
+(executemany), and every user shares one precomputed password hash, so the
+run is bound by SQLite rather than PBKDF2. The same --seed always produces
+the same data.
+
+Usage:
+    python -m app.tools.seed --users 10000 --calculations 10000000
+    python -m app.tools.seed --users 100 --calculations 50000 --seed 7 --password password123
+
+Seeded users log in as seed<seed>-<n>@example.com with --password.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
+from itertools import accumulate
+
+from sqlalchemy import Connection, Engine, event, func, insert, select, text
+
+from app import models, security
+
+TYPE_WEIGHTS = {"Add": 40, "Sub": 25, "Multiply": 20, "Divide": 15}
+DEFAULT_BATCH_SIZE = 20_000
+
+
+def zipf_counts(users: int, total: int, exponent: float, rng: random.Random) -> list[int]:
+    """Split `total` rows over `users` with weights 1/rank**exponent, ranks shuffled"""
+    if users < 1:
+        raise ValueError("users must be at least 1")
+    weights = [1 / rank ** exponent for rank in range(1, users + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Hand the rounding remainder to the heaviest users so the total is exact
+    for index in range(total - sum(counts)):
+        counts[index % users] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def _operands(rng: random.Random, calc_type: str) -> tuple[float, float]:
+    """Mostly small integers, some decimals, the occasional large value; never divide by zero"""
+    random_ = rng.random
+    shape = random_()
+    if shape < 0.7:
+        a, b = float(int(random_() * 101)), float(int(random_() * 101))
+    elif shape < 0.95:
+        a, b = round(random_() * 2000 - 1000, 2), round(random_() * 2000 - 1000, 2)
+    else:
+        a, b = float(int(random_() * 2e9) - 10**9), float(int(random_() * 10**6) + 1)
+    if calc_type == "Divide" and b == 0:
+        b = 1.0
+    return a, b
+
+
+def _fast_sqlite(dbapi_connection, connection_record) -> None:
+    # Durability is irrelevant for throwaway scale-test data
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.execute("PRAGMA cache_size = -200000")
+    cursor.close()
+
+
+def _sync_user_id_sequence(conn: Connection) -> None:
+    """Move users.id's sequence past the explicitly inserted ids, or the next signup collides"""
+    # SQLite picks max(rowid) + 1 by itself; Postgres' SERIAL sequence does not see explicit ids
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT MAX(id) FROM users))"
+        ))
+
+
+@contextmanager
+def _transaction(bind: Engine | Connection):
+    # On a Connection already in a transaction (e.g. a test's), use a SAVEPOINT
+    if isinstance(bind, Connection):
+        with bind.begin_nested():
+            yield bind
+    else:
+        with bind.begin() as conn:
+            yield conn
+
+
+def seed(
+    bind: Engine | Connection,
+    users: int,
+    calculations: int,
+    seed: int = 42,
+    exponent: float = 1.1,
+    days: int = 365,
+    password: str = "password123",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    now: datetime | None = None,
+    progress=None,
+) -> dict:
+    """Insert the synthetic dataset through an Engine or Connection and return a summary report"""
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    password_hash = security.hash_password(password)
+    counts = zipf_counts(users, calculations, exponent, rng)
+    types = list(TYPE_WEIGHTS)
+    cumulative_weights = list(accumulate(TYPE_WEIGHTS.values()))
+    window = days * 86400
+
+    started = time.perf_counter()
+    with _transaction(bind) as conn:
+        first_id = (conn.scalar(select(func.max(models.User.id))) or 0) + 1
+        user_ids = list(range(first_id, first_id + users))
+        for offset in range(0, users, batch_size):
+            conn.execute(insert(models.User), [
+                {
+                    "id": user_id,
+                    "username": f"seed{seed}-{user_id}",
+                    "email": f"seed{seed}-{user_id}@example.com",
+                    "password_hash": password_hash,
+                    "created_at": now - timedelta(seconds=window),
+                }
+                for user_id in user_ids[offset:offset + batch_size]
+            ])
+        _sync_user_id_sequence(conn)
+
+    inserted = 0
+    batch: list[dict] = []
+    # rng.random() throughout: randrange/choices cost several times more per row
+    random_ = rng.random
+    total_weight = cumulative_weights[-1]
+    for user_id, count in zip(user_ids, counts):
+        for _ in range(count):
+            calc_type = types[bisect_right(cumulative_weights, random_() * total_weight)]
+            a, b = _operands(rng, calc_type)
+            batch.append({
+                "a": a,
+                "b": b,
+                "type": calc_type,
+                "user_id": user_id,
+                "created_at": now - timedelta(seconds=int(random_() * window)),
+            })
+            if len(batch) >= batch_size:
+                inserted += _insert_calculations(bind, batch)
+                batch = []
+                if progress:
+                    progress(inserted, calculations)
+    inserted += _insert_calculations(bind, batch)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users": users,
+        "calculations": inserted,
+        "first_user_id": first_id,
+        "max_per_user": max(counts, default=0),
+        "median_per_user": sorted(counts)[len(counts) // 2] if counts else 0,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(inserted / elapsed) if elapsed else None,
+    }
+
+
+def _insert_calculations(bind: Engine | Connection, rows: list[dict]) -> int:
+    if not rows:
+        return 0
+    with _transaction(bind) as conn:
+        conn.execute(insert(models.Calculation), rows)
+    return len(rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic dataset for scale testing")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--calculations", type=int, default=100_000, help="total calculations across all users")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of calculations per user")
+    parser.add_argument("--days", type=int, default=365, help="spread created_at over this many days")
+    parser.add_argument("--password", default="password123", help="password of every seeded user")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    if args.calculations < 0:
+        parser.error("--calculations must not be negative")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    from app.database import Base, engine
+
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _fast_sqlite)
+        engine.dispose()
+    Base.metadata.create_all(bind=engine)
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r{done:,}/{total:,} calculations", end="", file=sys.stderr, flush=True)
+
+    report = seed(
+        engine,
+        users=args.users,
+        calculations=args.calculations,
+        seed=args.seed,
+        exponent=args.zipf,
+        days=args.days,
+        password=args.password,
+        batch_size=args.batch_size,
+        progress=progress,
+    )
+    print(file=sys.stderr)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Summarise the slow-query log by statement shape.
+
+Reads the JSONL log written by app.slow_query_log (including its rotated
+backups) and prints one row per statement fingerprint. Each row shows the
+count, total/mean/max time, the routes that issued it and whether its
+captured plan scans a whole table.
+
+Usage:
+    python -m app.tools.slow_queries
+    python -m app.tools.slow_queries logs/slow_queries.jsonl --sort max --top 10
+    python -m app.tools.slow_queries --json > summary.json
+"""
+import argparse
+import glob
+import json
+import re
+import sys
+
+from app.slow_query_log import SLOW_QUERY_LOG, is_full_scan
+
+
+def read_entries(path: str):
+    """Yield log entries from path and its rotated backups (path.1, path.2, ...)"""
+    for name in sorted(glob.glob(path + ".*"), reverse=True) + [path]:
+        if not re.fullmatch(re.escape(path) + r"(\.\d+)?", name):
+            continue
+        try:
+            with open(name, encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line:
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+        except FileNotFoundError:
+            continue
+
+
+def aggregate(entries) -> list[dict]:
+    """Group entries by fingerprint, keeping the first captured plan"""
+    groups: dict[str, dict] = {}
+    for entry in entries:
+        group = groups.setdefault(entry["fingerprint"], {
+            "fingerprint": entry["fingerprint"],
+            "statement": entry["statement"],
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "routes": set(),
+            "plan": None,
+        })
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+        if entry.get("route"):
+            group["routes"].add(entry["route"])
+        if group["plan"] is None and entry.get("plan"):
+            group["plan"] = entry["plan"]
+
+    summary = []
+    for group in groups.values():
+        summary.append({
+            **group,
+            "total_ms": round(group["total_ms"], 3),
+            "mean_ms": round(group["total_ms"] / group["count"], 3),
+            "routes": sorted(group["routes"]),
+            "full_scan": is_full_scan(group["plan"]),
+        })
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarise the slow-query log by statement shape")
+    parser.add_argument("path", nargs="?", default=SLOW_QUERY_LOG)
+    parser.add_argument("--sort", choices=["total", "count", "max", "mean"], default="total")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    key = "count" if args.sort == "count" else f"{args.sort}_ms"
+    summary = sorted(aggregate(read_entries(args.path)), key=lambda group: group[key], reverse=True)[:args.top]
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return 0
+    if not summary:
+        print(f"No slow queries logged in {args.path}")
+        return 0
+
+    for group in summary:
+        scan = "  FULL SCAN" if group["full_scan"] else ""
+        print(
+            f"{group['fingerprint']}  count={group['count']}  total={group['total_ms']:.1f}ms  "
+            f"mean={group['mean_ms']:.1f}ms  max={group['max_ms']:.1f}ms{scan}"
+        )
+        print(f"  {group['statement'][:200]}")
+        if group["routes"]:
+            print(f"  routes: {', '.join(group['routes'])}")
+        for line in group["plan"] or []:
+            print(f"  plan: {line}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""
+Minimal in-process tracing with OTLP-compatible JSON export.
+
+TracingMiddleware makes a head-based sampling decision for every HTTP
+request from TRACE_SAMPLE_RATE. An incoming W3C `traceparent` header links
+the trace to its caller, but its sampled flag only decides when
+TRACE_TRUST_TRACEPARENT is set (all clients are trusted upstream services);
+otherwise any client could force every request to be traced. For sampled
+requests it opens a root span, and code below it adds child spans with
+span()/traced():
+
+    with tracing.span("auth.decode"):
+        ...
+
+    @tracing.traced()
+    def get_user_by_email(...): ...
+
+SQL statements get their own spans from the SQLAlchemy cursor events.
+Finished traces are kept in an in-memory ring buffer (GET /admin/traces),
+and with TRACE_EXPORT_FILE set each one is also appended to that file as an
+OTLP/JSON ExportTraceServiceRequest line that collectors and viewers import.
+A background thread does the encoding and writing, so the event loop never
+waits for the disk; if it falls TRACE_EXPORT_QUEUE_SIZE traces behind,
+further traces are only kept in the buffer.
+
+For unsampled requests every span()/traced() call is a single context lookup.
+"""
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_TRUST_TRACEPARENT = os.getenv("TRACE_TRUST_TRACEPARENT", "false").lower() in ("1", "true", "yes")
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+TRACE_EXPORT_QUEUE_SIZE = int(os.getenv("TRACE_EXPORT_QUEUE_SIZE", "1000"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "calculator-api")
+
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_MAX_STATEMENT_LENGTH = 500
+
+
+class Trace:
+    """Spans collected for one sampled request"""
+    __slots__ = ("trace_id", "root", "spans", "_lock")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.root: Span | None = None
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+class Span:
+    """One timed operation within a trace"""
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, trace: Trace, name: str, parent_id: str | None, kind: int = KIND_INTERNAL,
+                 attributes: dict | None = None, start_ns: int | None = None):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: int | None = None
+        self.attributes = attributes or {}
+        self.status = STATUS_OK
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_ns: int | None = None) -> None:
+        self.end_ns = time.time_ns() if end_ns is None else end_ns
+        self.trace.add(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def _new_id(size: int) -> str:
+    return random.getrandbits(size * 8).to_bytes(size, "big").hex()
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def current_span() -> Span | None:
+    """Return the innermost open span of a sampled request, if any"""
+    return _current_span.get()
+
+
+class span:
+    """Context manager recording a child span of the current span (no-op when unsampled)"""
+    __slots__ = ("name", "kind", "attributes", "span", "token")
+
+    def __init__(self, name: str, kind: int = KIND_INTERNAL, **attributes):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self) -> Span | None:
+        parent = _current_span.get()
+        if parent is not None:
+            self.span = Span(parent.trace, self.name, parent.span_id, self.kind, self.attributes)
+            self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is not None:
+            if exc_type is not None:
+                self.span.status = STATUS_ERROR
+                self.span.set_attribute("exception.type", exc_type.__name__)
+            _current_span.reset(self.token)
+            self.span.end()
+        return False
+
+
+def traced(name: str | None = None):
+    """Decorator recording each call as a span named after the function (e.g. crud.get_user_by_email)"""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """Record an already finished operation as a child of the current span"""
+    parent = _current_span.get()
+    if parent is not None:
+        Span(parent.trace, name, parent.span_id, attributes=attributes, start_ns=start_ns).end(end_ns)
+
+
+# ---------- Storage and export ----------
+
+class TraceStore:
+    """Ring buffer of finished traces plus optional OTLP/JSON file export from a background thread"""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE, export_file: str = TRACE_EXPORT_FILE,
+                 service_name: str = TRACE_SERVICE_NAME, export_queue_size: int = TRACE_EXPORT_QUEUE_SIZE):
+        self.traces: deque[Trace] = deque(maxlen=size)
+        self.export_file = export_file
+        self.service_name = service_name
+        self.export_dropped = 0
+        self._exports: queue.Queue[Trace] = queue.Queue(maxsize=export_queue_size)
+        self._writer: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self.traces.append(trace)
+            if not self.export_file:
+                return
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_exports, name="trace-export", daemon=True)
+                self._writer.start()
+        try:
+            self._exports.put_nowait(trace)
+        except queue.Full:
+            self.export_dropped += 1
+
+    def _write_exports(self) -> None:
+        while True:
+            batch = [self._exports.get()]
+            while True:
+                try:
+                    batch.append(self._exports.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Could not export %d traces to %s", len(batch), self.export_file)
+            finally:
+                for _ in batch:
+                    self._exports.task_done()
+
+    def _write(self, traces: list[Trace]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.export_file)), exist_ok=True)
+        with open(self.export_file, "a", encoding="utf-8") as fh:
+            for trace in traces:
+                fh.write(json.dumps(self.to_otlp([trace])) + "\n")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued traces are written; False if the timeout expired first"""
+        deadline = time.monotonic() + timeout
+        while self._exports.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get(self, trace_id: str) -> Trace | None:
+        return next((trace for trace in list(self.traces) if trace.trace_id == trace_id), None)
+
+    def summaries(self) -> list[dict]:
+        """Newest-first overview of buffered traces"""
+        summaries = []
+        for trace in reversed(list(self.traces)):
+            root = trace.root
+            summaries.append({
+                "trace_id": trace.trace_id,
+                "name": root.name,
+                "start_time_unix_nano": root.start_ns,
+                "duration_ms": round((root.end_ns - root.start_ns) / 1e6, 3),
+                "span_count": len(trace.spans),
+                "status": "error" if any(s.status == STATUS_ERROR for s in trace.spans) else "ok",
+            })
+        return summaries
+
+    def to_otlp(self, traces: list[Trace]) -> dict:
+        """Encode traces as an OTLP/JSON ExportTraceServiceRequest"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.tracing"},
+                    "spans": [s.to_otlp() for trace in traces for s in sorted(trace.spans, key=lambda s: s.start_ns)],
+                }],
+            }],
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.traces.clear()
+
+
+STORE = TraceStore()
+
+
+# ---------- ASGI middleware ----------
+
+def _sampling_decision(scope, sample_rate: float, trust_traceparent: bool) -> tuple[bool, str | None, str | None]:
+    """
+    Return (sampled, trace_id, parent_span_id).
+
+    An incoming traceparent supplies the trace and parent ids; its sampled
+    flag replaces the local decision only when trust_traceparent is set.
+    """
+    for key, value in scope["headers"]:
+        if key == b"traceparent":
+            match = _TRACEPARENT.match(value.decode("latin-1").strip().lower())
+            if match:
+                trace_id, parent_id, flags = match.groups()
+                if trust_traceparent:
+                    return bool(int(flags, 16) & 1), trace_id, parent_id
+                return random.random() < sample_rate, trace_id, parent_id
+            break
+    return random.random() < sample_rate, None, None
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a root span for sampled HTTP requests"""
+
+    def __init__(self, app, sample_rate: float | None = None, store: TraceStore | None = None,
+                 trust_traceparent: bool | None = None):
+        self.app = app
+        self.sample_rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.store = STORE if store is None else store
+        # None: follow TRACE_TRUST_TRACEPARENT at request time
+        self.trust_traceparent = trust_traceparent
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trust = TRACE_TRUST_TRACEPARENT if self.trust_traceparent is None else self.trust_traceparent
+        sampled, trace_id, parent_id = _sampling_decision(scope, self.sample_rate, trust)
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id or _new_id(16))
+        root = trace.root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, KIND_SERVER, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = STATUS_ERROR
+                headers = MutableHeaders(scope=message)
+                headers.append("traceparent", f"00-{trace.trace_id}-{root.span_id}-01")
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            root.status = STATUS_ERROR
+            raise
+        finally:
+            _current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+            root.end()
+            self.store.add(trace)
+
+
+# ---------- SQLAlchemy instrumentation ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is not None:
+        operation = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+        conn.info.setdefault("trace_spans", []).append(
+            Span(parent.trace, f"db {operation}", parent.span_id, KIND_CLIENT, {
+                "db.system": conn.dialect.name,
+                "db.statement": " ".join(statement.split())[:_MAX_STATEMENT_LENGTH],
+            })
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans and _current_span.get() is not None:
+        spans.pop().end()
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("trace_spans") and _current_span.get() is not None:
+        failed = conn.info["trace_spans"].pop()
+        failed.status = STATUS_ERROR
+        failed.end()
+
+
+def instrument_sqlalchemy() -> None:
+    """Record a span per SQL statement of sampled requests for every Engine (idempotent)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
@@ -0,0 +1,111 @@
+"""
+Worker warm-up: work done after startup but before the worker reports ready.
+
+To keep imports fast, passlib and python-jose (with cryptography) are
+imported on first use, and the connection pool opens connections only
+when asked. Left alone, the first requests a new worker
+serves would pay for all of that. The lifespan starts warm-up in a thread
+once the app is up: /health answers at once, while /ready answers 503
+until every hook has run, so load balancers only send traffic to warmed-up
+workers.
+
+Hooks are best effort. A failing hook is logged and skipped; an unreachable
+database still fails the query in /ready. WARMUP_ENABLED=false skips
+warm-up, and WARMUP_DB_CONNECTIONS sets how many pool connections are
+opened ahead of time.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable
+
+from sqlalchemy import text
+
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() not in ("0", "false", "no")
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "2"))
+
+
+def preconnect_pool(connections: int | None = None) -> None:
+    """Open pool connections now so early requests skip connecting (and auth/TLS on a server database)"""
+    from app.database import engine
+
+    wanted = WARMUP_DB_CONNECTIONS if connections is None else connections
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        wanted = min(wanted, size())
+    opened = []
+    try:
+        for _ in range(wanted):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        # Closing returns them to the pool, still connected
+        for conn in opened:
+            conn.close()
+
+
+def init_password_hashing() -> None:
+    """Build the passlib context and load its PBKDF2 backend"""
+    from app import security
+
+    security.get_pwd_context().hash("warm-up")
+
+
+def init_jwt() -> None:
+    """Import python-jose and its cryptography backend"""
+    from app import security
+
+    security.decode_token(security.create_access_token({"sub": "warm-up"}))
+
+
+HOOKS: list[tuple[str, Callable[[], None]]] = [
+    ("database", preconnect_pool),
+    ("password_hashing", init_password_hashing),
+    ("jwt", init_jwt),
+]
+
+
+class Warmup:
+    """Run the warm-up hooks once per startup and tell /ready whether they are done"""
+
+    def __init__(self, hooks: list[tuple[str, Callable[[], None]]] | None = None):
+        self.hooks = HOOKS if hooks is None else hooks
+        # idle (never started, e.g. no lifespan) -> running -> done
+        self.state = "idle"
+        self._task: asyncio.Future | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state != "running"
+
+    def run(self) -> None:
+        self.state = "running"
+        started = time.perf_counter()
+        for name, hook in self.hooks:
+            hook_started = time.perf_counter()
+            try:
+                hook()
+            except Exception:
+                logger.warning("Warm-up step %s failed", name, exc_info=True)
+            metrics.STARTUP_PHASE.labels(f"warmup_{name}").set(time.perf_counter() - hook_started)
+        metrics.STARTUP_PHASE.labels("warmup").set(time.perf_counter() - started)
+        self.state = "done"
+
+    def start(self) -> None:
+        """Run the hooks in a thread; must be called on the server's event loop"""
+        self.state = "running"
+        self._task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.run))
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+
+WARMUP = Warmup()
@@ -0,0 +1,70 @@
+"""
+Compare one POST /api/batch against the equivalent sequence of single calls.
+
+Each round creates three calculations, updates one and deletes two, first as
+six separate requests and then as a single batch. Runs in-process against a
+temporary SQLite database.
+
+Usage:
+    python -m benchmarks.batch_vs_single --rounds 200
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    # Import after DATABASE_URL is set so the app binds to the temporary database
+    from fastapi.testclient import TestClient
+    from app.database import init_db
+    from app.main import app
+
+    init_db()  # TestClient only runs the lifespan when used as a context manager
+    client = TestClient(app)
+    token = client.post(
+        "/register", json={"email": "bench@example.com", "password": "benchpass123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def singles() -> None:
+        ids = [
+            client.post("/api/calculations/", headers=headers, json={"a": i, "b": 2, "type": "Add"}).json()["id"]
+            for i in range(3)
+        ]
+        client.put(f"/api/calculations/{ids[0]}", headers=headers, json={"a": 10})
+        client.delete(f"/api/calculations/{ids[1]}", headers=headers)
+        client.delete(f"/api/calculations/{ids[2]}", headers=headers)
+
+    def batched() -> None:
+        created = client.post("/api/batch", headers=headers, json={"operations": [
+            {"op": "create", "data": {"a": i, "b": 2, "type": "Add"}} for i in range(3)
+        ]}).json()["results"]
+        ids = [result["data"]["id"] for result in created]
+        # Mirror the single-call flow: the ids are only known after creation
+        client.post("/api/batch", headers=headers, json={"operations": [
+            {"op": "update", "id": ids[0], "data": {"a": 10}},
+            {"op": "delete", "id": ids[1]},
+            {"op": "delete", "id": ids[2]},
+        ]})
+
+    for name, workload in (("6 single calls", singles), ("2 batch calls", batched)):
+        workload()  # warm-up
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            workload()
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"{name:>15}: median {statistics.median(timings):7.2f} ms  mean {statistics.fmean(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
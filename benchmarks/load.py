@@ -0,0 +1,412 @@
+"""
+Load benchmark for the authenticated API with saved baselines.
+
+Every virtual user registers once and then loops over a weighted mix of
+login / browse / add / edit / delete / profile requests until the duration
+is up. Per-route latency percentiles and throughput are written as JSON so
+later runs can be compared against them.
+
+Targets:
+    asgi     drive app.main:app in-process through httpx.ASGITransport (no sockets)
+    uvicorn  spawn a local uvicorn server and drive it over HTTP
+    serve    spawn the production launcher (python -m app.serve) and drive it over HTTP
+
+Both use a fresh temporary SQLite database unless --database-url is given.
+
+Usage:
+    python -m benchmarks.load run --target asgi --concurrency 20 --duration 15 \\
+        --output benchmarks/baselines/asgi.json
+    python -m benchmarks.load run --target uvicorn --mix browse=80,add=20
+    python -m benchmarks.load compare benchmarks/baselines/asgi.json current.json --threshold 0.15
+    python -m benchmarks.load scale --workers 1,2,4,8 --concurrency 32 --duration 15
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+DEFAULT_MIX = {"browse": 40, "add": 20, "edit": 10, "delete": 10, "profile": 15, "login": 5}
+PASSWORD = "loadtest123"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    """Parse 'browse=40,add=20' into a weight mapping"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown action {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one action needs a positive weight")
+    return mix
+
+
+class Recorder:
+    """Latencies (seconds) and error counts per route label"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            routes[route] = _stats(sorted(values), self.errors.get(route, 0), elapsed)
+        everything = sorted(value for values in self.latencies.values() for value in values)
+        return {"routes": routes, "total": _stats(everything, sum(self.errors.values()), elapsed)}
+
+
+def _stats(sorted_values: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "count": len(sorted_values),
+        "errors": errors,
+        "rps": round(len(sorted_values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(sorted_values) * 1000, 3) if sorted_values else 0.0,
+        "p50_ms": round(percentile(sorted_values, 50) * 1000, 3),
+        "p95_ms": round(percentile(sorted_values, 95) * 1000, 3),
+        "p99_ms": round(percentile(sorted_values, 99) * 1000, 3),
+    }
+
+
+class VirtualUser:
+    """One simulated user holding its own token and calculation ids"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, index: int, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.email = f"load{index}-{rng.randrange(10**9)}@example.com"
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        self.calc_ids: list[int] = []
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route, time.perf_counter() - started, ok=False)
+            return None
+        self.recorder.record(route, time.perf_counter() - started, ok=response.status_code < 400)
+        return response
+
+    async def register(self) -> None:
+        response = await self.request(
+            "POST /register", "POST", "/register", json={"email": self.email, "password": PASSWORD}
+        )
+        if response is None or response.status_code != 200:
+            raise RuntimeError(f"Could not register {self.email}")
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def run(self, actions: list[str], weights: list[int], deadline: float) -> None:
+        await self.register()
+        while time.perf_counter() < deadline:
+            action = self.rng.choices(actions, weights)[0]
+            if action in ("edit", "delete") and not self.calc_ids:
+                action = "add"
+            await getattr(self, action)()
+
+    async def login(self) -> None:
+        response = await self.request(
+            "POST /login", "POST", "/login", json={"email": self.email, "password": PASSWORD}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def browse(self) -> None:
+        await self.request("GET /api/calculations/", "GET", "/api/calculations/", headers=self.headers)
+
+    async def add(self) -> None:
+        payload = {
+            "a": self.rng.randint(1, 1000),
+            "b": self.rng.randint(1, 100),
+            "type": self.rng.choice(["Add", "Sub", "Multiply", "Divide"]),
+        }
+        response = await self.request(
+            "POST /api/calculations/", "POST", "/api/calculations/", json=payload, headers=self.headers
+        )
+        if response is not None and response.status_code == 201:
+            self.calc_ids.append(response.json()["id"])
+
+    async def edit(self) -> None:
+        calc_id = self.rng.choice(self.calc_ids)
+        await self.request(
+            "PUT /api/calculations/{calc_id}", "PUT", f"/api/calculations/{calc_id}",
+            json={"a": self.rng.randint(1, 1000)}, headers=self.headers,
+        )
+
+    async def delete(self) -> None:
+        calc_id = self.calc_ids.pop(self.rng.randrange(len(self.calc_ids)))
+        await self.request(
+            "DELETE /api/calculations/{calc_id}", "DELETE", f"/api/calculations/{calc_id}",
+            headers=self.headers,
+        )
+
+    async def profile(self) -> None:
+        await self.request("GET /profile", "GET", "/profile", headers=self.headers)
+
+
+async def run_load(client: httpx.AsyncClient, mix: dict[str, int], concurrency: int,
+                   duration: float, seed: int) -> dict:
+    """Run the mix with `concurrency` virtual users for `duration` seconds"""
+    recorder = Recorder()
+    actions = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in actions]
+    rng = random.Random(seed)
+    users = [VirtualUser(client, recorder, i, random.Random(rng.random())) for i in range(concurrency)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user.run(actions, weights, started + duration) for user in users))
+    return recorder.summary(time.perf_counter() - started)
+
+
+# ---------- Targets ----------
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _run_asgi(args) -> dict:
+    # Import after DATABASE_URL is set so the app binds to the benchmark database
+    from app.database import init_db
+    from app.main import app
+
+    init_db()  # ASGITransport does not run the lifespan
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_load(client, args.mix, args.concurrency, args.duration, args.seed)
+
+
+async def _run_server(args) -> dict:
+    port = _free_port()
+    if args.target == "serve":
+        command = [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    server = subprocess.Popen(
+        command + ["--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            await _wait_until_up(client, server)
+            return await run_load(client, args.mix, args.concurrency, args.duration, args.seed)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def _wait_until_up(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start in time")
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}"
+
+    runner = _run_asgi if args.target == "asgi" else _run_server
+    result = asyncio.run(runner(args))
+    result["meta"] = {
+        "target": args.target,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "workers": args.workers if args.target != "asgi" else None,
+        "mix": args.mix,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "revision": _git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    return result
+
+
+# ---------- Reporting ----------
+
+def format_table(result: dict) -> str:
+    rows = [f"{'route':<36} {'count':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+    for route, stats in [*result["routes"].items(), ("TOTAL", result["total"])]:
+        rows.append(
+            f"{route:<36} {stats['count']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+    return "\n".join(rows)
+
+
+def scaling_summary(results: list[dict]) -> list[dict]:
+    """Throughput and latency per worker count, with speedup and efficiency relative to the first run"""
+    base = results[0]["total"]["rps"] / results[0]["meta"]["workers"] if results else 0
+    rows = []
+    for result in results:
+        workers, total = result["meta"]["workers"], result["total"]
+        speedup = total["rps"] / (base or 1)
+        rows.append({
+            "workers": workers,
+            "rps": total["rps"],
+            "p50_ms": total["p50_ms"],
+            "p95_ms": total["p95_ms"],
+            "p99_ms": total["p99_ms"],
+            "errors": total["errors"],
+            "speedup": round(speedup, 2),
+            "efficiency": round(speedup / workers, 2),
+        })
+    return rows
+
+
+def format_scaling(rows: list[dict]) -> str:
+    lines = [f"{'workers':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>5} {'speedup':>8} {'eff':>5}"]
+    for row in rows:
+        lines.append(
+            f"{row['workers']:>7} {row['rps']:>8.1f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+            f"{row['p99_ms']:>8.2f} {row['errors']:>5} {row['speedup']:>7.2f}x {row['efficiency']:>5.2f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    Return one message per regression: a route whose p50/p95/p99 grew, or
+    whose throughput dropped, by more than `threshold` (0.1 = 10%).
+    """
+    regressions = []
+    for route, base in [*baseline["routes"].items(), ("TOTAL", baseline["total"])]:
+        now = current["total"] if route == "TOTAL" else current["routes"].get(route)
+        if now is None:
+            regressions.append(f"{route}: missing from current run")
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[key] and now[key] > base[key] * (1 + threshold):
+                regressions.append(
+                    f"{route}: {key} {base[key]:.2f} -> {now[key]:.2f} (+{now[key] / base[key] - 1:.0%})"
+                )
+        if base["rps"] and now["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(
+                f"{route}: rps {base['rps']:.1f} -> {now['rps']:.1f} ({now['rps'] / base['rps'] - 1:.0%})"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the load mix and print per-route stats")
+    run_parser.add_argument("--target", choices=["asgi", "uvicorn", "serve"], default="asgi")
+    run_parser.add_argument("--concurrency", type=int, default=10, help="number of virtual users")
+    run_parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    run_parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                            help="action weights, e.g. browse=40,add=20,edit=10,delete=10,profile=15,login=5")
+    run_parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    run_parser.add_argument("--output", help="write the JSON result (baseline) here")
+
+    scale_parser = commands.add_parser("scale", help="run the mix once per worker count and report scaling")
+    scale_parser.add_argument("--target", choices=["serve", "uvicorn"], default="serve")
+    scale_parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    scale_parser.add_argument("--concurrency", type=int, default=32, help="number of virtual users")
+    scale_parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    scale_parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    scale_parser.add_argument("--seed", type=int, default=1)
+    scale_parser.add_argument("--database-url", help="defaults to a fresh temporary SQLite file per run")
+    scale_parser.add_argument("--output", help="write the per-worker-count results here")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15,
+                                help="allowed relative slowdown (default 0.15 = 15%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run(args)
+        print(format_table(result))
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w") as fh:
+                json.dump(result, fh, indent=2)
+                fh.write("\n")
+            print(f"Saved {args.output}")
+        return 0
+
+    if args.command == "scale":
+        results = []
+        for workers in (int(count) for count in args.workers.split(",")):
+            results.append(run(argparse.Namespace(**{**vars(args), "workers": workers})))
+            print(f"{workers} workers: {results[-1]['total']['rps']:.1f} rps", file=sys.stderr)
+        rows = scaling_summary(results)
+        print(format_scaling(rows))
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w") as fh:
+                json.dump({"scaling": rows, "runs": results}, fh, indent=2)
+                fh.write("\n")
+            print(f"Saved {args.output}")
+        return 0
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+    regressions = compare(baseline, current, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
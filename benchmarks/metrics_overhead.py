@@ -0,0 +1,54 @@
+"""
+Measure the per-request overhead of MetricsMiddleware.
+
+Drives a trivial ASGI app directly (no HTTP, no TestClient) with and without
+the middleware so the difference is the cost of the instrumentation itself.
+
+Usage:
+    python -m benchmarks.metrics_overhead --requests 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.metrics import MetricsMiddleware
+
+
+class _Route:
+    path = "/api/calculations/{calc_id}"
+
+
+async def _endpoint(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/api/calculations/1"}, receive, send)
+    return time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="MetricsMiddleware overhead")
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    bare = asyncio.run(_drive(_endpoint, args.requests))
+    instrumented = asyncio.run(_drive(MetricsMiddleware(_endpoint), args.requests))
+    overhead_us = (instrumented - bare) / args.requests * 1e6
+    print(f"bare:         {bare / args.requests * 1e6:6.2f} us/request")
+    print(f"instrumented: {instrumented / args.requests * 1e6:6.2f} us/request")
+    print(f"overhead:     {overhead_us:6.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
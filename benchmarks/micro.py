@@ -0,0 +1,182 @@
+"""
+Microbenchmarks for the CPU hot paths behind every request.
+
+Covers the calculation factory, calculation/user schema validation and
+serialization, JWT encoding/decoding and password hashing. Each case is
+warmed up and calibrated to a loop count that takes at least --min-time
+seconds. It is then timed for --rounds rounds and reported as per-call
+min / median / mean / stdev. Results can be saved as a JSON baseline and
+compared later.
+
+Usage:
+    python -m benchmarks.micro run --output benchmarks/baselines/micro.json
+    python -m benchmarks.micro run --filter jwt --rounds 10
+    python -m benchmarks.micro compare benchmarks/baselines/micro.json current.json --threshold 0.1
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+
+def _cases() -> dict[str, Callable[[], object]]:
+    """Build the benchmark cases; imports are deferred so --help stays fast"""
+    from app import models, schemas, security
+    from app.services.factory import CalcType, CalculationFactory
+
+    calc_payload = {"a": 12.5, "b": 4, "type": "Divide"}
+    calc_row = models.Calculation(id=1, a=12.5, b=4.0, type="Divide", user_id=1, created_at=datetime.now(timezone.utc))
+    calc_read = schemas.CalculationRead.model_validate(calc_row)
+    user_row = models.User(id=1, username="bench", email="bench@example.com", created_at=datetime.now(timezone.utc))
+    token = security.create_access_token({"sub": "bench@example.com"})
+    password_hash = security.hash_password("benchpass123")
+
+    return {
+        "factory.get_operation[enum]": lambda: CalculationFactory.get_operation(CalcType.Multiply),
+        "factory.get_operation[str]": lambda: CalculationFactory.get_operation("Multiply"),
+        "factory.execute[str]": lambda: CalculationFactory.execute("Divide", 12.5, 4.0),
+        "schema.CalculationCreate.validate": lambda: schemas.CalculationCreate.model_validate(calc_payload),
+        "schema.CalculationRead.from_orm": lambda: schemas.CalculationRead.model_validate(calc_row),
+        "schema.CalculationRead.dump": lambda: calc_read.model_dump(),
+        "schema.CalculationRead.dump_json": lambda: calc_read.model_dump_json(),
+        "schema.UserRead.from_orm": lambda: schemas.UserRead.model_validate(user_row),
+        "jwt.create_access_token": lambda: security.create_access_token({"sub": "bench@example.com"}),
+        "jwt.decode_token": lambda: security.decode_token(token),
+        "password.hash": lambda: security.hash_password("benchpass123"),
+        "password.verify": lambda: security.verify_password("benchpass123", password_hash),
+    }
+
+
+def _time_loop(func: Callable[[], object], loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - started
+
+
+def bench(func: Callable[[], object], rounds: int = 7, min_time: float = 0.2, warmup: float = 0.05) -> dict:
+    """Time one callable and return per-call statistics in nanoseconds"""
+    # Warm-up: fill caches, build validators, trigger lazy imports
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        func()
+
+    # Calibrate: double the loop count until one round takes at least min_time
+    loops = 1
+    while _time_loop(func, loops) < min_time:
+        loops *= 2
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        per_call = [_time_loop(func, loops) / loops * 1e9 for _ in range(rounds)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "loops": loops,
+        "rounds": rounds,
+        "min_ns": round(min(per_call), 1),
+        "median_ns": round(statistics.median(per_call), 1),
+        "mean_ns": round(statistics.fmean(per_call), 1),
+        "stdev_ns": round(statistics.stdev(per_call), 1) if rounds > 1 else 0.0,
+    }
+
+
+def run(name_filter: str = "", rounds: int = 7, min_time: float = 0.2) -> dict:
+    cases = {name: func for name, func in _cases().items() if name_filter in name}
+    results = {}
+    for name, func in cases.items():
+        results[name] = bench(func, rounds=rounds, min_time=min_time)
+        print(_format_row(name, results[name]), flush=True)
+    return {
+        "cases": results,
+        "meta": {
+            "rounds": rounds,
+            "min_time": min_time,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+    }
+
+
+def _format_duration(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def _format_row(name: str, stats: dict) -> str:
+    return (
+        f"{name:<36} median {_format_duration(stats['median_ns']):>10}  "
+        f"min {_format_duration(stats['min_ns']):>10}  ±{_format_duration(stats['stdev_ns']):>9}  "
+        f"({stats['rounds']} x {stats['loops']} loops)"
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return one message per case whose median grew by more than `threshold`"""
+    regressions = []
+    for name, base in baseline["cases"].items():
+        now = current["cases"].get(name)
+        if now is None:
+            continue  # filtered runs only cover some cases
+        if now["median_ns"] > base["median_ns"] * (1 + threshold):
+            regressions.append(
+                f"{name}: median {_format_duration(base['median_ns'])} -> "
+                f"{_format_duration(now['median_ns'])} (+{now['median_ns'] / base['median_ns'] - 1:.0%})"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the microbenchmarks")
+    run_parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    run_parser.add_argument("--rounds", type=int, default=7)
+    run_parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per round")
+    run_parser.add_argument("--output", help="write the JSON result (baseline) here")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="allowed relative slowdown (default 0.1 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run(args.filter, args.rounds, args.min_time)
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w") as fh:
+                json.dump(result, fh, indent=2)
+                fh.write("\n")
+            print(f"Saved {args.output}")
+        return 0
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+    regressions = compare(baseline, current, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
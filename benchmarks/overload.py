@@ -0,0 +1,230 @@
+"""
+Overload benchmark: latency of admitted requests at twice the server's capacity.
+
+The app is run twice, with admission control off and on: behind the
+production launcher (--target serve, python -m app.serve over HTTP) or
+in-process through httpx.ASGITransport (--target asgi), where requests reach
+the app as fast as they arrive, as on a host whose event loop keeps up with
+accepting connections. Each run first measures capacity with a closed loop of logins,
+then sends open-loop (Poisson) login arrivals at --overload times that rate.
+Open-loop clients keep arriving whether or not the server keeps up, which is
+what real traffic does; without shedding the backlog and every request's
+latency grow for as long as the overload lasts.
+
+Latency is reported twice: as seen by the client, and as seen by the server
+(the "app" entry of Server-Timing, which includes the admission queue but
+not connections waiting to be accepted; with --target asgi the middleware
+wraps the app from outside, so the queue is not included there). With the load generator on the
+same machine the two differ by however far the server falls behind
+accepting connections.
+
+Usage:
+    python -m benchmarks.overload --duration 20 --overload 2
+    python -m benchmarks.overload --target asgi
+    python -m benchmarks.overload --modes on --output overload.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from benchmarks.load import PASSWORD, _free_port, _wait_until_up, percentile
+
+EMAIL = "overload@example.com"
+APP_TIMING = re.compile(r"(?:^|, )app;dur=([0-9.]+)")
+
+
+async def _login(client: httpx.AsyncClient) -> httpx.Response:
+    return await client.post("/login", json={"email": EMAIL, "password": PASSWORD})
+
+
+async def measure_capacity(client: httpx.AsyncClient, concurrency: int, duration: float) -> float:
+    """Logins per second completed by a closed loop of `concurrency` clients"""
+    done = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            if (await _login(client)).status_code == 200:
+                done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / (time.perf_counter() - started)
+
+
+async def open_loop(client: httpx.AsyncClient, rate: float, duration: float, seed: int,
+                    timeout: float = 10.0) -> dict:
+    """Poisson arrivals at `rate` per second; per-outcome counts and latency of successes"""
+    rng = random.Random(seed)
+    latencies: list[float] = []
+    server_latencies: list[float] = []
+    outcomes = {"ok": 0, "shed": 0, "timeout": 0, "error": 0}
+
+    async def one():
+        started = time.perf_counter()
+        try:
+            # httpx timeouts do not apply to ASGITransport, so enforce the client timeout here too
+            async with asyncio.timeout(timeout):
+                response = await _login(client)
+        except (httpx.TimeoutException, TimeoutError):
+            outcomes["timeout"] += 1
+            return
+        except Exception:  # transport errors, or app exceptions raised through ASGITransport
+            outcomes["error"] += 1
+            return
+        if response.status_code == 200:
+            outcomes["ok"] += 1
+            latencies.append(time.perf_counter() - started)
+            match = APP_TIMING.search(response.headers.get("server-timing", ""))
+            if match:
+                server_latencies.append(float(match.group(1)) / 1000)
+        elif response.status_code == 503:
+            outcomes["shed"] += 1
+        else:
+            outcomes["error"] += 1
+
+    tasks = []
+    started = time.perf_counter()
+    next_arrival = started
+    while next_arrival < started + duration:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        tasks.append(asyncio.create_task(one()))
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    server_latencies.sort()
+    return {
+        "sent": len(tasks),
+        **outcomes,
+        "goodput_rps": outcomes["ok"] / elapsed,
+        "shed_rate": outcomes["shed"] / len(tasks) if tasks else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "server_p50_ms": percentile(server_latencies, 50) * 1000,
+        "server_p99_ms": percentile(server_latencies, 99) * 1000,
+    }
+
+
+async def _drive(client: httpx.AsyncClient, args) -> dict:
+    await client.post("/register", json={"email": EMAIL, "password": PASSWORD})
+    capacity = await measure_capacity(client, args.concurrency, args.capacity_duration)
+    rate = capacity * args.overload
+    result = await open_loop(client, rate, args.duration, args.seed, args.timeout)
+    return {"capacity_rps": capacity, "offered_rps": rate, **result}
+
+
+async def _run_asgi(admission: bool, args) -> dict:
+    # Imported with ADMISSION_ENABLED=false (see main()); "on" wraps the app in the middleware
+    from app.admission import AdmissionMiddleware
+    from app.database import init_db
+    from app.main import app
+
+    init_db()  # ASGITransport does not run the lifespan
+
+    transport = httpx.ASGITransport(app=AdmissionMiddleware(app) if admission else app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+        return await _drive(client, args)
+
+
+async def _run_server(admission: bool, args) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "ADMISSION_ENABLED": "true" if admission else "false",
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'overload.db')}",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits,
+                                     timeout=args.timeout) as client:
+            await _wait_until_up(client, server)
+            return await _drive(client, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _run_mode(admission: bool, args) -> dict:
+    runner = _run_asgi if args.target == "asgi" else _run_server
+    return {"admission": admission, **asyncio.run(runner(admission, args))}
+
+
+def run_mode(admission: bool, args) -> dict:
+    if args.target != "asgi":
+        return _run_mode(admission, args)
+    # A fresh interpreter per mode: an overloaded run leaves threads blocked on the connection pool
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_mode, admission, args).result()
+
+
+def format_results(rows: list[dict]) -> str:
+    header = (f"{'admission':<10}{'capacity':>9}{'offered':>9}{'goodput':>9}{'shed':>7}"
+              f"{'timeout':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'srv p50':>9}{'srv p99':>9}")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{'on' if row['admission'] else 'off':<10}{row['capacity_rps']:>9.1f}{row['offered_rps']:>9.1f}"
+            f"{row['goodput_rps']:>9.1f}{row['shed_rate']:>7.0%}{row['timeout']:>9d}"
+            f"{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}"
+            f"{row['server_p50_ms']:>9.0f}{row['server_p99_ms']:>9.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=["serve", "asgi"], default="serve",
+                        help="serve: python -m app.serve over HTTP; asgi: the app in-process, no sockets")
+    parser.add_argument("--modes", default="off,on", help="admission modes to compare, e.g. off,on")
+    parser.add_argument("--overload", type=float, default=2.0, help="offered load as a multiple of capacity")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of open-loop load")
+    parser.add_argument("--capacity-duration", type=float, default=5.0, help="seconds of the capacity probe")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed-loop clients of the capacity probe")
+    parser.add_argument("--timeout", type=float, default=10.0, help="client timeout in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", help="defaults to a fresh temporary SQLite file per mode")
+    parser.add_argument("--output", help="write the results as JSON here")
+    args = parser.parse_args(argv)
+    if args.target == "asgi":
+        os.environ["ADMISSION_ENABLED"] = "false"
+        os.environ["DATABASE_URL"] = (
+            args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'overload.db')}"
+        )
+
+    rows = []
+    for mode in args.modes.split(","):
+        rows.append(run_mode(mode.strip() == "on", args))
+        print(f"admission {mode}: p99 {rows[-1]['p99_ms']:.0f} ms", file=sys.stderr)
+    print(format_results(rows))
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(rows, fh, indent=2)
+            fh.write("\n")
+        print(f"Saved {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
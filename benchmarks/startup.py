@@ -0,0 +1,152 @@
+"""
+Cold-start benchmark: how long a new worker takes to import and to become ready.
+
+Each run starts fresh interpreters, so nothing is cached in-process (the OS
+page cache still helps after the first run, as it does on a host that
+starts many workers):
+
+    import   python -c "import app.main", timed inside the interpreter
+    health   launching python -m app.serve --workers 1 until /health answers
+    ready    the same launch until /ready answers 200, i.e. after warm-up
+    first    latency of the first request after ready (POST /register,
+             which hashes a password and signs a JWT)
+
+The medians are checked against --import-budget-ms and --ready-budget-ms
+(default STARTUP_IMPORT_BUDGET_MS / STARTUP_READY_BUDGET_MS); the exit code
+is 1 if either is exceeded, so CI can fail on cold-start regressions.
+The import run also reports which lazily loaded dependencies were
+imported anyway.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --import-budget-ms 1200 --ready-budget-ms 4000 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load import _free_port
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2000"))
+READY_BUDGET_MS = float(os.getenv("STARTUP_READY_BUDGET_MS", "6000"))
+# Loaded on first use (app.security) or by warm-up, never while importing the app
+LAZY_MODULES = ("jose", "passlib", "cryptography")
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"import_ms": elapsed * 1000, "lazy_loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _env(database_url: str | None) -> dict:
+    url = database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    return {**os.environ, "DATABASE_URL": url, "SLOW_QUERY_LOG_ENABLED": "false"}
+
+
+def measure_import(database_url: str | None = None) -> dict:
+    """Import app.main in a fresh interpreter; import_ms and lazy modules it loaded anyway"""
+    proc = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT], cwd=PROJECT_ROOT, env=_env(database_url),
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(database_url: str | None = None, timeout: float = 60) -> dict:
+    """Launch a one-worker server; ms until /health and /ready answer 200, and of the first request"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port), "--workers", "1",
+         "--log-level", "warning", "--no-access-log"],
+        cwd=PROJECT_ROOT, env=_env(database_url),
+    )
+    result = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            while "ready_ms" not in result:
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError("server did not become ready in time")
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with code {server.returncode}")
+                for name in ("health", "ready"):
+                    if f"{name}_ms" in result:
+                        continue
+                    try:
+                        if client.get(f"/{name}").status_code == 200:
+                            result[f"{name}_ms"] = (time.perf_counter() - started) * 1000
+                    except httpx.TransportError:
+                        break
+                time.sleep(0.01)
+            first = time.perf_counter()
+            client.post("/register", json={"email": "cold@example.com", "password": "password123"})
+            result["first_request_ms"] = (time.perf_counter() - first) * 1000
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return result
+
+
+def run(runs: int, database_url: str | None = None) -> dict:
+    imports = [measure_import(database_url) for _ in range(runs)]
+    launches = [measure_ready(database_url) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "import_ms": statistics.median(row["import_ms"] for row in imports),
+        "import_max_ms": max(row["import_ms"] for row in imports),
+        "health_ms": statistics.median(row["health_ms"] for row in launches),
+        "ready_ms": statistics.median(row["ready_ms"] for row in launches),
+        "ready_max_ms": max(row["ready_ms"] for row in launches),
+        "first_request_ms": statistics.median(row["first_request_ms"] for row in launches),
+        "lazy_loaded": sorted({name for row in imports for name in row["lazy_loaded"]}),
+    }
+
+
+def check_budget(result: dict, import_budget_ms: float, ready_budget_ms: float) -> list[str]:
+    """Messages for every budget the medians exceed, and for lazy modules loaded at import"""
+    failures = []
+    if result["import_ms"] > import_budget_ms:
+        failures.append(f"import: median {result['import_ms']:.0f} ms > budget {import_budget_ms:.0f} ms")
+    if result["ready_ms"] > ready_budget_ms:
+        failures.append(f"ready: median {result['ready_ms']:.0f} ms > budget {ready_budget_ms:.0f} ms")
+    if result["lazy_loaded"]:
+        failures.append(f"imported at startup but meant to be lazy: {', '.join(result['lazy_loaded'])}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--ready-budget-ms", type=float, default=READY_BUDGET_MS)
+    parser.add_argument("--database-url", help="defaults to a fresh temporary SQLite file per launch")
+    parser.add_argument("--output", help="write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    result = run(args.runs, args.database_url)
+    print(f"import  median {result['import_ms']:7.0f} ms   max {result['import_max_ms']:7.0f} ms")
+    print(f"health  median {result['health_ms']:7.0f} ms")
+    print(f"ready   median {result['ready_ms']:7.0f} ms   max {result['ready_max_ms']:7.0f} ms")
+    print(f"first   median {result['first_request_ms']:7.0f} ms")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2)
+            fh.write("\n")
+        print(f"Saved {args.output}")
+    failures = check_budget(result, args.import_budget_ms, args.ready_budget_ms)
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
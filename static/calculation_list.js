@@ -0,0 +1,313 @@
+// calculation_list.js - Virtualized, cached list of the user's calculations
+//
+// Only the rows in view (plus OVERSCAN above and below) exist in the DOM, so
+// scrolling costs the same with ten rows or a hundred thousand. Rows are kept
+// by id: add, edit and delete patch the one row they touch, and re-rendering
+// after a scroll only moves, creates or drops the rows entering or leaving
+// the viewport. Pages of PAGE_SIZE are loaded with keyset paging
+// (?after_id=&limit=) when the user scrolls near the end of what is loaded.
+//
+// Loaded pages are also stored in IndexedDB. Reopening the page shows each
+// page from there first, then replaces it with the page from the network,
+// so the cache never has to be trusted and changes made elsewhere show up.
+
+const PAGE_SIZE = 200;
+const ROW_HEIGHT = 128;        // px: .virtual-list .calculation-item height plus the gap below it
+const OVERSCAN = 6;            // rows rendered beyond each edge of the viewport
+const CACHE_NAME = 'calculations-cache';
+const CACHE_MAX_ROWS = 20000;  // rows past this are loaded but not cached
+
+// Helper: promise for an IndexedDB request
+function idbRequest(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+// Helper: promise for an IndexedDB transaction finishing
+function idbDone(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+// Helper: the user a JWT belongs to ("sub"), or null
+function tokenSubject(token) {
+  try {
+    const payload = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+    return JSON.parse(atob(payload)).sub || null;
+  } catch (err) {
+    return null;
+  }
+}
+
+// CACHE: Open the cache for owner, emptying it if it belonged to someone else.
+// Resolves to null when IndexedDB is unavailable; the list then works uncached.
+async function openCalculationCache(owner) {
+  if (!owner || !window.indexedDB) return null;
+  try {
+    const request = indexedDB.open(CACHE_NAME, 1);
+    request.onupgradeneeded = () => {
+      request.result.createObjectStore('calculations', { keyPath: 'id' });
+      request.result.createObjectStore('meta');
+    };
+    const db = await idbRequest(request);
+    const stored = await idbRequest(db.transaction('meta').objectStore('meta').get('owner'));
+    if (stored !== owner) {
+      const tx = db.transaction(['calculations', 'meta'], 'readwrite');
+      tx.objectStore('calculations').clear();
+      tx.objectStore('meta').put(owner, 'owner');
+      await idbDone(tx);
+    }
+    return db;
+  } catch (err) {
+    return null;
+  }
+}
+
+// CACHE: Delete everything cached (on logout); resolves once it is gone or cannot be
+function clearCalculationCache(db) {
+  if (db) db.close();
+  if (!window.indexedDB) return Promise.resolve();
+  return new Promise((resolve) => {
+    const request = indexedDB.deleteDatabase(CACHE_NAME);
+    request.onsuccess = request.onerror = request.onblocked = () => resolve();
+  });
+}
+
+// CACHE: Up to limit cached calculations with an id above afterId
+async function cacheRead(db, afterId, limit) {
+  if (!db) return [];
+  try {
+    const store = db.transaction('calculations').objectStore('calculations');
+    return await idbRequest(store.getAll(IDBKeyRange.lowerBound(afterId, true), limit));
+  } catch (err) {
+    return [];
+  }
+}
+
+// CACHE: Make ids in (afterId, upperId] exactly rows
+async function cacheReplace(db, afterId, upperId, rows) {
+  if (!db) return;
+  try {
+    const tx = db.transaction('calculations', 'readwrite');
+    const store = tx.objectStore('calculations');
+    store.delete(IDBKeyRange.bound(afterId, upperId, true, false));
+    rows.forEach(row => store.put(row));
+    await idbDone(tx);
+  } catch (err) {
+    // A failed cache write only costs a slower next visit
+  }
+}
+
+// CACHE: Store one calculation, or delete it when calc is a bare id
+async function cacheWrite(db, calc) {
+  if (!db) return;
+  try {
+    const tx = db.transaction('calculations', 'readwrite');
+    if (typeof calc === 'number') {
+      tx.objectStore('calculations').delete(calc);
+    } else {
+      tx.objectStore('calculations').put(calc);
+    }
+    await idbDone(tx);
+  } catch (err) {
+    // See cacheReplace
+  }
+}
+
+class CalculationList {
+  // listEl: the scrolling <ul>. fetchPage(afterId, limit) resolves to a page
+  // from the API or throws an Error whose message is passed to onError.
+  // renderRow(calc, li) fills a row's element.
+  constructor(listEl, { fetchPage, renderRow, onError, owner, emptyText }) {
+    this.listEl = listEl;
+    this.fetchPage = fetchPage;
+    this.renderRow = renderRow;
+    this.onError = onError;
+    this.emptyText = emptyText;
+
+    this.rows = [];            // loaded calculations, ascending id
+    this.nodes = new Map();    // id -> { el, signature, top } for rendered rows
+    this.complete = false;     // the last page has been loaded
+    this.loaded = false;       // refresh() has run at least once
+    this.loading = false;
+    this.failed = false;       // stop loading on scroll until the next refresh
+    this.generation = 0;       // bumped by refresh() to drop stale responses
+    this.frame = null;
+
+    listEl.classList.add('virtual-list');
+    listEl.textContent = '';
+    // The spacer gives the list its full scroll height; rows are positioned over it
+    this.spacer = document.createElement('li');
+    this.spacer.className = 'virtual-list-spacer';
+    this.spacer.setAttribute('aria-hidden', 'true');
+    this.status = document.createElement('li');
+    this.status.className = 'virtual-list-status';
+    listEl.append(this.spacer, this.status);
+
+    listEl.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+    window.addEventListener('resize', () => this.scheduleRender());
+    this.cache = openCalculationCache(owner);
+  }
+
+  // Reload from the first page, keeping the DOM rows that are still valid
+  refresh() {
+    this.generation += 1;
+    this.rows = [];
+    this.complete = false;
+    this.loading = false;
+    this.failed = false;
+    this.loaded = true;
+    this.listEl.scrollTop = 0;
+    return this.loadNextPage();
+  }
+
+  async loadNextPage() {
+    if (this.loading || this.complete) return;
+    const generation = this.generation;
+    const afterId = this.rows.length ? this.rows[this.rows.length - 1].id : 0;
+    const cacheable = this.rows.length < CACHE_MAX_ROWS;
+    this.loading = true;
+    this.render();
+    try {
+      const db = await this.cache;
+      if (cacheable) {
+        const cached = await cacheRead(db, afterId, PAGE_SIZE);
+        if (generation !== this.generation) return;
+        if (cached.length) {
+          this.replaceAfter(afterId, cached);
+          this.render();
+        }
+      }
+
+      const page = await this.fetchPage(afterId, PAGE_SIZE);
+      if (generation !== this.generation) return;
+      // Everything after afterId so far came from the cache for this page
+      this.replaceAfter(afterId, page);
+      this.complete = page.length < PAGE_SIZE;
+      if (cacheable) {
+        const upperId = this.complete ? Infinity : page[page.length - 1].id;
+        cacheReplace(db, afterId, upperId, page);
+      }
+    } catch (err) {
+      if (generation !== this.generation) return;
+      this.failed = true;
+      this.onError(err);
+    } finally {
+      if (generation === this.generation) {
+        this.loading = false;
+        this.render();
+      }
+    }
+  }
+
+  // Index of the first loaded row whose id is >= id
+  indexOf(id) {
+    let lo = 0;
+    let hi = this.rows.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.rows[mid].id < id) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+
+  replaceAfter(afterId, page) {
+    this.rows.splice(this.indexOf(afterId + 1), Infinity, ...page);
+  }
+
+  // Whether id falls inside what has been loaded (rows past it arrive with later pages)
+  covers(id) {
+    return this.complete || (this.rows.length > 0 && id <= this.rows[this.rows.length - 1].id);
+  }
+
+  // Add or replace one calculation
+  upsert(calc) {
+    if (!this.covers(calc.id)) return;
+    const index = this.indexOf(calc.id);
+    const exists = index < this.rows.length && this.rows[index].id === calc.id;
+    this.rows.splice(index, exists ? 1 : 0, calc);
+    this.cache.then(db => cacheWrite(db, calc));
+    this.render();
+  }
+
+  // Drop one calculation by id
+  remove(id) {
+    const index = this.indexOf(id);
+    if (index < this.rows.length && this.rows[index].id === id) {
+      this.rows.splice(index, 1);
+    }
+    this.cache.then(db => cacheWrite(db, id));
+    this.render();
+  }
+
+  scheduleRender() {
+    if (this.frame === null) {
+      this.frame = requestAnimationFrame(() => {
+        this.frame = null;
+        this.render();
+      });
+    }
+  }
+
+  // Patch the DOM to show the rows in view; cost depends on the viewport, not on rows.length
+  render() {
+    const total = this.rows.length;
+    this.spacer.style.height = `${total * ROW_HEIGHT}px`;
+    const scrollTop = this.listEl.scrollTop;
+    const first = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN);
+    const last = Math.min(total, Math.ceil((scrollTop + this.listEl.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+
+    const visible = new Set();
+    let anchor = this.spacer;
+    for (let index = first; index < last; index++) {
+      const calc = this.rows[index];
+      visible.add(calc.id);
+      let node = this.nodes.get(calc.id);
+      if (!node) {
+        const el = document.createElement('li');
+        el.className = 'calculation-item';
+        node = { el, signature: null, top: null };
+        this.nodes.set(calc.id, node);
+      }
+      const signature = `${calc.a}|${calc.b}|${calc.type}`;
+      if (node.signature !== signature) {
+        this.renderRow(calc, node.el);
+        node.signature = signature;
+      }
+      const top = index * ROW_HEIGHT;
+      if (node.top !== top) {
+        node.el.style.top = `${top}px`;
+        node.top = top;
+      }
+      // Keep DOM order equal to list order for tabbing and screen readers
+      if (anchor.nextSibling !== node.el) {
+        this.listEl.insertBefore(node.el, anchor.nextSibling);
+      }
+      anchor = node.el;
+    }
+    for (const [id, node] of this.nodes) {
+      if (!visible.has(id)) {
+        node.el.remove();
+        this.nodes.delete(id);
+      }
+    }
+
+    if (this.loading) {
+      this.status.textContent = 'Loading calculations...';
+    } else if (this.loaded && this.complete && total === 0) {
+      this.status.textContent = this.emptyText;
+    } else {
+      this.status.textContent = '';
+    }
+    this.status.style.display = this.status.textContent ? 'block' : 'none';
+
+    if (this.loaded && !this.complete && !this.loading && !this.failed && last >= total - OVERSCAN) {
+      this.loadNextPage();
+    }
+  }
+}
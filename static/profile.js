@@ -319,7 +319,15 @@ document.getElementById('newPassword').addEventListener('input', (e) => {
 document.getElementById('logoutLink').addEventListener('click', (e) => {
     e.preventDefault();
     localStorage.removeItem('token');
-    window.location.href = '/static/login.html';
+    // Calculations cached by calculations.html (calculation_list.js) go with the session
+    if (!window.indexedDB) {
+        window.location.href = '/static/login.html';
+        return;
+    }
+    const request = indexedDB.deleteDatabase('calculations-cache');
+    request.onsuccess = request.onerror = request.onblocked = () => {
+        window.location.href = '/static/login.html';
+    };
 });
 
 // Initialize on page load
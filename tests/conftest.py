@@ -1,7 +1,9 @@
 import pytest
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
 from app.main import app
@@ -15,34 +17,107 @@ def test_db(db_session):
 
 # Get DATABASE_URL from environment or use default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test_db.db")
+# TEST_DB_IN_MEMORY=1 runs against one shared in-memory SQLite connection instead
+TEST_DB_IN_MEMORY = os.getenv("TEST_DB_IN_MEMORY", "").lower() in ("1", "true", "yes")
+# Set by pytest-xdist in worker processes ("gw0", "gw1", ...)
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+
+def worker_database_url(url: str, worker: str | None) -> str:
+    """Give every xdist worker its own database: test_db_gw0.db, calculator_db_gw0, ..."""
+    if not worker:
+        return url
+    parsed = make_url(url)
+    if not parsed.database or parsed.database == ":memory:":
+        return url
+    if parsed.get_backend_name() == "sqlite":
+        root, ext = os.path.splitext(parsed.database)
+        return parsed.set(database=f"{root}_{worker}{ext}").render_as_string(hide_password=False)
+    return parsed.set(database=f"{parsed.database}_{worker}").render_as_string(hide_password=False)
+
+
+def _create_database(url: str) -> None:
+    """Create a per-worker server database (PostgreSQL) if it does not exist yet"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return
+    admin = create_engine(parsed.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            exists = conn.scalar(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": parsed.database})
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{parsed.database}"'))
+    finally:
+        admin.dispose()
+
+
+if TEST_DB_IN_MEMORY:
+    TEST_DATABASE_URL = "sqlite://"
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+else:
+    TEST_DATABASE_URL = worker_database_url(DATABASE_URL, XDIST_WORKER)
+    if TEST_DATABASE_URL != DATABASE_URL:
+        _create_database(TEST_DATABASE_URL)
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False} if TEST_DATABASE_URL.startswith("sqlite") else {}
+    )
+
+if engine.dialect.name == "sqlite":
+    # pysqlite defers BEGIN and breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+    # (https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl)
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
 # Create session factory
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def clear_tables(bind=engine) -> None:
+    """Delete every row, for tests that commit through the engine outside db_session"""
+    with bind.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_schema():
+    """Create all tables once per test session (per xdist worker) and drop them at the end"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """
-    Create a fresh database for each test.
-    
-    Creates all tables, yields the session, then drops all tables.
+    Session inside a transaction that is rolled back after the test.
+
+    The session joins an outer connection-level transaction with
+    join_transaction_mode="create_savepoint". Code under test can commit and
+    roll back freely, because those only release or roll back SAVEPOINTs, and
+    the test leaves no rows behind.
     """
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    db = TestingSessionLocal()
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
-        # Drop all tables after test
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -50,7 +125,7 @@ def override_get_db(db_session):
     """Override the get_db dependency for API tests"""
     def _override_get_db():
         return db_session
-    
+
     app.dependency_overrides[get_db] = _override_get_db
     yield db_session
     app.dependency_overrides.clear()
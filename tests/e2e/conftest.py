@@ -1,74 +1,168 @@
-import pytest
+"""
+E2E fixtures: one uvicorn server and one Chromium per test session.
+
+Each session (or each pytest-xdist worker) starts its own server on a free
+port, backed by a fresh SQLite database in a temporary directory, and waits
+for GET /ready (warm-up finished, database answering) before running tests. Every test gets a new browser context,
+so cookies and localStorage never leak between tests, but Chromium itself is
+launched only once.
+
+    pytest tests/e2e                      # one server, one browser
+    pytest tests/e2e -n auto              # one server and browser per worker
+    pytest tests/e2e --shard 2/4          # the second quarter of the tests (CI matrix)
+    E2E_BASE_URL=http://localhost:8000 pytest tests/e2e   # use an already running server
+"""
+import json
+import os
+import socket
 import subprocess
+import sys
 import time
-import os
+import urllib.error
+import urllib.request
+import zlib
+
+import pytest
 from playwright.sync_api import sync_playwright
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SERVER_START_TIMEOUT = float(os.getenv("E2E_SERVER_START_TIMEOUT", "30"))
+E2E_HEADED = os.getenv("E2E_HEADED", "").lower() in ("1", "true", "yes")
 
-@pytest.fixture(scope="session")
-def base_url():
-    """Base URL for the application"""
-    return os.getenv("BASE_URL", "http://localhost:8000")
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--shard", default=os.getenv("E2E_SHARD", ""),
+        help="run only shard K of N of the E2E tests, e.g. --shard 1/4 (or E2E_SHARD)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Without tests/e2e on the command line this conftest loads too late to add --shard
+    shard = config.getoption("--shard", default=None) or os.getenv("E2E_SHARD", "")
+    if not shard:
+        return
+    try:
+        index, total = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise pytest.UsageError(f"--shard must look like K/N, got {shard!r}")
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard index must be between 1 and {total}, got {index}")
+    # A stable hash of the node id keeps each test in the same shard on every machine
+    e2e_dir = os.path.dirname(os.path.abspath(__file__))
+    selected, deselected = [], []
+    for item in items:
+        in_shard = (
+            not str(item.path).startswith(e2e_dir)
+            or zlib.crc32(item.nodeid.encode()) % total == index - 1
+        )
+        (selected if in_shard else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen | None, log_path: str | None) -> None:
+    """Block until GET /ready answers 200, failing fast if the server process exits"""
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    delay = 0.05
+    while True:
+        try:
+            # /health only says the process is up; /ready answers 503 until warm-up is done
+            with urllib.request.urlopen(f"{base_url}/ready", timeout=2) as response:
+                if response.status == 200 and json.load(response).get("status") == "ready":
+                    return
+        except (urllib.error.URLError, ConnectionError, TimeoutError, ValueError):
+            pass
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"E2E server exited with code {process.returncode}:\n{_tail(log_path)}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"E2E server at {base_url} not ready after {SERVER_START_TIMEOUT}s:\n{_tail(log_path)}")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def _tail(path: str | None, lines: int = 40) -> str:
+    if not path or not os.path.exists(path):
+        return ""
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        return "".join(fh.readlines()[-lines:])
 
 
 @pytest.fixture(scope="session")
-def server(base_url):
+def server(tmp_path_factory):
     """
-    Start the FastAPI server for E2E tests.
-    Skip if server is already running (e.g., in CI or manual testing).
+    Start uvicorn on a free port with its own temporary database and yield its base URL.
+
+    With E2E_BASE_URL set, the already running server at that URL is used instead.
     """
-    # Check if server is already running
-    import socket
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    result = sock.connect_ex(('localhost', 8000))
-    sock.close()
-    
-    if result == 0:
-        # Server already running
-        print("Server already running at", base_url)
-        yield
+    external = os.getenv("E2E_BASE_URL")
+    if external:
+        base_url = external.rstrip("/")
+        _wait_until_ready(base_url, None, None)
+        yield base_url
         return
-    
-    # Start server
-    print("Starting FastAPI server...")
-    process = subprocess.Popen(
-        ["uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "8000"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    # Wait for server to start
-    max_retries = 30
-    for _ in range(max_retries):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('localhost', 8000))
-        sock.close()
-        if result == 0:
-            print("Server started successfully")
-            break
-        time.sleep(0.5)
-    else:
-        process.kill()
-        raise RuntimeError("Failed to start server")
-    
-    yield
-    
-    # Cleanup
-    process.terminate()
-    process.wait(timeout=5)
 
+    workdir = tmp_path_factory.mktemp("e2e-server")
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = str(workdir / "server.log")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir / 'e2e.db'}",
+        "SLOW_QUERY_LOG": str(workdir / "slow_queries.jsonl"),
+        "PYTHONUNBUFFERED": "1",
+    }
+    with open(log_path, "w") as log:
+        # Output goes to a file: an unread PIPE fills up and blocks the server
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=PROJECT_ROOT,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        _wait_until_ready(base_url, process, log_path)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
 
-@pytest.fixture(scope="function")
-def browser_context(server, base_url):
-    """Create a browser context for each test"""
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(base_url=base_url)
-        yield context
-        context.close()
+
+@pytest.fixture(scope="session")
+def base_url(server):
+    """Base URL of the server under test"""
+    return server
+
+
+@pytest.fixture(scope="session")
+def browser():
+    """One Chromium instance shared by every test of the session"""
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=not E2E_HEADED)
+        yield browser
         browser.close()
 
 
+@pytest.fixture(scope="function")
+def browser_context(browser, base_url):
+    """A fresh, isolated browser context (cookies, localStorage) for each test"""
+    context = browser.new_context(base_url=base_url)
+    yield context
+    context.close()
+
+
 @pytest.fixture(scope="function")
 def page(browser_context):
     """Create a new page for each test"""
@@ -0,0 +1,57 @@
+# tests/integration/test_admission.py
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.admission import DEFAULT_POLICIES, AdaptiveLimiter, AdmissionMiddleware, Policy
+from app.main import app
+
+
+def _saturated_client() -> tuple[TestClient, dict[str, AdaptiveLimiter]]:
+    """The app behind limiters that are all full and have no queue"""
+    policy = Policy(initial_limit=1, min_limit=1, max_limit=1, max_queue=0, queue_timeout_ms=100, target_ms=100)
+    limiters = {name: AdaptiveLimiter(policy) for name in DEFAULT_POLICIES}
+    for limiter in limiters.values():
+        limiter.in_flight = 1
+    return TestClient(AdmissionMiddleware(app, limiters)), limiters
+
+
+class TestAdmissionControl:
+    """Integration tests for load shedding in front of the API"""
+
+    def test_overloaded_request_gets_503_with_retry_after(self, override_get_db):
+        """Test a request that cannot be admitted fails fast with Retry-After"""
+        client, _ = _saturated_client()
+        before = metrics.ADMISSION_REJECTED.labels("auth", "queue_full").value
+
+        response = client.post("/login", json={"email": "shed@example.com", "password": "password123"})
+
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Server is overloaded, retry later"}
+        assert int(response.headers["retry-after"]) >= 1
+        assert metrics.ADMISSION_REJECTED.labels("auth", "queue_full").value == before + 1
+
+    def test_health_and_metrics_bypass_admission(self, override_get_db):
+        """Test probes and scrapes still answer while every class is saturated"""
+        client, _ = _saturated_client()
+
+        assert client.get("/health").status_code == 200
+        assert client.get("/ready").status_code == 200
+        text = client.get("/metrics").text
+        assert 'admission_in_flight{route_class="read"}' in text
+        assert 'admission_rejected_total{route_class="auth",reason="queue_full"}' in text
+
+    def test_admitted_request_releases_its_slot(self, override_get_db):
+        """Test a served request frees its slot and feeds the limiter"""
+        client, limiters = _saturated_client()
+        limiters["read"].in_flight = 0
+
+        response = client.get("/api/calculations/")
+
+        assert response.status_code == 401
+        assert limiters["read"].in_flight == 0
+        assert limiters["read"].avg_latency < 0.1
+
+    def test_app_serves_requests_with_admission_enabled(self, client):
+        """Test the default middleware stack admits normal traffic"""
+        response = client.post("/register", json={"email": "admitted@example.com", "password": "password123"})
+        assert response.status_code in (200, 201)
@@ -0,0 +1,103 @@
+# tests/integration/test_batch_api.py
+from app import crud, models, schemas, security
+
+
+def _setup(db_session):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username="batcher",
+        email="batcher@example.com",
+        password="password123",
+    ))
+    calc = models.Calculation(a=10, b=5, type="Add", user_id=user.id)
+    db_session.add(calc)
+    db_session.commit()
+    token = security.create_access_token({"sub": user.email})
+    return user, calc.id, {"Authorization": f"Bearer {token}"}
+
+
+class TestBatchAPI:
+    """Integration tests for POST /api/batch"""
+
+    def test_batch_runs_all_operations(self, client, db_session):
+        """Test a mixed batch of create/read/update/delete operations"""
+        user, calc_id, headers = _setup(db_session)
+
+        response = client.post("/api/batch", headers=headers, json={"operations": [
+            {"op": "create", "data": {"a": 2, "b": 3, "type": "Multiply"}},
+            {"op": "read", "id": calc_id},
+            {"op": "update", "id": calc_id, "data": {"a": 20}},
+            {"op": "delete", "id": calc_id},
+        ]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["committed"] is True
+        assert [r["status"] for r in body["results"]] == [201, 200, 200, 204]
+        assert body["results"][0]["data"]["result"] == 6.0
+        assert body["results"][1]["data"]["result"] == 15.0
+        assert body["results"][2]["data"]["result"] == 25.0
+        remaining = crud.get_user_calculations(db_session, user.id)
+        assert [calc.a for calc in remaining] == [2.0]
+
+    def test_atomic_batch_rolls_back_on_failure(self, client, db_session):
+        """Test that one failure undoes the whole atomic batch"""
+        user, calc_id, headers = _setup(db_session)
+
+        response = client.post("/api/batch", headers=headers, json={"operations": [
+            {"op": "create", "data": {"a": 1, "b": 1, "type": "Add"}},
+            {"op": "update", "id": 99999, "data": {"a": 1}},
+            {"op": "delete", "id": calc_id},
+        ]})
+
+        assert response.status_code == 409
+        body = response.json()
+        assert body["committed"] is False
+        assert [r["status"] for r in body["results"]] == [424, 404, 424]
+        assert body["results"][0]["data"] is None
+        assert "Rolled back" in body["results"][0]["error"]
+        remaining = crud.get_user_calculations(db_session, user.id)
+        assert [calc.id for calc in remaining] == [calc_id]
+
+    def test_best_effort_batch_skips_failures(self, client, db_session):
+        """Test that best_effort keeps successful operations around a failure"""
+        user, calc_id, headers = _setup(db_session)
+
+        response = client.post("/api/batch", headers=headers, json={
+            "mode": "best_effort",
+            "operations": [
+                {"op": "create", "data": {"a": 1, "b": 1, "type": "Add"}},
+                {"op": "create", "data": {"a": 1, "b": 0, "type": "Divide"}},
+                {"op": "update", "id": calc_id, "data": {"type": "Divide", "b": 0}},
+                {"op": "delete", "id": calc_id},
+            ],
+        })
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["committed"] is True
+        assert [r["status"] for r in body["results"]] == [201, 422, 422, 204]
+        remaining = crud.get_user_calculations(db_session, user.id)
+        assert [calc.a for calc in remaining] == [1.0]
+
+    def test_batch_cannot_touch_other_users_rows(self, client, db_session):
+        """Test that batch operations are scoped to the caller"""
+        _, calc_id, _ = _setup(db_session)
+        other = crud.create_user(db_session, schemas.UserCreate(
+            username="other", email="other@example.com", password="password123"
+        ))
+        token = security.create_access_token({"sub": other.email})
+
+        response = client.post(
+            "/api/batch",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"mode": "best_effort", "operations": [{"op": "delete", "id": calc_id}]},
+        )
+
+        assert response.json()["results"][0]["status"] == 404
+        assert crud.get_calculation_by_id(db_session, calc_id) is not None
+
+    def test_batch_validates_operation_arguments(self, client, db_session):
+        """Test that operations missing their id or data are rejected"""
+        _, _, headers = _setup(db_session)
+        response = client.post("/api/batch", headers=headers, json={"operations": [{"op": "delete"}]})
+        assert response.status_code == 422
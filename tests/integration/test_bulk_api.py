@@ -0,0 +1,110 @@
+# tests/integration/test_bulk_api.py
+from app import crud, models, schemas, security
+
+
+def _setup(db_session, email="bulk@example.com"):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=email.split("@")[0],
+        email=email,
+        password="password123",
+    ))
+    db_session.add_all([
+        models.Calculation(a=1, b=2, type="Add", user_id=user.id),
+        models.Calculation(a=5, b=2, type="Sub", user_id=user.id),
+        models.Calculation(a=10, b=2, type="Divide", user_id=user.id),
+        models.Calculation(a=20, b=4, type="Multiply", user_id=user.id),
+    ])
+    db_session.commit()
+    token = security.create_access_token({"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+class TestBulkDelete:
+    """Integration tests for POST /api/calculations/bulk-delete"""
+
+    def test_bulk_delete_by_operand_range(self, client, db_session):
+        """Test deleting rows whose operand falls in a range"""
+        user, headers = _setup(db_session)
+
+        response = client.post(
+            "/api/calculations/bulk-delete", json={"a_min": 5, "a_max": 10}, headers=headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"affected": 2}
+        remaining = crud.get_user_calculations(db_session, user.id)
+        assert sorted(calc.a for calc in remaining) == [1, 20]
+
+    def test_bulk_delete_by_ids_only_touches_own_rows(self, client, db_session):
+        """Test that ids belonging to another user are never deleted"""
+        owner, _ = _setup(db_session, "owner@example.com")
+        _, headers = _setup(db_session, "intruder@example.com")
+        owner_ids = [calc.id for calc in crud.get_user_calculations(db_session, owner.id)]
+
+        response = client.post(
+            "/api/calculations/bulk-delete", json={"ids": owner_ids}, headers=headers
+        )
+
+        assert response.json() == {"affected": 0}
+        assert len(crud.get_user_calculations(db_session, owner.id)) == 4
+
+    def test_bulk_delete_requires_a_criterion(self, client, db_session):
+        """Test that an empty filter is rejected"""
+        _, headers = _setup(db_session)
+        response = client.post("/api/calculations/bulk-delete", json={}, headers=headers)
+        assert response.status_code == 422
+
+
+class TestBulkUpdate:
+    """Integration tests for POST /api/calculations/bulk-update"""
+
+    def test_bulk_update_by_type(self, client, db_session):
+        """Test updating every row of a type in one call"""
+        user, headers = _setup(db_session)
+
+        response = client.post(
+            "/api/calculations/bulk-update",
+            json={"filter": {"type": "Add"}, "update": {"type": "Multiply", "a": 3}},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"affected": 1}
+        read = client.get("/api/calculations/", headers=headers).json()
+        multiplies = [calc for calc in read if calc["type"] == "Multiply"]
+        assert sorted(calc["result"] for calc in multiplies) == [6.0, 80.0]
+
+    def test_bulk_update_rejects_zero_divisor(self, client, db_session):
+        """Test that no row is changed if a Divide row would get b=0"""
+        user, headers = _setup(db_session)
+
+        response = client.post(
+            "/api/calculations/bulk-update",
+            json={"filter": {"b_max": 2}, "update": {"b": 0}},
+            headers=headers,
+        )
+
+        assert response.status_code == 400
+        assert all(calc.b != 0 for calc in crud.get_user_calculations(db_session, user.id))
+
+    def test_bulk_update_zero_divisor_allowed_for_other_types(self, client, db_session):
+        """Test b=0 is fine when no matching row divides"""
+        _, headers = _setup(db_session)
+
+        response = client.post(
+            "/api/calculations/bulk-update",
+            json={"filter": {"type": "Sub"}, "update": {"b": 0}},
+            headers=headers,
+        )
+
+        assert response.json() == {"affected": 1}
+
+    def test_bulk_update_requires_fields(self, client, db_session):
+        """Test that an update with no fields is rejected"""
+        _, headers = _setup(db_session)
+        response = client.post(
+            "/api/calculations/bulk-update",
+            json={"filter": {"type": "Add"}, "update": {}},
+            headers=headers,
+        )
+        assert response.status_code == 422
@@ -0,0 +1,61 @@
+# tests/integration/test_calculation_pages.py
+from app import crud, models, schemas, security
+from app.routers.calculations_router import MAX_PAGE_SIZE
+
+
+def _setup(db_session, count: int, email: str = "pager@example.com"):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=email.split("@")[0],
+        email=email,
+        password="password123",
+    ))
+    db_session.add_all([models.Calculation(a=float(i), b=2, type="Add", user_id=user.id) for i in range(count)])
+    db_session.commit()
+    token = security.create_access_token({"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+class TestCalculationPages:
+    """Integration tests for keyset paging of GET /api/calculations/"""
+
+    def test_pages_cover_the_list_in_id_order(self, client, db_session):
+        """Test walking pages by the last id returns every calculation exactly once"""
+        _, headers = _setup(db_session, 7)
+        everything = client.get("/api/calculations/", headers=headers).json()
+
+        pages, after_id = [], 0
+        while True:
+            page = client.get(f"/api/calculations/?limit=3&after_id={after_id}", headers=headers).json()
+            pages.append(page)
+            if len(page) < 3:
+                break
+            after_id = page[-1]["id"]
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        ids = [calc["id"] for page in pages for calc in page]
+        assert ids == sorted(ids)
+        assert ids == sorted(calc["id"] for calc in everything)
+        assert pages[0][0]["result"] == 2.0
+
+    def test_pages_are_per_user(self, client, db_session):
+        """Test a page only holds the caller's calculations"""
+        _setup(db_session, 3, email="other@example.com")
+        user, headers = _setup(db_session, 2)
+
+        page = client.get("/api/calculations/?limit=10", headers=headers).json()
+        assert [calc["user_id"] for calc in page] == [user.id, user.id]
+
+    def test_past_the_end_is_empty(self, client, db_session):
+        """Test a cursor after the last id returns an empty page"""
+        _, headers = _setup(db_session, 2)
+        last = client.get("/api/calculations/?limit=2", headers=headers).json()[-1]["id"]
+
+        assert client.get(f"/api/calculations/?limit=2&after_id={last}", headers=headers).json() == []
+
+    def test_limit_is_bounded(self, client, db_session):
+        """Test page sizes outside 1..MAX_PAGE_SIZE are rejected"""
+        _, headers = _setup(db_session, 1)
+
+        assert client.get("/api/calculations/?limit=0", headers=headers).status_code == 422
+        assert client.get(f"/api/calculations/?limit={MAX_PAGE_SIZE + 1}", headers=headers).status_code == 422
+        assert client.get("/api/calculations/?after_id=-1&limit=5", headers=headers).status_code == 422
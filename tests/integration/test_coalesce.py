@@ -0,0 +1,106 @@
+# tests/integration/test_coalesce.py
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app import crud, models, schemas, security
+from app.main import app
+from tests.conftest import engine
+from tests.query_budget import QueryRecorder
+
+BURST = 10
+
+
+@pytest.fixture
+def slow_user_lookup(monkeypatch):
+    """
+    Slow down the first query of each execution so a burst overlaps it.
+
+    Executions that are not coalesced share the test's single Session, so
+    their queries are serialized with a lock (the sleep stays outside it).
+    """
+    lock = threading.Lock()
+    lookup, list_calculations = crud.get_user_by_email, crud.get_user_calculations
+
+    def slow(db, email):
+        time.sleep(0.2)
+        with lock:
+            return lookup(db, email)
+
+    def locked(*args, **kwargs):
+        with lock:
+            return list_calculations(*args, **kwargs)
+
+    monkeypatch.setattr(crud, "get_user_by_email", slow)
+    monkeypatch.setattr(crud, "get_user_calculations", locked)
+
+
+def _headers(email: str) -> dict:
+    return {"Authorization": f"Bearer {security.create_access_token({'sub': email})}"}
+
+
+def _user(db_session, name: str, calculations: int = 3) -> models.User:
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=name, email=f"{name}@example.com", password="password123"
+    ))
+    db_session.add_all([models.Calculation(a=i, b=2, type="Add", user_id=user.id) for i in range(calculations)])
+    db_session.commit()
+    return user
+
+
+async def _burst(requests: list[tuple[str, dict]]) -> list[httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(path, headers=headers) for path, headers in requests))
+
+
+class TestCoalescedReads:
+    """Integration tests for single-flight coalescing of identical reads"""
+
+    def test_burst_of_list_requests_runs_one_execution(self, override_get_db, slow_user_lookup):
+        """Test a burst of identical calculation lists costs one user lookup and one list query"""
+        _user(override_get_db, "burst")
+        headers = _headers("burst@example.com")
+
+        with QueryRecorder(engine) as queries:
+            responses = asyncio.run(_burst([("/api/calculations/", headers)] * BURST))
+
+        assert [response.status_code for response in responses] == [200] * BURST
+        assert all(len(response.json()) == 3 for response in responses)
+        assert len(queries.statements) == 2
+        timings = [response.headers.get("server-timing", "") for response in responses]
+        assert sum("coalesced;" in header for header in timings) == BURST - 1
+
+    def test_burst_of_profile_requests_runs_one_query(self, override_get_db, slow_user_lookup):
+        """Test a burst of identical profile reads costs a single query"""
+        _user(override_get_db, "profiled", calculations=0)
+
+        with QueryRecorder(engine) as queries:
+            responses = asyncio.run(_burst([("/profile", _headers("profiled@example.com"))] * BURST))
+
+        assert {response.json()["email"] for response in responses} == {"profiled@example.com"}
+        assert len(queries.statements) == 1
+
+    def test_users_and_parameters_are_not_shared(self, override_get_db, slow_user_lookup):
+        """Test concurrent reads of different users or query parameters run separately"""
+        _user(override_get_db, "alice", calculations=1)
+        _user(override_get_db, "bob", calculations=2)
+
+        responses = asyncio.run(_burst([
+            ("/api/calculations/", _headers("alice@example.com")),
+            ("/api/calculations/", _headers("bob@example.com")),
+            ("/api/calculations/?include_archived=true", _headers("bob@example.com")),
+        ]))
+
+        assert [len(response.json()) for response in responses] == [1, 2, 2]
+        assert all("coalesced;" not in response.headers.get("server-timing", "") for response in responses)
+
+    def test_errors_are_shared(self, override_get_db, slow_user_lookup):
+        """Test every coalesced request gets the leader's error response"""
+        responses = asyncio.run(_burst([("/api/calculations/", _headers("ghost@example.com"))] * 3))
+
+        assert [response.status_code for response in responses] == [401] * 3
+        assert all(response.json()["detail"] == "User not found" for response in responses)
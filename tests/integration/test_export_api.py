@@ -0,0 +1,144 @@
+# tests/integration/test_export_api.py
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+
+from sqlalchemy import insert
+
+from app import crud, models, schemas, security
+from app.services import exporter
+
+
+def _create_user(db_session, username="exporter", email="exporter@example.com"):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=username,
+        email=email,
+        password="password123",
+    ))
+    token = security.create_access_token({"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+def _add_calculations(db_session, user_id, count):
+    db_session.execute(
+        insert(models.Calculation),
+        [{"a": float(i), "b": 2.0, "type": "Multiply", "user_id": user_id} for i in range(count)],
+    )
+    db_session.commit()
+
+
+class TestExportAPI:
+    """Integration tests for GET /api/calculations/export"""
+
+    def test_export_ndjson_only_own_rows(self, client, db_session):
+        """Test NDJSON export streams only the caller's calculations in id order"""
+        user, headers = _create_user(db_session)
+        other, _ = _create_user(db_session, "other", "other@example.com")
+        _add_calculations(db_session, user.id, 3)
+        _add_calculations(db_session, other.id, 2)
+
+        response = client.get("/api/calculations/export", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["a"] for row in rows] == [0.0, 1.0, 2.0]
+        assert all(row["user_id"] == user.id for row in rows)
+        assert rows[2]["result"] == 4.0
+
+    def test_export_csv(self, client, db_session):
+        """Test CSV export includes a header and computed results"""
+        user, headers = _create_user(db_session)
+        _add_calculations(db_session, user.id, 2)
+
+        response = client.get("/api/calculations/export?format=csv", headers=headers)
+
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2
+        assert rows[1]["type"] == "Multiply"
+        assert float(rows[1]["result"]) == 2.0
+
+    def test_export_resume_after_id(self, client, db_session):
+        """Test after_id resumes the export past already received rows"""
+        user, headers = _create_user(db_session)
+        _add_calculations(db_session, user.id, 5)
+        first = [json.loads(line) for line in client.get(
+            "/api/calculations/export", headers=headers
+        ).text.splitlines()]
+
+        response = client.get(
+            f"/api/calculations/export?after_id={first[2]['id']}", headers=headers
+        )
+
+        resumed = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in resumed] == [row["id"] for row in first[3:]]
+
+    def test_export_gzip(self, client, db_session):
+        """Test gzip=true compresses the stream on the fly"""
+        user, headers = _create_user(db_session)
+        _add_calculations(db_session, user.id, 3)
+
+        response = client.get("/api/calculations/export?gzip=true", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        # httpx transparently decodes the gzip stream
+        assert len(response.text.splitlines()) == 3
+
+    def test_export_all_users_requires_admin(self, client, db_session):
+        """Test that exporting every user's data is admin only"""
+        _, headers = _create_user(db_session)
+
+        response = client.get("/api/calculations/export?all_users=true", headers=headers)
+
+        assert response.status_code == 403
+
+    def test_export_all_users_as_admin(self, client, db_session, monkeypatch):
+        """Test that admins can export every user's calculations"""
+        user, headers = _create_user(db_session)
+        other, _ = _create_user(db_session, "other", "other@example.com")
+        _add_calculations(db_session, user.id, 1)
+        _add_calculations(db_session, other.id, 2)
+        monkeypatch.setattr(security, "ADMIN_EMAILS", {user.email})
+
+        response = client.get("/api/calculations/export?all_users=true", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 3
+
+    def test_export_requires_auth(self, client):
+        """Test 401 without a token"""
+        response = client.get("/api/calculations/export")
+        assert response.status_code == 401
+
+
+class TestExportStreaming:
+    """Memory behaviour of the export pipeline"""
+
+    def test_export_memory_is_constant(self, db_session):
+        """Test peak allocation stays flat while streaming many rows"""
+        user, _ = _create_user(db_session)
+        _add_calculations(db_session, user.id, 50_000)
+
+        tracemalloc.start()
+        try:
+            rows = crud.iter_calculation_rows(db_session, user.id)
+            total = 0
+            for chunk in exporter.gzip_chunks(exporter.ndjson_chunks(rows)):
+                total += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert total > 0
+        # Materializing 50k rows would need tens of MB; streaming stays small
+        assert peak < 8 * 1024 * 1024
+
+    def test_gzip_stream_round_trips(self):
+        """Test that the gzip stream decompresses to the original text"""
+        chunks = ["a\n", "b\n", "c\n"]
+        data = b"".join(exporter.gzip_chunks(chunks))
+        assert gzip.decompress(data).decode() == "a\nb\nc\n"
@@ -0,0 +1,181 @@
+# tests/integration/test_import_api.py
+import gzip
+import json
+import zlib
+
+from sqlalchemy.exc import OperationalError
+
+from app import crud, models, schemas, security
+from app.services.importer import CalculationImporter
+from tests.memory_budget import MemoryRecorder
+
+
+def _gzip_bomb(size_mb: int, suffix: bytes) -> bytes:
+    """gzip of size_mb MiB of "x" with no newline, followed by suffix"""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    block = b"x" * 2 ** 20
+    parts = [compressor.compress(block) for _ in range(size_mb)]
+    return b"".join(parts + [compressor.compress(suffix), compressor.flush()])
+
+
+def _auth_headers(db_session, email="importer@example.com"):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=email.split("@")[0],
+        email=email,
+        password="password123",
+    ))
+    token = security.create_access_token({"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+class TestImportAPI:
+    """Integration tests for POST /api/calculations/import"""
+
+    def test_import_ndjson_reports_bad_lines(self, client, db_session):
+        """Test valid lines are imported while invalid ones are reported by line"""
+        user, headers = _auth_headers(db_session)
+        body = "\n".join([
+            json.dumps({"a": 1, "b": 2, "type": "Add"}),
+            "not json",
+            json.dumps({"a": 1, "b": 0, "type": "Divide"}),
+            json.dumps({"a": 3, "b": 4, "type": "Multiply"}),
+        ])
+
+        response = client.post("/api/calculations/import", content=body, headers=headers)
+
+        assert response.status_code == 200
+        report = response.json()
+        assert report["imported"] == 2
+        assert report["failed"] == 2
+        assert [err["line"] for err in report["errors"]] == [2, 3]
+        assert "cannot be zero" in report["errors"][1]["error"]
+        assert len(crud.get_user_calculations(db_session, user.id)) == 2
+
+    def test_import_csv_in_small_batches(self, client, db_session):
+        """Test CSV import with several chunked transactions"""
+        user, headers = _auth_headers(db_session)
+        lines = ["a,b,type"] + [f"{i},2,Sub" for i in range(25)]
+
+        response = client.post(
+            "/api/calculations/import?format=csv&batch_size=10",
+            content="\n".join(lines) + "\n",
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 25
+        calcs = crud.get_user_calculations(db_session, user.id)
+        assert len(calcs) == 25
+        assert all(calc.user_id == user.id for calc in calcs)
+
+    def test_import_gzip_body(self, client, db_session):
+        """Test that a gzip-encoded upload is decompressed while streaming"""
+        user, headers = _auth_headers(db_session)
+        body = "\n".join(json.dumps({"a": i, "b": 1, "type": "Add"}) for i in range(10))
+
+        response = client.post(
+            "/api/calculations/import",
+            content=gzip.compress(body.encode()),
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 10
+
+    def test_import_corrupt_gzip_body(self, client, db_session):
+        """Test that a corrupt or truncated gzip upload is a 400, not a 500"""
+        _, headers = _auth_headers(db_session)
+        compressed = gzip.compress(json.dumps({"a": 1, "b": 1, "type": "Add"}).encode())
+
+        for content in (b"not gzip at all", compressed[:-12]):
+            response = client.post(
+                "/api/calculations/import",
+                content=content,
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+            assert response.status_code == 400
+            assert "Invalid gzip body" in response.json()["detail"]
+
+    def test_compressed_long_line_stays_within_memory(self, client, db_session):
+        """Test a small gzip body inflating to one huge line neither buffers it nor aborts"""
+        _, headers = _auth_headers(db_session)
+        body = _gzip_bomb(64, b"\n" + json.dumps({"a": 1, "b": 2, "type": "Add"}).encode() + b"\n")
+        assert len(body) < 2 ** 20
+
+        with MemoryRecorder() as memory:
+            response = client.post(
+                "/api/calculations/import",
+                content=body,
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+
+        assert response.status_code == 200
+        report = response.json()
+        assert report["imported"] == 1
+        assert report["failed"] == 1
+        assert report["errors"][0]["line"] == 1
+        assert "Line longer than" in report["errors"][0]["error"]
+        memory.assert_budget(16)
+
+    def test_long_line_is_skipped_to_the_next_newline(self, db_session):
+        """Test an over-long line is one error and the lines after it still import"""
+        user, _ = _auth_headers(db_session)
+        importer = CalculationImporter(db_session, user.id, max_line_length=40)
+        good = json.dumps({"a": 1, "b": 2, "type": "Add"})
+
+        for piece in (good + "\n" + "y" * 30, "y" * 30, "y" * 30 + "\n" + good, "\n" + good):
+            importer.feed_text(piece)
+        report = importer.finish()
+
+        assert report["imported"] == 3
+        assert report["errors"] == [{"line": 2, "error": "Line longer than 40 characters"}]
+
+    def test_failed_batch_is_not_reported_as_truncated(self, db_session, monkeypatch):
+        """Test a failed batch counts all its rows but one error entry, without truncation"""
+        user, _ = _auth_headers(db_session)
+        importer = CalculationImporter(db_session, user.id, batch_size=5)
+
+        def fail(rows):
+            raise OperationalError("INSERT", {}, Exception("disk full"))
+
+        monkeypatch.setattr(importer, "_insert", fail)
+        importer.feed([json.dumps({"a": i, "b": 1, "type": "Add"}) for i in range(5)])
+        report = importer.finish()
+
+        assert report["failed"] == 5
+        assert len(report["errors"]) == 1
+        assert report["errors_truncated"] is False
+
+    def test_errors_truncated_past_the_cap(self, db_session):
+        """Test errors_truncated is set once error entries are dropped"""
+        user, _ = _auth_headers(db_session)
+        importer = CalculationImporter(db_session, user.id, max_errors=1)
+
+        importer.feed(["not json", "still not json"])
+        report = importer.finish()
+
+        assert report["failed"] == 2
+        assert len(report["errors"]) == 1
+        assert report["errors_truncated"] is True
+
+    def test_export_round_trips_through_import(self, client, db_session):
+        """Test that an export can be imported back unchanged"""
+        user, headers = _auth_headers(db_session)
+        db_session.add_all([
+            models.Calculation(a=5, b=3, type="Add", user_id=user.id),
+            models.Calculation(a=8, b=2, type="Divide", user_id=user.id),
+        ])
+        db_session.commit()
+        exported = client.get("/api/calculations/export?format=csv", headers=headers).text
+
+        response = client.post(
+            "/api/calculations/import?format=csv", content=exported, headers=headers
+        )
+
+        assert response.json()["imported"] == 2
+        assert len(crud.get_user_calculations(db_session, user.id)) == 4
+
+    def test_import_requires_auth(self, client):
+        """Test 401 without a token"""
+        response = client.post("/api/calculations/import", content="{}")
+        assert response.status_code == 401
@@ -0,0 +1,304 @@
+# tests/integration/test_jobs_api.py
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import crud, models, schemas, security
+from app.database import Base
+from app.services import jobs
+
+
+def _create_user(db_session, username="jobber", email="jobber@example.com"):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=username,
+        email=email,
+        password="password123",
+    ))
+    token = security.create_access_token({"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+def _add_calculations(db_session, user_id, count):
+    db_session.execute(
+        insert(models.Calculation),
+        [{"a": float(i), "b": 2.0, "type": "Multiply", "user_id": user_id} for i in range(count)],
+    )
+    db_session.commit()
+
+
+@pytest.fixture
+def runner(db_session, tmp_path, monkeypatch):
+    """A runner whose sessions join the test transaction; run jobs with runner.run_next()"""
+    monkeypatch.setattr(jobs, "JOB_OUTPUT_DIR", str(tmp_path))
+
+    def session_factory():
+        return Session(bind=db_session.bind, autoflush=False, join_transaction_mode="create_savepoint")
+
+    return jobs.JobRunner(workers=1, session_factory=session_factory)
+
+
+class TestJobsAPI:
+    """Integration tests for /api/jobs"""
+
+    def test_export_job_lifecycle(self, client, db_session, runner):
+        """Test an export is queued, runs with progress and its file can be downloaded"""
+        user, headers = _create_user(db_session)
+        _add_calculations(db_session, user.id, 7)
+
+        response = client.post("/api/jobs", json={"kind": "export", "params": {"format": "ndjson"}},
+                               headers=headers)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued" and job["progress"] is None
+
+        assert runner.run_next() is True
+        assert runner.run_next() is False
+
+        job = client.get(f"/api/jobs/{job['id']}", headers=headers).json()
+        assert job["status"] == "succeeded"
+        assert job["progress"] == 1.0
+        assert (job["progress_done"], job["progress_total"]) == (7, 7)
+        assert job["result"]["rows"] == 7
+        download = client.get(job["result"]["download"], headers=headers)
+        assert download.status_code == 200
+        rows = [json.loads(line) for line in download.text.splitlines()]
+        assert [row["a"] for row in rows] == [float(i) for i in range(7)]
+
+    def test_export_pages_and_gzip(self, client, db_session, runner, monkeypatch):
+        """Test a CSV export written in several keyset pages is complete"""
+        monkeypatch.setattr(jobs, "EXPORT_PAGE_ROWS", 2)
+        user, headers = _create_user(db_session)
+        _add_calculations(db_session, user.id, 5)
+        job = client.post("/api/jobs", json={"kind": "export", "params": {"format": "csv", "gzip": True}},
+                          headers=headers).json()
+
+        runner.run_next()
+
+        download = client.get(f"/api/jobs/{job['id']}/download", headers=headers)
+        assert download.headers["content-type"] == "application/gzip"
+        lines = gzip.decompress(download.content).decode().splitlines()
+        assert lines[0].startswith("id,a,b,type")
+        assert len(lines) == 6
+
+    def test_import_job(self, client, db_session, runner):
+        """Test an uploaded body is imported by the job and reported as its result"""
+        user, headers = _create_user(db_session)
+        body = '{"a": 1, "b": 2, "type": "Add"}\nnot json\n{"a": 3, "b": 4, "type": "Sub"}\n'
+
+        response = client.post("/api/jobs/import?format=ndjson", content=gzip.compress(body.encode()),
+                               headers={**headers, "Content-Encoding": "gzip"})
+        assert response.status_code == 202
+        runner.run_next()
+
+        job = client.get(f"/api/jobs/{response.json()['id']}", headers=headers).json()
+        assert job["status"] == "succeeded"
+        assert job["result"]["imported"] == 2 and job["result"]["failed"] == 1
+        assert len(crud.get_user_calculations(db_session, user.id)) == 2
+
+    def test_import_upload_rejects_bad_bodies(self, client, db_session, runner, tmp_path, monkeypatch):
+        """Test truncated gzip is a 400 and an oversized upload a 413, and neither queues a job"""
+        _, headers = _create_user(db_session)
+        body = gzip.compress(b'{"a": 1, "b": 2, "type": "Add"}\n' * 100)
+        gzip_headers = {**headers, "Content-Encoding": "gzip"}
+
+        response = client.post("/api/jobs/import", content=body[:-12], headers=gzip_headers)
+        assert response.status_code == 400
+
+        monkeypatch.setattr(jobs, "JOB_MAX_UPLOAD_BYTES", 1000)
+        response = client.post("/api/jobs/import", content=body, headers=gzip_headers)
+        assert response.status_code == 413
+
+        assert client.get("/api/jobs", headers=headers).json() == []
+        assert list(tmp_path.iterdir()) == []
+
+    def test_bulk_delete_job(self, client, db_session, runner):
+        """Test a bulk delete job removes matching rows and reports the count"""
+        user, headers = _create_user(db_session)
+        _add_calculations(db_session, user.id, 4)
+        ids = [calc.id for calc in crud.get_user_calculations(db_session, user.id)][:3]
+
+        job = client.post("/api/jobs", json={"kind": "bulk_delete", "params": {"ids": ids}}, headers=headers).json()
+        runner.run_next()
+
+        job = client.get(f"/api/jobs/{job['id']}", headers=headers).json()
+        assert job["status"] == "succeeded" and job["result"] == {"affected": 3}
+        assert len(crud.get_user_calculations(db_session, user.id)) == 1
+
+    def test_handler_error_fails_the_job(self, client, db_session, runner):
+        """Test a handler raising HTTPException ends the job as failed with its detail"""
+        user, headers = _create_user(db_session)
+        crud.create_calculation(db_session, schemas.CalculationCreate(a=1, b=2, type="Divide"), user_id=user.id)
+        params = {"filter": {"type": "Divide"}, "update": {"b": 0}}
+
+        job = client.post("/api/jobs", json={"kind": "bulk_update", "params": params}, headers=headers).json()
+        runner.run_next()
+
+        job = client.get(f"/api/jobs/{job['id']}", headers=headers).json()
+        assert job["status"] == "failed"
+        assert "zero divisor" in job["error"]
+
+    def test_invalid_requests(self, client, db_session):
+        """Test unknown kinds, bad params, admin-only and upload-only kinds are refused"""
+        _, headers = _create_user(db_session)
+
+        assert client.post("/api/jobs", json={"kind": "nope"}, headers=headers).status_code == 400
+        assert client.post("/api/jobs", json={"kind": "export", "params": {"format": "xml"}},
+                           headers=headers).status_code == 400
+        assert client.post("/api/jobs", json={"kind": "export", "priority": 99}, headers=headers).status_code == 422
+        assert client.post("/api/jobs", json={"kind": "retention", "params": {"max_age_days": 1}},
+                           headers=headers).status_code == 403
+        assert client.post("/api/jobs", json={"kind": "import"}, headers=headers).status_code == 400
+        assert client.post("/api/jobs", json={"kind": "export"}).status_code == 401
+
+    def test_jobs_are_private(self, client, db_session):
+        """Test users only see and cancel their own jobs"""
+        _, headers = _create_user(db_session)
+        _, other_headers = _create_user(db_session, "other", "other@example.com")
+        job = client.post("/api/jobs", json={"kind": "export"}, headers=headers).json()
+
+        assert client.get(f"/api/jobs/{job['id']}", headers=other_headers).status_code == 404
+        assert client.post(f"/api/jobs/{job['id']}/cancel", headers=other_headers).status_code == 404
+        assert client.get("/api/jobs", headers=other_headers).json() == []
+        assert [j["id"] for j in client.get("/api/jobs", headers=headers).json()] == [job["id"]]
+
+    def test_cancel_queued_then_delete(self, client, db_session, runner):
+        """Test a queued job is cancelled at once, never runs, and can then be deleted"""
+        _, headers = _create_user(db_session)
+        job = client.post("/api/jobs", json={"kind": "export"}, headers=headers).json()
+
+        assert client.delete(f"/api/jobs/{job['id']}", headers=headers).status_code == 409
+        cancelled = client.post(f"/api/jobs/{job['id']}/cancel", headers=headers).json()
+        assert cancelled["status"] == "cancelled"
+        assert runner.run_next() is False
+
+        assert client.delete(f"/api/jobs/{job['id']}", headers=headers).status_code == 204
+        assert client.get(f"/api/jobs/{job['id']}", headers=headers).status_code == 404
+
+
+class TestJobRunner:
+    """Integration tests for claiming, cancelling and recovering jobs"""
+
+    def test_priority_and_per_user_cap(self, db_session):
+        """Test the highest priority job runs first unless its user is at the concurrency cap"""
+        busy, _ = _create_user(db_session)
+        other, _ = _create_user(db_session, "other", "other@example.com")
+        first = jobs.enqueue(db_session, busy.id, "export", priority=5)
+        second = jobs.enqueue(db_session, busy.id, "export", priority=5)
+        low = jobs.enqueue(db_session, other.id, "export", priority=-1)
+
+        assert jobs.claim_next(db_session, user_concurrency=1) == first.id
+        assert jobs.claim_next(db_session, user_concurrency=1) == low.id
+        assert jobs.claim_next(db_session, user_concurrency=1) is None
+        assert jobs.claim_next(db_session, user_concurrency=2) == second.id
+
+    def test_claim_locks_job_and_user_before_counting(self, db_session, monkeypatch):
+        """Test the per-user count runs under the user's row lock and busy jobs are skipped, not awaited"""
+        user, _ = _create_user(db_session)
+        job = jobs.enqueue(db_session, user.id, "export")
+        statements = []
+        execute = db_session.execute
+
+        def recording(statement, *args, **kwargs):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            return execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db_session, "execute", recording)
+        assert jobs.claim_next(db_session, user_concurrency=1) == job.id
+
+        job_lock = next(i for i, sql in enumerate(statements) if "FOR UPDATE SKIP LOCKED" in sql)
+        user_lock = next(i for i, sql in enumerate(statements) if "FROM users" in sql and "FOR UPDATE" in sql)
+        claim = next(i for i, sql in enumerate(statements) if sql.startswith("UPDATE jobs"))
+        assert "FROM jobs" in statements[job_lock]
+        assert job_lock < user_lock < claim
+
+    def test_running_job_stops_at_next_progress_report(self, db_session, runner, monkeypatch):
+        """Test a cancel request reaches a running handler through progress()"""
+        user, _ = _create_user(db_session)
+        steps = []
+
+        def slow(ctx, params):
+            for step in range(10):
+                if step == 2:
+                    # What POST /api/jobs/{id}/cancel does while the job runs
+                    jobs.request_cancel(ctx.db, ctx.db.get(models.Job, ctx.job_id))
+                steps.append(step)
+                ctx.progress(step, 10, force=True)
+            return {}
+
+        monkeypatch.setitem(jobs.HANDLERS, "slow", jobs.JobKind(slow))
+        job = jobs.enqueue(db_session, user.id, "slow")
+
+        runner.run_next()
+
+        db_session.refresh(job)
+        assert job.status == "cancelled"
+        assert steps == [0, 1, 2]
+        assert job.progress_done == 1
+
+    def test_stale_jobs_are_requeued_or_failed(self, db_session):
+        """Test jobs whose worker died are retried until they run out of attempts"""
+        user, _ = _create_user(db_session)
+        old = datetime.now(timezone.utc) - timedelta(minutes=10)
+        retry = jobs.enqueue(db_session, user.id, "export")
+        give_up = jobs.enqueue(db_session, user.id, "export")
+        alive = jobs.enqueue(db_session, user.id, "export")
+        for job, attempts, heartbeat in ((retry, 1, old), (give_up, 3, old), (alive, 1, datetime.now(timezone.utc))):
+            job.status, job.attempts, job.heartbeat_at = "running", attempts, heartbeat
+        db_session.commit()
+
+        assert jobs.recover_stale(db_session, stale_seconds=60, max_attempts=3) == 2
+
+        for job in (retry, give_up, alive):
+            db_session.refresh(job)
+        assert (retry.status, give_up.status, alive.status) == ("queued", "failed", "running")
+
+    def test_background_threads_run_queued_jobs(self, tmp_path, monkeypatch):
+        """Test a started runner picks up a job on its own and stops cleanly"""
+        monkeypatch.setattr(jobs, "JOB_OUTPUT_DIR", str(tmp_path))
+        engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine, autoflush=False)
+        with factory() as db:
+            user, _ = _create_user(db)
+            _add_calculations(db, user.id, 3)
+            job_id = jobs.enqueue(db, user.id, "export").id
+
+        runner = jobs.JobRunner(workers=2, session_factory=factory, poll_interval=0.05)
+        runner.start()
+        try:
+            deadline = time.monotonic() + 10
+            with factory() as db:
+                while db.get(models.Job, job_id).status != "succeeded" and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    db.expire_all()
+                assert db.get(models.Job, job_id).result["rows"] == 3
+        finally:
+            runner.stop()
+            engine.dispose()
+        assert all(not thread.is_alive() for thread in runner._threads)
+
+    def test_stale_recovery_runs_on_its_own_interval(self, monkeypatch):
+        """Test maintenance polls often but only looks for stale jobs every recovery_interval"""
+        recoveries = []
+        monkeypatch.setattr(jobs, "recover_stale", lambda db, stale_seconds: recoveries.append(stale_seconds))
+
+        class NoSession:
+            def close(self):
+                pass
+
+        runner = jobs.JobRunner(workers=0, session_factory=NoSession, poll_interval=0.01,
+                                stale_seconds=60, recovery_interval=30)
+        thread = threading.Thread(target=runner._maintain)
+        thread.start()
+        time.sleep(0.3)
+        runner._stop_event.set()
+        thread.join(5)
+
+        assert recoveries == [60]
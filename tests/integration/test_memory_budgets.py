@@ -0,0 +1,94 @@
+# tests/integration/test_memory_budgets.py
+"""
+Peak-memory budgets for the endpoints whose allocations grow with row count.
+
+A user with ROWS calculations is seeded (and committed) once for the module,
+outside the per-test rollback of db_session. Each budget is
+the measured peak at the time it was set plus ~15% headroom. Lower a budget
+when an optimization lands so later changes cannot quietly undo it.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, schemas, security
+from app.database import get_db
+from app.main import app
+from app.tools.seed import seed
+from tests.conftest import TestingSessionLocal, clear_tables, engine
+from tests.memory_budget import MemoryRecorder
+
+ROWS = 100_000
+
+# Peak MB at ROWS rows
+BUDGETS = {
+    "list": 320,
+    "export": 21,
+    "import": 15,
+}
+
+
+@pytest.fixture(scope="module")
+def big_user():
+    """A client and the auth headers of a user owning ROWS calculations"""
+    report = seed(engine, users=1, calculations=ROWS)
+
+    def _get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    email = f"seed42-{report['first_user_id']}@example.com"
+    try:
+        yield TestClient(app), {"Authorization": f"Bearer {security.create_access_token({'sub': email})}"}
+    finally:
+        app.dependency_overrides.clear()
+        clear_tables()
+
+
+class TestMemoryBudgets:
+    """Peak allocation of list, export and import at ROWS rows"""
+
+    def test_list(self, big_user):
+        """Test browsing every calculation stays within its memory budget"""
+        client, headers = big_user
+        with MemoryRecorder() as memory:
+            response = client.get("/api/calculations/", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json()) == ROWS
+        memory.assert_budget(BUDGETS["list"])
+
+    def test_export(self, big_user):
+        """Test the NDJSON export streams within its memory budget"""
+        client, headers = big_user
+        with MemoryRecorder() as memory:
+            response = client.get("/api/calculations/export", headers=headers)
+
+        assert response.status_code == 200
+        assert response.content.count(b"\n") == ROWS
+        memory.assert_budget(BUDGETS["export"])
+
+    def test_import(self, big_user):
+        """Test importing ROWS lines stays within its memory budget"""
+        client, _ = big_user
+        db = TestingSessionLocal()
+        importer = crud.create_user(db, schemas.UserCreate(
+            username="memimporter", email="memimporter@example.com", password="password123"
+        ))
+        db.close()
+        headers = {"Authorization": f"Bearer {security.create_access_token({'sub': importer.email})}"}
+        body = "\n".join(
+            json.dumps({"a": i, "b": i % 97 + 1, "type": "Divide" if i % 4 == 0 else "Add"}) for i in range(ROWS)
+        ).encode()
+
+        with MemoryRecorder() as memory:
+            response = client.post("/api/calculations/import", content=body, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == ROWS
+        memory.assert_budget(BUDGETS["import"])
@@ -0,0 +1,104 @@
+# tests/integration/test_memory_profiler.py
+import tracemalloc
+
+import pytest
+
+from app import crud, memory_profiler, schemas, security
+
+
+@pytest.fixture
+def admin_headers(db_session, monkeypatch):
+    """An admin user; tracemalloc and the snapshot store are reset afterwards"""
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username="memadmin", email="memadmin@example.com", password="password123"
+    ))
+    monkeypatch.setattr(security, "ADMIN_EMAILS", {user.email})
+    yield {"Authorization": f"Bearer {security.create_access_token({'sub': user.email})}"}
+    memory_profiler.stop()
+    memory_profiler.STORE.clear()
+
+
+_retained = []
+
+
+def _allocate():
+    _retained.append([bytearray(1024) for _ in range(2000)])
+
+
+class TestMemoryProfiler:
+    """Integration tests for the tracemalloc admin endpoints"""
+
+    def test_snapshot_diff_finds_growth(self, client, admin_headers):
+        """Test the diff between two snapshots points at the allocating line"""
+        response = client.post("/admin/memory/start", params={"frames": 5}, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["tracing"] is True
+        assert response.json()["frames"] == 5
+
+        base = client.post("/admin/memory/snapshots", headers=admin_headers)
+        assert base.status_code == 201
+        _allocate()
+        try:
+            response = client.get("/admin/memory/diff", params={"base": base.json()["id"]}, headers=admin_headers)
+        finally:
+            _retained.clear()
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["base"]["id"] == base.json()["id"]
+        assert body["target"]["id"] == base.json()["id"] + 1
+        biggest = body["diff"][0]
+        assert biggest["file"] == __file__
+        assert biggest["size_diff_bytes"] >= 2000 * 1024
+
+    def test_snapshot_listing(self, client, admin_headers):
+        """Test stored snapshots can be listed, read and cleared"""
+        client.post("/admin/memory/start", headers=admin_headers)
+        taken = client.post("/admin/memory/snapshots", params={"group_by": "filename", "limit": 3},
+                            headers=admin_headers).json()
+        assert len(taken["top"]) <= 3
+        assert all(entry["line"] is None for entry in taken["top"])
+
+        assert [s["id"] for s in client.get("/admin/memory/snapshots", headers=admin_headers).json()] == [taken["id"]]
+        response = client.get(f"/admin/memory/snapshots/{taken['id']}", params={"group_by": "traceback"},
+                              headers=admin_headers)
+        assert response.status_code == 200
+        assert "traceback" in response.json()["top"][0]
+
+        assert client.delete("/admin/memory/snapshots", headers=admin_headers).status_code == 204
+        assert client.get(f"/admin/memory/snapshots/{taken['id']}", headers=admin_headers).status_code == 404
+
+    def test_snapshot_requires_tracing(self, client, admin_headers):
+        """Test snapshots are refused with 409 while tracemalloc is off"""
+        client.post("/admin/memory/stop", headers=admin_headers)
+
+        assert not tracemalloc.is_tracing()
+        assert client.post("/admin/memory/snapshots", headers=admin_headers).status_code == 409
+        status = client.get("/admin/memory", headers=admin_headers).json()
+        assert status["tracing"] is False
+
+    def test_requires_admin(self, client, db_session):
+        """Test non-admins cannot start tracing"""
+        user = crud.create_user(db_session, schemas.UserCreate(
+            username="notadmin", email="notadmin@example.com", password="password123"
+        ))
+        headers = {"Authorization": f"Bearer {security.create_access_token({'sub': user.email})}"}
+
+        assert client.post("/admin/memory/start", headers=headers).status_code == 403
+        assert not tracemalloc.is_tracing()
+
+
+class TestSnapshotStore:
+    """Unit-style tests for the bounded snapshot store"""
+
+    def test_oldest_snapshots_are_dropped(self):
+        """Test the store keeps only the newest `limit` snapshots"""
+        store = memory_profiler.SnapshotStore(limit=2)
+        memory_profiler.start(1)
+        try:
+            ids = [store.take()[0] for _ in range(3)]
+        finally:
+            memory_profiler.stop()
+
+        assert [s["id"] for s in store.summaries()] == ids[1:]
+        assert store.get(ids[0]) is None
@@ -0,0 +1,89 @@
+# tests/integration/test_metrics_api.py
+from sqlalchemy.exc import OperationalError
+
+from app import crud, schemas, security
+from app.database import get_db
+from app.main import app
+
+
+class TestMetricsEndpoint:
+    """Integration tests for GET /metrics"""
+
+    def test_routes_are_labelled_by_template(self, client, db_session):
+        """Test that requests for different ids share one route series"""
+        user = crud.create_user(db_session, schemas.UserCreate(
+            username="metrics", email="metrics@example.com", password="password123"
+        ))
+        headers = {"Authorization": f"Bearer {security.create_access_token({'sub': user.email})}"}
+        client.get("/api/calculations/101", headers=headers)
+        client.get("/api/calculations/202", headers=headers)
+
+        text = client.get("/metrics").text
+
+        assert 'route="/api/calculations/{calc_id}",status="404"' in text
+        assert "/api/calculations/101" not in text
+
+    def test_database_and_hashing_metrics(self, client):
+        """Test statement and PBKDF2 timings are recorded"""
+        client.post("/register", json={"email": "hashme@example.com", "password": "password123"})
+        client.post("/login", json={"email": "hashme@example.com", "password": "password123"})
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert 'db_statements_total{operation="SELECT"}' in text
+        assert 'db_statement_duration_seconds_count{operation="INSERT"}' in text
+        assert 'password_hash_duration_seconds_count{operation="hash"}' in text
+        assert 'password_hash_duration_seconds_count{operation="verify"}' in text
+        assert "http_requests_in_flight" in text
+
+
+class TestHealthEndpoint:
+    """Integration tests for GET /health"""
+
+    def test_health(self, client):
+        """Test the liveness check answers without authentication"""
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    def test_ready(self, client):
+        """Test the readiness check queries the database"""
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "database": "ok"}
+
+    def test_not_ready_without_database(self, client):
+        """Test the readiness check answers 503 when the database is unreachable"""
+        class UnreachableSession:
+            def execute(self, *args, **kwargs):
+                raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+        app.dependency_overrides[get_db] = lambda: UnreachableSession()
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Database unavailable"}
+
+
+class TestConcurrencyHealthMetrics:
+    """Integration tests for threadpool, event-loop and GC metrics"""
+
+    def test_metrics_after_startup(self, override_get_db):
+        """Test the server lifespan sizes the threadpool and starts the lag probe"""
+        from fastapi.testclient import TestClient
+
+        with TestClient(app) as client:
+            client.get("/health")
+            text = client.get("/metrics").text
+
+        assert "threadpool_tokens_total 40" in text
+        assert "threadpool_tokens_borrowed " in text
+        assert "threadpool_tasks_waiting " in text
+        assert "event_loop_lag_seconds_count" in text
+        assert 'gc_pause_seconds_count{generation="0"}' in text
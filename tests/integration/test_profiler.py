@@ -0,0 +1,82 @@
+# tests/integration/test_profiler.py
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud, models, profiler, schemas, security
+from app.main import app
+
+SECRET = "let-me-profile"
+
+
+@pytest.fixture
+def profiled_client(override_get_db, tmp_path, monkeypatch):
+    """Client whose app is wrapped in the profiler, storing profiles in tmp_path"""
+    monkeypatch.setattr(profiler, "PROFILE_SECRET", SECRET)
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    return TestClient(profiler.ProfilerMiddleware(app, interval_ms=0.5))
+
+
+_get_user_calculations = crud.get_user_calculations
+
+
+def _slow_get_user_calculations(*args, **kwargs):
+    # Guarantees the sampler catches the request inside the threadpool
+    time.sleep(0.05)
+    return _get_user_calculations(*args, **kwargs)
+
+
+def _auth_headers(db_session):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username="profiled", email="profiled@example.com", password="password123"
+    ))
+    db_session.add_all([models.Calculation(a=i, b=2, type="Add", user_id=user.id) for i in range(20)])
+    db_session.commit()
+    return {"Authorization": f"Bearer {security.create_access_token({'sub': user.email})}"}
+
+
+class TestProfiler:
+    """Integration tests for on-demand request profiling"""
+
+    def test_profiled_request_links_to_speedscope_file(self, profiled_client, db_session, tmp_path, monkeypatch):
+        """Test the secret header produces a profile covering the threadpool work"""
+        headers = _auth_headers(db_session)
+        monkeypatch.setattr(crud, "get_user_calculations", _slow_get_user_calculations)
+
+        response = profiled_client.get(
+            "/api/calculations/", headers={**headers, "X-Profile-Secret": SECRET}
+        )
+
+        assert response.status_code == 200
+        url = response.headers["x-profile-url"]
+        assert response.headers["link"] == f'<{url}>; rel="profile"'
+        name = url.rsplit("/", 1)[1]
+        document = json.loads((tmp_path / name).read_text())
+        assert document["profiles"][0]["type"] == "sampled"
+        frames = [frame["name"] for frame in document["shared"]["frames"]]
+        assert "[threadpool]" in frames
+        assert any(frame.startswith("_slow_get_user_calculations") for frame in frames)
+
+        download = profiled_client.get(url, headers={"X-Profile-Secret": SECRET})
+        assert download.status_code == 200
+        assert download.json()["name"] == "GET /api/calculations/"
+        assert profiled_client.get("/admin/profiles", headers={"X-Profile-Secret": SECRET}).json() == [name]
+
+    def test_requests_without_secret_are_not_profiled(self, profiled_client, tmp_path):
+        """Test that missing or wrong secrets leave the request untouched"""
+        assert "x-profile-url" not in profiled_client.get("/metrics").headers
+        wrong = profiled_client.get("/metrics", headers={"X-Profile-Secret": "guess"})
+        assert "x-profile-url" not in wrong.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_profile_download_requires_secret(self, profiled_client):
+        """Test that the admin endpoints reject callers without the secret"""
+        assert profiled_client.get("/admin/profiles").status_code == 403
+        response = profiled_client.get("/admin/profiles/../../etc/passwd", headers={"X-Profile-Secret": SECRET})
+        assert response.status_code == 404
+
+    def test_admin_endpoints_hidden_when_disabled(self, client):
+        """Test that profiling endpoints 404 without PROFILE_SECRET"""
+        assert client.get("/admin/profiles", headers={"X-Profile-Secret": ""}).status_code == 404
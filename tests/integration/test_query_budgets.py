@@ -0,0 +1,106 @@
+# tests/integration/test_query_budgets.py
+"""
+Per-endpoint SQL budgets: statement counts and index usage.
+
+A change that adds an N+1 query or a full-table scan to one of these routes
+fails here. If a new budget is genuinely needed, raise it in BUDGETS with a
+comment explaining why.
+"""
+import pytest
+
+from app import crud, models, schemas, security
+from tests.conftest import engine
+from tests.query_budget import QueryRecorder
+
+EMAIL = "budget@example.com"
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def seeded(db_session):
+    """A user with a few calculations, plus another user's data to search past"""
+    user = crud.create_user(db_session, schemas.UserCreate(username="budget", email=EMAIL, password=PASSWORD))
+    other = crud.create_user(db_session, schemas.UserCreate(
+        username="other", email="other@example.com", password=PASSWORD
+    ))
+    db_session.add_all(
+        [models.Calculation(a=i, b=2, type="Add", user_id=user.id) for i in range(5)]
+        + [models.Calculation(a=i, b=2, type="Add", user_id=other.id) for i in range(5)]
+    )
+    db_session.commit()
+    calc_id = crud.get_user_calculations(db_session, user.id)[0].id
+    headers = {"Authorization": f"Bearer {security.create_access_token({'sub': EMAIL})}"}
+    return {"user_id": user.id, "calc_id": calc_id, "headers": headers}
+
+
+# (method, path, json body, max statements, tables allowed to be scanned)
+BUDGETS = [
+    # ---- auth_router ----
+    ("POST", "/register", {"email": "new@example.com", "password": PASSWORD}, 4, ()),
+    ("POST", "/login", {"email": EMAIL, "password": PASSWORD}, 1, ()),
+    ("GET", "/profile", None, 1, ()),
+    ("PUT", "/profile", {"bio": "hello"}, 4, ()),
+    ("POST", "/change-password", {"current_password": PASSWORD, "new_password": "newpassword1",
+                                  "confirm_password": "newpassword1"}, 4, ()),
+    # ---- calculations_router ----
+    ("POST", "/api/calculations/", {"a": 1, "b": 2, "type": "Add"}, 3, ()),
+    ("GET", "/api/calculations/", None, 2, ()),
+    ("GET", "/api/calculations/?limit=50", None, 2, ()),
+    ("GET", "/api/calculations/{calc_id}", None, 2, ()),
+    ("PUT", "/api/calculations/{calc_id}", {"a": 7}, 4, ()),
+    ("DELETE", "/api/calculations/{calc_id}", None, 3, ()),
+    ("GET", "/api/calculations/export", None, 2, ()),
+    ("POST", "/api/calculations/bulk-delete", {"type": "Sub"}, 2, ()),
+    ("POST", "/api/calculations/bulk-update", {"filter": {"type": "Add"}, "update": {"a": 1}}, 2, ()),
+    # ---- legacy main.py routes ----
+    ("POST", "/users/", {"username": "legacy", "email": "legacy@example.com", "password": PASSWORD}, 2, ()),
+    ("POST", "/users/register", {"username": "legacy", "email": "legacy@example.com", "password": PASSWORD},
+     2, ()),
+    ("POST", "/users/login", {"email": EMAIL, "password": PASSWORD}, 1, ()),
+    ("GET", "/users/{user_id}", None, 1, ()),
+    ("POST", "/calculations/", {"a": 1, "b": 2, "type": "Add"}, 2, ()),
+    # Unauthenticated legacy listing returns every row by design
+    ("GET", "/calculations/", None, 1, ("calculations",)),
+    ("GET", "/calculations/{calc_id}", None, 1, ()),
+    ("PUT", "/calculations/{calc_id}", {"a": 7}, 3, ()),
+    ("DELETE", "/calculations/{calc_id}", None, 2, ()),
+]
+
+
+@pytest.mark.parametrize(
+    "method, path, body, max_statements, allow_scans",
+    BUDGETS,
+    ids=[f"{method} {path}" for method, path, *_ in BUDGETS],
+)
+def test_endpoint_query_budget(client, seeded, method, path, body, max_statements, allow_scans):
+    """Test each endpoint stays within its statement budget and only uses indexed lookups"""
+    url = path.format(calc_id=seeded["calc_id"], user_id=seeded["user_id"])
+
+    with QueryRecorder(engine) as queries:
+        response = client.request(method, url, json=body, headers=seeded["headers"])
+
+    assert response.status_code < 400, response.text
+    queries.assert_budget(max_statements, allow_scans)
+
+
+class TestQueryRecorder:
+    """Tests for the budget harness itself"""
+
+    def test_detects_unindexed_scan(self, db_session):
+        """Test that filtering on an unindexed column is reported as a scan"""
+        with QueryRecorder(engine) as queries:
+            db_session.query(models.Calculation).filter(models.Calculation.a == 1).all()
+
+        assert [scan.statement for scan in queries.full_scans()] == [queries.statements[0].statement]
+        assert queries.full_scans(allow_tables=("calculations",)) == []
+        with pytest.raises(AssertionError, match="Unindexed table scans"):
+            queries.assert_budget(max_statements=1)
+
+    def test_detects_statement_overrun(self, db_session):
+        """Test that exceeding the statement budget fails with the statement list"""
+        with QueryRecorder(engine) as queries:
+            crud.get_user_by_id(db_session, 1)
+            crud.get_user_by_id(db_session, 2)
+
+        with pytest.raises(AssertionError, match="2 statements, budget is 1"):
+            queries.assert_budget(max_statements=1)
@@ -0,0 +1,128 @@
+# tests/integration/test_retention.py
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app import crud, models, schemas, security
+from app.services.retention import RetentionPolicy, sweep
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _setup(db_session, ages_in_days, email="keeper@example.com"):
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username=email.split("@")[0],
+        email=email,
+        password="password123",
+    ))
+    db_session.add_all([
+        models.Calculation(a=float(i), b=1, type="Add", user_id=user.id, created_at=NOW - timedelta(days=age))
+        for i, age in enumerate(ages_in_days)
+    ])
+    db_session.commit()
+    token = security.create_access_token({"sub": user.email})
+    return user, {"Authorization": f"Bearer {token}"}
+
+
+class TestRetentionSweep:
+    """Integration tests for the calculation retention sweep"""
+
+    def test_archive_by_age(self, db_session):
+        """Test rows older than the cutoff move to the archive in batches"""
+        user, _ = _setup(db_session, [400, 300, 200, 10, 1])
+        policy = RetentionPolicy(max_age_days=90, batch_size=2, pause_seconds=0)
+
+        retired = sweep(db_session, policy, now=NOW)
+
+        assert retired == 3
+        live = crud.get_user_calculations(db_session, user.id)
+        assert sorted(calc.a for calc in live) == [3.0, 4.0]
+        archived = db_session.query(models.CalculationArchive).all()
+        assert sorted(row.a for row in archived) == [0.0, 1.0, 2.0]
+        assert all(row.user_id == user.id and row.archived_at is not None for row in archived)
+
+    def test_purge_by_age(self, db_session):
+        """Test purge mode deletes without archiving"""
+        user, _ = _setup(db_session, [400, 1])
+        policy = RetentionPolicy(max_age_days=90, mode="purge", pause_seconds=0)
+
+        assert sweep(db_session, policy, now=NOW) == 1
+
+        assert len(crud.get_user_calculations(db_session, user.id)) == 1
+        assert db_session.query(models.CalculationArchive).count() == 0
+
+    def test_max_rows_per_user_keeps_newest(self, db_session):
+        """Test only the newest rows per user stay live"""
+        user, _ = _setup(db_session, [50, 40, 30, 20, 10])
+        small, _ = _setup(db_session, [500], email="small@example.com")
+        policy = RetentionPolicy(max_rows_per_user=2, batch_size=1, pause_seconds=0)
+
+        assert sweep(db_session, policy, now=NOW) == 3
+
+        assert sorted(calc.a for calc in crud.get_user_calculations(db_session, user.id)) == [3.0, 4.0]
+        assert len(crud.get_user_calculations(db_session, small.id)) == 1
+
+    def test_archive_after_newest_rows_were_archived(self, db_session):
+        """Test ids of archived rows are not reused, so a second archive run succeeds"""
+        user, _ = _setup(db_session, [400, 300])
+        policy = RetentionPolicy(max_age_days=90, pause_seconds=0)
+        assert sweep(db_session, policy, now=NOW) == 2
+        archived_ids = set(db_session.scalars(select(models.CalculationArchive.id)))
+
+        calc = models.Calculation(a=9, b=1, type="Add", user_id=user.id, created_at=NOW - timedelta(days=200))
+        db_session.add(calc)
+        db_session.commit()
+        assert calc.id not in archived_ids
+
+        assert sweep(db_session, policy, now=NOW) == 1
+        assert db_session.query(models.CalculationArchive).count() == 3
+
+    def test_disabled_policy_from_env(self, monkeypatch):
+        """Test that without RETENTION_* settings the policy is disabled"""
+        monkeypatch.delenv("RETENTION_MAX_AGE_DAYS", raising=False)
+        monkeypatch.delenv("RETENTION_MAX_ROWS_PER_USER", raising=False)
+        assert RetentionPolicy.from_env().enabled is False
+
+        monkeypatch.setenv("RETENTION_MAX_AGE_DAYS", "30")
+        assert RetentionPolicy.from_env().max_age_days == 30
+
+
+class TestIncludeArchived:
+    """Archived calculations are only returned when explicitly requested"""
+
+    def test_list_with_include_archived(self, client, db_session):
+        """Test the browse endpoint hides archived rows unless asked"""
+        _, headers = _setup(db_session, [400, 1])
+        sweep(db_session, RetentionPolicy(max_age_days=90, pause_seconds=0), now=NOW)
+
+        live = client.get("/api/calculations/", headers=headers).json()
+        everything = client.get("/api/calculations/?include_archived=true", headers=headers).json()
+
+        assert len(live) == 1
+        assert len(everything) == 2
+        assert [calc["archived"] for calc in everything] == [False, True]
+        assert everything[1]["result"] == 1.0
+
+    def test_pages_merge_archived_by_id(self, client, db_session):
+        """Test keyset pages with include_archived interleave archived rows in id order"""
+        _, headers = _setup(db_session, [400, 1, 400, 1])
+        sweep(db_session, RetentionPolicy(max_age_days=90, pause_seconds=0), now=NOW)
+
+        first = client.get("/api/calculations/?include_archived=true&limit=3", headers=headers).json()
+        rest = client.get(
+            f"/api/calculations/?include_archived=true&limit=3&after_id={first[-1]['id']}", headers=headers
+        ).json()
+
+        assert [calc["a"] for calc in first + rest] == [0.0, 1.0, 2.0, 3.0]
+        assert [calc["archived"] for calc in first + rest] == [True, False, True, False]
+
+    def test_read_archived_by_id(self, client, db_session):
+        """Test reading a retired calculation by its original id"""
+        user, headers = _setup(db_session, [400])
+        calc_id = crud.get_user_calculations(db_session, user.id)[0].id
+        sweep(db_session, RetentionPolicy(max_age_days=90, pause_seconds=0), now=NOW)
+
+        assert client.get(f"/api/calculations/{calc_id}", headers=headers).status_code == 404
+        response = client.get(f"/api/calculations/{calc_id}?include_archived=true", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["archived"] is True
@@ -0,0 +1,113 @@
+# tests/integration/test_seed.py
+import random
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app import crud, models, schemas
+from app.tools import seed as seed_tool
+from app.tools.seed import seed, zipf_counts
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _calculation_rows(db_session):
+    return db_session.execute(
+        select(models.Calculation.user_id, models.Calculation.type, models.Calculation.a, models.Calculation.b)
+        .order_by(models.Calculation.id)
+    ).all()
+
+
+class TestSeed:
+    """Integration tests for the synthetic data seeder"""
+
+    def test_inserts_requested_rows(self, db_session):
+        """Test the requested users and calculations are inserted across small batches"""
+        report = seed(db_session.connection(), users=20, calculations=1000, batch_size=128, now=NOW)
+
+        assert report["users"] == 20
+        assert report["calculations"] == 1000
+        assert db_session.query(models.User).count() == 20
+        assert db_session.query(models.Calculation).count() == 1000
+
+    def test_deterministic_by_seed(self, db_session):
+        """Test the same seed produces identical rows and a different seed does not"""
+        seed(db_session.connection(), users=10, calculations=500, seed=7, now=NOW)
+        first = _calculation_rows(db_session)
+        db_session.query(models.Calculation).delete()
+        db_session.query(models.User).delete()
+        db_session.commit()
+
+        seed(db_session.connection(), users=10, calculations=500, seed=7, now=NOW)
+        assert _calculation_rows(db_session) == first
+
+        db_session.query(models.Calculation).delete()
+        db_session.query(models.User).delete()
+        db_session.commit()
+        seed(db_session.connection(), users=10, calculations=500, seed=8, now=NOW)
+        assert _calculation_rows(db_session) != first
+
+    def test_rows_are_valid(self, db_session):
+        """Test every type is represented and no Divide row has a zero divisor"""
+        seed(db_session.connection(), users=5, calculations=5000, now=NOW)
+
+        rows = _calculation_rows(db_session)
+        assert {row.type for row in rows} == {"Add", "Sub", "Multiply", "Divide"}
+        assert not [row for row in rows if row.type == "Divide" and row.b == 0]
+        assert all(row.created_at <= NOW.replace(tzinfo=None) for row in db_session.query(models.Calculation))
+
+    def test_seeded_users_can_log_in(self, client, db_session):
+        """Test seeded users share the given password"""
+        report = seed(db_session.connection(), users=3, calculations=10, seed=5, password="seedpass123", now=NOW)
+
+        response = client.post("/login", json={
+            "email": f"seed5-{report['first_user_id']}@example.com",
+            "password": "seedpass123",
+        })
+        assert response.status_code == 200
+
+    def test_appends_after_existing_users(self, db_session):
+        """Test a second run continues the user ids instead of colliding"""
+        first = seed(db_session.connection(), users=3, calculations=10, now=NOW)
+        second = seed(db_session.connection(), users=3, calculations=10, now=NOW)
+
+        assert second["first_user_id"] == first["first_user_id"] + 3
+        assert db_session.query(models.User).count() == 6
+
+
+    def test_signup_after_seeding(self, db_session):
+        """Test a regular signup gets a fresh id after seeded users"""
+        report = seed(db_session.connection(), users=3, calculations=10, now=NOW)
+        user = crud.create_user(db_session, schemas.UserCreate(
+            username="after", email="after@example.com", password="password123"
+        ))
+        assert user.id == report["first_user_id"] + 3
+
+    def test_postgres_sequence_is_advanced(self):
+        """Test the users.id sequence is set past the explicit ids on Postgres only"""
+        executed = []
+        for dialect in ("postgresql", "sqlite"):
+            conn = SimpleNamespace(dialect=SimpleNamespace(name=dialect), execute=lambda sql: executed.append(str(sql)))
+            seed_tool._sync_user_id_sequence(conn)
+        assert executed == ["SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT MAX(id) FROM users))"]
+
+    def test_cli_rejects_no_users(self, capsys):
+        """Test --users 0 is a usage error instead of a ZeroDivisionError"""
+        with pytest.raises(SystemExit) as exc:
+            seed_tool.main(["--users", "0"])
+        assert exc.value.code == 2
+        assert "--users must be at least 1" in capsys.readouterr().err
+
+
+class TestZipfCounts:
+    """Unit-style tests for the calculations-per-user distribution"""
+
+    def test_total_is_exact_and_skewed(self):
+        """Test counts sum to the total with a heavy head and a long tail"""
+        counts = zipf_counts(1000, 100_000, 1.1, random.Random(1))
+
+        assert sum(counts) == 100_000
+        median = sorted(counts)[len(counts) // 2]
+        assert max(counts) > 50 * median
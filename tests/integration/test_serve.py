@@ -0,0 +1,74 @@
+# tests/integration/test_serve.py
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> set[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as fh:
+        return {int(child) for child in fh.read().split()}
+
+
+def _wait_for(predicate, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    """`python -m app.serve --workers 2` on a free port with a temporary database"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--graceful-timeout", "2", "--no-access-log", "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'serve.db'}", "SLOW_QUERY_LOG_ENABLED": "false"},
+    )
+    yield process, f"http://127.0.0.1:{port}"
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or not os.path.exists("/proc"), reason="needs fork() and /proc")
+class TestServe:
+    """Integration tests for the pre-forking launcher"""
+
+    def test_serves_restarts_and_drains(self, supervisor):
+        """Test workers answer /ready, a killed worker is replaced, and SIGTERM exits cleanly"""
+        process, base_url = supervisor
+
+        body = _wait_for(lambda: urllib.request.urlopen(f"{base_url}/ready", timeout=2).read())
+        assert json.loads(body) == {"status": "ready", "database": "ok"}
+        workers = _wait_for(lambda: len(_children(process.pid)) == 2 and _children(process.pid))
+
+        victim = min(workers)
+        os.kill(victim, signal.SIGKILL)
+        replaced = _wait_for(lambda: len(_children(process.pid) - {victim}) == 2 and _children(process.pid))
+        assert victim not in replaced
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=15) == 0
@@ -0,0 +1,50 @@
+# tests/integration/test_server_timing.py
+import re
+
+from app import crud, schemas, security
+
+
+def _entries(header: str) -> dict:
+    """Parse a Server-Timing header into {name: (duration_ms, desc)}"""
+    entries = {}
+    for part in header.split(", "):
+        name, *params = part.split(";")
+        values = dict(param.split("=", 1) for param in params)
+        entries[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return entries
+
+
+class TestServerTiming:
+    """Integration tests for the Server-Timing response header"""
+
+    def test_browse_reports_auth_db_and_serialization(self, client, db_session):
+        """Test the calculation list reports each phase of the request"""
+        user = crud.create_user(db_session, schemas.UserCreate(
+            username="timed", email="timed@example.com", password="password123"
+        ))
+        headers = {"Authorization": f"Bearer {security.create_access_token({'sub': user.email})}"}
+        client.post("/api/calculations/", json={"a": 1, "b": 2, "type": "Add"}, headers=headers)
+
+        response = client.get("/api/calculations/", headers=headers)
+
+        entries = _entries(response.headers["server-timing"])
+        assert {"auth", "db", "crud", "ser", "app"} <= set(entries)
+        # user lookup + list query
+        assert entries["db"][1] == "2 queries"
+        assert all(duration >= 0 for duration, _ in entries.values())
+        assert entries["app"][0] >= entries["db"][0]
+
+    def test_login_reports_password_hashing(self, client):
+        """Test PBKDF2 time shows up as its own entry"""
+        client.post("/register", json={"email": "hash@example.com", "password": "password123"})
+
+        response = client.post("/login", json={"email": "hash@example.com", "password": "password123"})
+
+        assert "hash" in _entries(response.headers["server-timing"])
+
+    def test_header_on_errors(self, client):
+        """Test that even rejected requests carry the header"""
+        response = client.get("/profile", headers={"Authorization": "Bearer not-a-token"})
+
+        assert response.status_code == 401
+        assert re.search(r"auth;dur=\d+\.\d\d", response.headers["server-timing"])
@@ -0,0 +1,82 @@
+# tests/integration/test_slow_query_log.py
+import json
+
+import pytest
+
+from app import crud, models, schemas
+from app.slow_query_log import REDACTED, SlowQueryLog, fingerprint
+from app.tools import slow_queries
+from tests.conftest import engine
+
+
+@pytest.fixture
+def slow_log(tmp_path):
+    """Log every statement of the test engine to a temporary file"""
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), threshold_ms=0)
+    log.install(engine)
+    yield log
+    log.remove(engine)
+    log.close()
+
+
+def _entries(log):
+    with open(log.path) as fh:
+        return [json.loads(line) for line in fh]
+
+
+class TestSlowQueryLog:
+    """Integration tests for the slow-query log"""
+
+    def test_entries_have_route_plan_and_redacted_hash(self, client, db_session, slow_log):
+        """Test a logged request records its route, a plan per shape and no password hash"""
+        client.post("/register", json={"email": "slow@example.com", "password": "password123"})
+        token = client.post("/login", json={"email": "slow@example.com", "password": "password123"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        client.get("/api/calculations/", headers=headers)
+        client.get("/api/calculations/", headers=headers)
+
+        entries = _entries(slow_log)
+
+        assert not any("pbkdf2" in json.dumps(entry) for entry in entries)
+        insert = next(entry for entry in entries if entry["statement"].startswith("INSERT INTO users"))
+        assert REDACTED in insert["parameters"]
+        assert insert["route"] == "POST /register"
+
+        listing = [entry for entry in entries if entry["route"] == "GET /api/calculations/"
+                   and "FROM calculations" in entry["statement"]]
+        assert len(listing) == 2
+        assert listing[0]["plan"] and "plan" not in listing[1]
+
+    def test_threshold_filters_fast_statements(self, db_session, tmp_path):
+        """Test nothing is written for statements under the threshold"""
+        log = SlowQueryLog(str(tmp_path / "slow.jsonl"), threshold_ms=10_000)
+        log.install(engine)
+        try:
+            crud.get_user_by_email(db_session, "nobody@example.com")
+        finally:
+            log.remove(engine)
+        assert not (tmp_path / "slow.jsonl").exists()
+
+    def test_aggregate_flags_full_scans(self, db_session, slow_log):
+        """Test the CLI groups by shape and flags plans that scan a table"""
+        user = crud.create_user(db_session, schemas.UserCreate(
+            username="scan", email="scan@example.com", password="password123"
+        ))
+        db_session.add(models.Calculation(a=1, b=2, type="Add", user_id=user.id))
+        db_session.commit()
+        for value in (1.0, 2.0):
+            db_session.query(models.Calculation).filter(models.Calculation.a == value).all()
+
+        summary = slow_queries.aggregate(slow_queries.read_entries(slow_log.path))
+
+        by_operand = next(group for group in summary if "WHERE calculations.a = ?" in group["statement"])
+        assert by_operand["count"] == 2
+        assert by_operand["full_scan"] is True
+
+
+class TestFingerprint:
+    """Unit tests for statement shapes"""
+
+    def test_in_lists_share_a_shape(self):
+        assert fingerprint("SELECT * FROM t WHERE id IN (?, ?)") == fingerprint("SELECT *  FROM t\nWHERE id IN (?, ?, ?)")
+        assert fingerprint("SELECT * FROM t WHERE a = ?") != fingerprint("SELECT * FROM t WHERE b = ?")
@@ -0,0 +1,43 @@
+# tests/integration/test_startup.py
+import os
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import warmup
+from app.main import app
+from benchmarks.startup import IMPORT_BUDGET_MS, LAZY_MODULES, measure_import
+
+
+class TestColdStart:
+    """Integration tests for import time, lazy dependencies and warm-up before readiness"""
+
+    def test_import_is_lazy_and_within_budget(self, tmp_path):
+        """Test importing the app skips lazy dependencies, opens no database and stays in budget"""
+        database = tmp_path / "cold.db"
+        result = measure_import(f"sqlite:///{database}")
+
+        assert result["lazy_loaded"] == [], f"{LAZY_MODULES} should load on first use"
+        assert not os.path.exists(database), "importing the app must not run DDL"
+        assert result["import_ms"] < IMPORT_BUDGET_MS
+
+    def test_ready_waits_for_warmup(self, override_get_db, monkeypatch):
+        """Test /health answers during warm-up while /ready returns 503 until it finishes"""
+        release = threading.Event()
+        monkeypatch.setattr(warmup, "WARMUP", warmup.Warmup([("blocked", release.wait)]))
+
+        with TestClient(app) as client:
+            try:
+                assert client.get("/health").status_code == 200
+                response = client.get("/ready")
+                assert response.status_code == 503
+                assert response.json() == {"detail": "Warming up"}
+            finally:
+                # Shutdown waits for warm-up, so never leave it blocked
+                release.set()
+            deadline = time.monotonic() + 5
+            while not warmup.WARMUP.ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert client.get("/ready").status_code == 200
+        assert warmup.WARMUP.state == "done"
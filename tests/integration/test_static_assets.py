@@ -0,0 +1,108 @@
+# tests/integration/test_static_assets.py
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.static_assets import IMMUTABLE, REVALIDATE, StaticAssets
+from app.tools.build_static import build
+
+PAGE = '<html><body>{}<script src="/static/app.js"></script></body></html>'.format("<p>text</p>" * 200)
+SCRIPT = "function greet() { return 'hello'; }\n" * 100
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A source directory, its build, and a client for StaticAssets serving them"""
+    src, out = tmp_path / "static", tmp_path / "build" / "static"
+    src.mkdir()
+    (src / "page.html").write_text(PAGE)
+    (src / "app.js").write_text(SCRIPT)
+    manifest = build(str(src), str(out))
+
+    def client():
+        return TestClient(Starlette(routes=[Mount("/static", StaticAssets(str(src), str(out)))]))
+
+    return src, out, manifest, client
+
+
+class TestStaticAssets:
+    """Integration tests for the static build and its handler"""
+
+    def test_html_references_fingerprinted_script(self, site):
+        """Test the built page points at the hashed script, which is cached immutably"""
+        _, _, manifest, client = site
+        hashed = manifest["assets"]["app.js"]
+        page = client().get("/static/page.html", headers={"Accept-Encoding": "identity"})
+
+        assert f'src="/static/{hashed}"' in page.text
+        script = client().get(f"/static/{hashed}")
+        assert script.status_code == 200
+        assert script.headers["cache-control"] == IMMUTABLE
+        assert script.text == SCRIPT
+
+    def test_negotiates_precompressed_variant(self, site):
+        """Test gzip clients get the .gz file and others the identity file, both varying on encoding"""
+        _, out, _, client = site
+        gzipped = client().get("/static/page.html", headers={"Accept-Encoding": "gzip"})
+        plain = client().get("/static/page.html", headers={"Accept-Encoding": "identity"})
+
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert int(gzipped.headers["content-length"]) == (out / "page.html.gz").stat().st_size
+        assert gzipped.text == plain.text
+        assert "content-encoding" not in plain.headers
+        assert gzipped.headers["vary"] == plain.headers["vary"] == "Accept-Encoding"
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+
+    def test_html_revalidates_with_content_etag(self, site):
+        """Test HTML is no-cache with a content-hash ETag that yields 304"""
+        _, _, manifest, client = site
+        response = client().get("/static/page.html", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["cache-control"] == REVALIDATE
+        assert response.headers["etag"] == f'"{manifest["files"]["page.html.gz"]}"'
+        cached = client().get("/static/page.html", headers={
+            "Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"],
+        })
+        assert cached.status_code == 304
+        assert cached.headers["cache-control"] == REVALIDATE
+        assert cached.content == b""
+
+    def test_stale_build_falls_back_to_sources(self, site, caplog):
+        """Test a build that no longer matches the sources is not served"""
+        src, _, _, client = site
+        (src / "page.html").write_text("<p>edited</p>")
+
+        response = client().get("/static/page.html", headers={"Accept-Encoding": "gzip"})
+
+        assert response.text == "<p>edited</p>"
+        assert "content-encoding" not in response.headers
+        assert "is stale" in caplog.text
+
+    def test_unbuilt_sources_are_served(self, tmp_path):
+        """Test the handler serves the source directory when there is no build"""
+        (tmp_path / "page.html").write_text(PAGE)
+        client = TestClient(Starlette(routes=[
+            Mount("/static", StaticAssets(str(tmp_path), str(tmp_path / "missing"))),
+        ]))
+
+        response = client.get("/static/page.html")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == REVALIDATE
+        assert client.get("/static/page.html", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    def test_manifest_records_every_file(self, site):
+        """Test the manifest lists the hashed names and written files"""
+        _, out, manifest, _ = site
+        on_disk = json.loads((out / "manifest.json").read_text())
+        assert on_disk == manifest
+        assert {"page.html", "page.html.gz", manifest["assets"]["app.js"]} <= set(manifest["files"])
+
+    def test_app_serves_pages_with_validators(self, client):
+        """Test the app's /static pages can be revalidated"""
+        response = client.get("/static/login.html")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == REVALIDATE
+        assert client.get("/static/login.html", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
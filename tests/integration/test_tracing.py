@@ -0,0 +1,163 @@
+# tests/integration/test_tracing.py
+import json
+import threading
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import crud, schemas, security, tracing
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SAMPLED = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@pytest.fixture
+def traced_user(db_session, monkeypatch):
+    """An admin user, with the trace buffer emptied and traceparent sampling flags trusted"""
+    tracing.STORE.clear()
+    monkeypatch.setattr(tracing, "TRACE_TRUST_TRACEPARENT", True)
+    user = crud.create_user(db_session, schemas.UserCreate(
+        username="tracer", email="tracer@example.com", password="password123"
+    ))
+    monkeypatch.setattr(security, "ADMIN_EMAILS", {user.email})
+    return {"Authorization": f"Bearer {security.create_access_token({'sub': user.email})}"}
+
+
+class TestTracing:
+    """Integration tests for request tracing"""
+
+    def test_sampled_request_records_span_tree(self, client, traced_user):
+        """Test that a sampled browse request records auth, crud, SQL and serialization spans"""
+        response = client.get("/api/calculations/", headers={**traced_user, "traceparent": SAMPLED})
+
+        assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+        trace = tracing.STORE.get(TRACE_ID)
+        spans = {span.name: span for span in trace.spans}
+        root = trace.root
+        assert root.name == "GET /api/calculations/"
+        assert root.parent_id == "00f067aa0ba902b7"
+        assert root.attributes["http.status_code"] == 200
+
+        route = spans["route GET /api/calculations/"]
+        assert route.parent_id == root.span_id
+        endpoint = spans["endpoint read_calculations"]
+        for name in ("auth.decode", "endpoint read_calculations", "serialize"):
+            assert spans[name].parent_id == route.span_id, name
+        for name in ("crud.get_user_by_email", "crud.get_user_calculations"):
+            assert spans[name].parent_id == endpoint.span_id, name
+        lookup_sql = next(span for span in trace.spans if span.parent_id == spans["crud.get_user_by_email"].span_id)
+        assert lookup_sql.name == "db SELECT"
+        assert "FROM users" in lookup_sql.attributes["db.statement"]
+        assert all(root.start_ns <= span.start_ns <= span.end_ns <= root.end_ns for span in trace.spans)
+
+    def test_unsampled_requests_are_not_recorded(self, client, traced_user):
+        """Test that a traceparent without the sampled flag records nothing"""
+        response = client.get("/api/calculations/", headers={**traced_user, "traceparent": SAMPLED[:-2] + "00"})
+
+        assert "traceparent" not in response.headers
+        assert tracing.STORE.summaries() == []
+
+    def test_admin_endpoints(self, client, traced_user):
+        """Test admins can list traces and fetch them as OTLP JSON"""
+        client.post("/login", json={"email": "tracer@example.com", "password": "password123"},
+                    headers={"traceparent": SAMPLED})
+
+        summaries = client.get("/admin/traces", headers=traced_user).json()
+        assert summaries[0]["trace_id"] == TRACE_ID
+        assert summaries[0]["name"] == "POST /login"
+
+        otlp = client.get(f"/admin/traces/{TRACE_ID}", headers=traced_user).json()
+        spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert "password.verify" in [span["name"] for span in spans]
+        assert all(span["traceId"] == TRACE_ID for span in spans)
+
+    def test_admin_endpoints_require_admin(self, client, db_session):
+        """Test non-admin users are rejected"""
+        crud.create_user(db_session, schemas.UserCreate(
+            username="plain", email="plain@example.com", password="password123"
+        ))
+        headers = {"Authorization": f"Bearer {security.create_access_token({'sub': 'plain@example.com'})}"}
+        assert client.get("/admin/traces", headers=headers).status_code == 403
+
+
+class TestTraceparentTrust:
+    """Unit tests for whether a client's traceparent can force sampling"""
+
+    def _client(self, store, sample_rate, trust):
+        app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"))])
+        return TestClient(tracing.TracingMiddleware(app, sample_rate=sample_rate, store=store, trust_traceparent=trust))
+
+    def test_untrusted_sampled_flag_is_ignored(self):
+        """Test a client cannot force tracing by sending the sampled flag"""
+        store = tracing.TraceStore(export_file="")
+        for _ in range(20):
+            self._client(store, 0.0, False).get("/", headers={"traceparent": SAMPLED})
+        assert store.summaries() == []
+
+    def test_untrusted_traceparent_still_links_sampled_traces(self):
+        """Test a locally sampled request keeps the caller's trace id"""
+        store = tracing.TraceStore(export_file="")
+        self._client(store, 1.0, False).get("/", headers={"traceparent": SAMPLED[:-2] + "00"})
+        assert store.get(TRACE_ID).root.parent_id == "00f067aa0ba902b7"
+
+    def test_trusted_sampled_flag_wins(self):
+        """Test TRACE_TRUST_TRACEPARENT lets upstream services decide"""
+        store = tracing.TraceStore(export_file="")
+        self._client(store, 0.0, True).get("/", headers={"traceparent": SAMPLED})
+        assert store.get(TRACE_ID) is not None
+
+
+class TestTraceStore:
+    """Unit tests for the ring buffer and file export"""
+
+    def _trace(self, name="GET /"):
+        trace = tracing.Trace(tracing._new_id(16))
+        trace.root = tracing.Span(trace, name, None, tracing.KIND_SERVER)
+        trace.root.end()
+        return trace
+
+    def test_ring_buffer_keeps_newest(self):
+        store = tracing.TraceStore(size=2, export_file="")
+        for name in ("first", "second", "third"):
+            store.add(self._trace(name))
+        assert [summary["name"] for summary in store.summaries()] == ["third", "second"]
+
+    def test_exports_otlp_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        store = tracing.TraceStore(export_file=str(path))
+        store.add(self._trace())
+        store.add(self._trace())
+        assert store.flush()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(lines) == 2
+        span = lines[0]["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        assert span["kind"] == tracing.KIND_SERVER
+        assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+
+    def test_export_does_not_block_add(self, tmp_path, monkeypatch):
+        """Test add() returns while the export file write is still in progress"""
+        store = tracing.TraceStore(export_file=str(tmp_path / "traces.jsonl"), export_queue_size=2)
+        release = threading.Event()
+        written = []
+
+        def slow_write(traces):
+            release.wait(5)
+            written.extend(traces)
+
+        monkeypatch.setattr(store, "_write", slow_write)
+        started = time.perf_counter()
+        for _ in range(5):
+            store.add(self._trace())
+        assert time.perf_counter() - started < 1
+        assert len(store.traces) == 5
+
+        release.set()
+        assert store.flush()
+        # Traces beyond the queue (while the writer is stuck) are dropped from the export only
+        assert len(written) + store.export_dropped == 5
+        assert store.export_dropped >= 1
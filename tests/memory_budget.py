@@ -0,0 +1,48 @@
+"""
+Peak-allocation assertions for tests.
+
+    with MemoryRecorder() as memory:
+        client.get("/api/calculations/", headers=headers)
+    memory.assert_budget(max_mb=320)
+
+Measures, with tracemalloc, how far Python allocations inside the block
+rose above where they started. That covers everything the request built
+(ORM objects, pydantic models, the JSON body) and the test client's copy of
+the response. Memory allocated outside Python, such as SQLite's page cache,
+is not counted.
+"""
+import gc
+import tracemalloc
+
+
+class MemoryRecorder:
+    """Record peak and retained Python allocations of a block"""
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self.peak_bytes = 0
+        self.retained_bytes = 0
+
+    def __enter__(self):
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start(self.frames)
+        gc.collect()
+        tracemalloc.reset_peak()
+        self._start = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak_bytes = peak - self._start
+        self.retained_bytes = current - self._start
+        if not self._was_tracing:
+            tracemalloc.stop()
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / 2 ** 20
+
+    def assert_budget(self, max_mb: float) -> None:
+        assert self.peak_mb <= max_mb, f"peak allocation {self.peak_mb:.1f} MB, budget is {max_mb} MB"
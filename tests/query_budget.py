@@ -0,0 +1,81 @@
+"""
+Statement-count and index-usage assertions for tests.
+
+    with QueryRecorder(engine) as queries:
+        client.get("/api/calculations/", headers=headers)
+    queries.assert_budget(max_statements=2)
+
+Every statement run on the engine inside the block is recorded together with
+its query plan. assert_budget fails if there were more statements than
+budgeted (N+1 queries) or if any plan reads a whole table without an index,
+unless that table is explicitly allowed.
+"""
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from app.slow_query_log import explain, is_full_scan
+
+
+# Transaction control emitted by the test fixtures (SAVEPOINTs standing in for
+# COMMITs, the explicit SQLite BEGIN) is not part of an endpoint's query budget
+_TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.IGNORECASE)
+_SCANNED_TABLE = re.compile(r"^SCAN (?:TABLE )?(\w+)$|Seq Scan on (\w+)")
+
+
+def _scanned_tables(plan: list[str] | None) -> list[str]:
+    if not is_full_scan(plan):
+        return []
+    matches = (_SCANNED_TABLE.search(line.strip()) for line in plan)
+    return [match.group(1) or match.group(2) for match in matches if match]
+
+
+@dataclass
+class RecordedStatement:
+    statement: str
+    plan: list[str] | None
+
+
+class QueryRecorder:
+    """Record the statements (and their plans) executed on an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: list[RecordedStatement] = []
+
+    def __enter__(self):
+        event.listen(self.engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "after_cursor_execute", self._record)
+        return False
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if _TRANSACTION_CONTROL.match(statement):
+            return
+        example = parameters[0] if executemany and parameters else parameters
+        plan = explain(conn.dialect.name, cursor.connection, statement, example, prefer_indexes=True)
+        self.statements.append(RecordedStatement(" ".join(statement.split()), plan))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def full_scans(self, allow_tables: tuple[str, ...] = ()) -> list[RecordedStatement]:
+        """Statements whose plan scans a table not listed in allow_tables"""
+        return [
+            recorded for recorded in self.statements
+            if any(table not in allow_tables for table in _scanned_tables(recorded.plan))
+        ]
+
+    def assert_budget(self, max_statements: int, allow_scans: tuple[str, ...] = ()) -> None:
+        listing = "\n".join(f"  {recorded.statement}" for recorded in self.statements)
+        assert self.count <= max_statements, (
+            f"{self.count} statements, budget is {max_statements}:\n{listing}"
+        )
+        scans = self.full_scans(allow_scans)
+        assert not scans, "Unindexed table scans:\n" + "\n".join(
+            f"  {recorded.statement}\n    plan: {'; '.join(recorded.plan)}" for recorded in scans
+        )
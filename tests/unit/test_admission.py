@@ -0,0 +1,214 @@
+# tests/unit/test_admission.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import admission
+from app.admission import AdaptiveLimiter, AdmissionMiddleware, Overloaded, Policy
+
+
+def _policy(**overrides) -> Policy:
+    settings = dict(initial_limit=2, min_limit=1, max_limit=8, max_queue=2, queue_timeout_ms=200, target_ms=100)
+    settings.update(overrides)
+    return Policy(**settings)
+
+
+class TestClassify:
+    """Unit tests for route classes"""
+
+    def test_password_endpoints_are_auth(self):
+        """Test login, registration and password changes share the auth class"""
+        for path in ("/login", "/register", "/change-password", "/users/login", "/users/register"):
+            assert admission.classify("POST", path) == "auth"
+
+    def test_reads_and_writes(self):
+        """Test GET/HEAD are reads and other methods writes"""
+        assert admission.classify("GET", "/api/calculations/") == "read"
+        assert admission.classify("HEAD", "/profile") == "read"
+        assert admission.classify("GET", "/login") == "read"
+        assert admission.classify("POST", "/api/calculations/") == "write"
+        assert admission.classify("DELETE", "/api/calculations/1") == "write"
+
+    def test_uploads_and_bulk_operations_are_bulk(self):
+        """Test imports, batches and bulk operations get their own class"""
+        for path in admission.BULK_PATHS:
+            assert admission.classify("POST", path) == "bulk"
+        assert admission.classify("POST", "/api/jobs") == "write"
+
+    def test_exempt_paths(self):
+        """Test health checks, metrics, static files and admin bypass admission"""
+        for path in ("/health", "/ready", "/metrics", "/static/login.html", "/admin/profiles"):
+            assert admission.classify("GET", path) is None
+
+
+class TestPolicyFromEnv:
+    """Unit tests for per-class environment overrides"""
+
+    def test_overrides_keep_field_types(self, monkeypatch):
+        """Test ADMISSION_<CLASS>_<FIELD> replaces only the given fields"""
+        monkeypatch.setenv("ADMISSION_AUTH_MAX_LIMIT", "8")
+        monkeypatch.setenv("ADMISSION_AUTH_QUEUE_TIMEOUT_MS", "250.5")
+        policy = admission.policy_from_env("auth", admission.DEFAULT_POLICIES["auth"])
+        assert policy.max_limit == 8 and isinstance(policy.max_limit, int)
+        assert policy.queue_timeout_ms == 250.5
+        assert policy.initial_limit == admission.DEFAULT_POLICIES["auth"].initial_limit
+
+
+class TestAdaptiveLimiter:
+    """Unit tests for the AIMD limiter and its wait queue"""
+
+    def test_admits_up_to_limit_without_waiting(self):
+        """Test requests below the limit are admitted immediately"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy())
+            assert await limiter.acquire() == 0.0
+            assert await limiter.acquire() == 0.0
+            assert limiter.in_flight == 2
+
+        asyncio.run(scenario())
+
+    def test_release_hands_slot_to_waiter(self):
+        """Test a queued request gets the slot freed by release() in FIFO order"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=1))
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0.01)
+            assert len(limiter.waiters) == 1 and not waiter.done()
+            limiter.release(None)
+            assert await waiter > 0
+            assert limiter.in_flight == 1 and not limiter.waiters
+
+        asyncio.run(scenario())
+
+    def test_queue_full_fails_fast(self):
+        """Test a request is shed immediately when the queue is full"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=1, max_queue=1, queue_timeout_ms=5000))
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded) as exc:
+                await limiter.acquire()
+            assert exc.value.reason == "queue_full"
+            assert exc.value.retry_after >= 1
+            waiter.cancel()
+
+        asyncio.run(scenario())
+
+    def test_expected_wait_beyond_timeout_fails_fast(self):
+        """Test a request that cannot be served within the queue timeout is not queued"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=1, max_queue=10, queue_timeout_ms=100, target_ms=100))
+            await limiter.acquire()
+            limiter.avg_latency = 0.5
+            with pytest.raises(Overloaded) as exc:
+                await limiter.acquire()
+            assert exc.value.reason == "deadline"
+            assert not limiter.waiters
+
+        asyncio.run(scenario())
+
+    def test_queue_timeout(self):
+        """Test a queued request is shed after queue_timeout_ms without a free slot"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=1, queue_timeout_ms=50, target_ms=10))
+            await limiter.acquire()
+            with pytest.raises(Overloaded) as exc:
+                await limiter.acquire()
+            assert exc.value.reason == "timeout"
+            assert not limiter.waiters
+            assert limiter.in_flight == 1
+
+        asyncio.run(scenario())
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        """Test a waiter cancelled as its slot is handed over either keeps it or passes it on"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=1))
+            await limiter.acquire()
+            first = asyncio.create_task(limiter.acquire())
+            second = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0.01)
+            limiter.release(None)  # resolves the first waiter's future
+            first.cancel()
+            result, = await asyncio.gather(first, return_exceptions=True)
+            if not isinstance(result, asyncio.CancelledError):
+                limiter.release(None)
+            await second
+            assert limiter.in_flight == 1
+            assert not limiter.waiters
+
+        asyncio.run(scenario())
+
+    def test_additive_increase_when_saturated_and_fast(self):
+        """Test fast responses grow a saturated limit by 1/limit"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=2))
+            await limiter.acquire()
+            await limiter.acquire()
+            limiter.release(0.01)
+            assert limiter.limit == pytest.approx(2.5)
+            # Not saturated any more: no growth
+            limiter.release(0.01)
+            assert limiter.limit == pytest.approx(2.5)
+
+        asyncio.run(scenario())
+
+    def test_multiplicative_decrease_once_per_window(self):
+        """Test slow responses shrink the limit, at most once per target window"""
+        async def scenario():
+            limiter = AdaptiveLimiter(_policy(initial_limit=8, target_ms=1000))
+            for _ in range(3):
+                await limiter.acquire()
+            for _ in range(3):
+                limiter.release(2.0)
+            assert limiter.limit == pytest.approx(8 * admission.ADMISSION_BACKOFF)
+
+        asyncio.run(scenario())
+
+    def test_limit_stays_within_bounds(self):
+        """Test the limit never drops below min_limit or grows past max_limit"""
+        limiter = AdaptiveLimiter(_policy(initial_limit=2, min_limit=2, max_limit=3, target_ms=0))
+        limiter._observe(1.0, saturated=True)
+        assert limiter.limit == 2
+        limiter.policy = _policy(min_limit=2, max_limit=3, target_ms=1000)
+        for _ in range(20):
+            limiter._observe(0.001, saturated=True)
+        assert limiter.limit == 3
+
+
+class TestAdmissionMiddleware:
+    """Unit tests for how the middleware feeds service times to the limiters"""
+
+    def test_slow_imports_do_not_shrink_the_write_limit(self, monkeypatch):
+        """Test 5 s imports leave the write limit and its predicted wait alone"""
+        clock = SimpleNamespace(now=0.0)
+        monkeypatch.setattr(admission, "time", SimpleNamespace(
+            perf_counter=lambda: clock.now, monotonic=lambda: clock.now,
+        ))
+
+        async def app(scope, receive, send):
+            # The import only answers once its whole body has been read
+            clock.now += 5.0 if scope["path"] == "/api/calculations/import" else 0.01
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        async def scenario():
+            middleware = AdmissionMiddleware(app)
+            for _ in range(20):
+                scope = {"type": "http", "method": "POST", "path": "/api/calculations/import"}
+                await middleware(scope, None, send)
+            await middleware({"type": "http", "method": "POST", "path": "/api/calculations/"}, None, send)
+            return middleware.limiters
+
+        limiters = asyncio.run(scenario())
+        write, bulk = limiters["write"], limiters["bulk"]
+        assert write.limit == admission.DEFAULT_POLICIES["write"].initial_limit
+        assert write.expected_wait(0) < write.policy.queue_timeout_ms / 1000
+        assert bulk.limit == bulk.policy.initial_limit
+        assert bulk.avg_latency > 4
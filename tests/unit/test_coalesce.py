@@ -0,0 +1,156 @@
+# tests/unit/test_coalesce.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import coalesce
+from app.coalesce import SingleFlight
+
+
+def _burst(flights: SingleFlight, key, fn, callers: int = 8) -> list:
+    """Start `callers` threads calling flights.do(key, fn) at once; return their outcomes"""
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        futures = [pool.submit(flights.do, key, fn) for _ in range(callers)]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result(timeout=5))
+            except Exception as exc:
+                outcomes.append(exc)
+        return outcomes
+
+
+class TestSingleFlight:
+    """Unit tests for the single-flight call deduplicator"""
+
+    def test_concurrent_calls_run_once(self):
+        """Test callers arriving during a flight share its result"""
+        flights = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return ["result"]
+
+        outcomes = _burst(flights, "key", slow)
+
+        assert len(calls) == 1
+        assert all(result == ["result"] for result, _ in outcomes)
+        assert sum(not shared for _, shared in outcomes) == 1
+        assert flights.in_flight() == 0
+
+    def test_error_propagates_to_every_waiter(self):
+        """Test an exception of the flight is raised in all callers"""
+        flights = SingleFlight()
+
+        def failing():
+            time.sleep(0.2)
+            raise ValueError("boom")
+
+        outcomes = _burst(flights, "key", failing)
+
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+        assert flights.in_flight() == 0
+
+    def test_distinct_keys_do_not_share(self):
+        """Test different keys run separately"""
+        flights = SingleFlight()
+        assert flights.do("a", lambda: 1) == (1, False)
+        assert flights.do("b", lambda: 2) == (2, False)
+
+    def test_sequential_calls_run_again(self):
+        """Test a finished flight is not reused as a cache"""
+        flights = SingleFlight()
+        counter = iter(range(10))
+        assert flights.do("key", lambda: next(counter))[0] == 0
+        assert flights.do("key", lambda: next(counter))[0] == 1
+
+
+class TestDataVersion:
+    """Unit tests for the write-tracking data version"""
+
+    def test_bump_changes_version(self):
+        """Test every bump yields a new version"""
+        before = coalesce.data_version()
+        coalesce.bump_version()
+        assert coalesce.data_version() != before
+
+    def test_write_during_flight_starts_new_flight(self):
+        """Test a read arriving after a write does not join the flight started before it"""
+        release = threading.Event()
+        runs = []
+
+        def load(value):
+            def fn():
+                runs.append(value)
+                release.wait(5)
+                return value
+            return fn
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            before = pool.submit(coalesce.coalesce, "GET /x", "a@example.com", (), load("old"))
+            while coalesce.FLIGHTS.in_flight() == 0:
+                time.sleep(0.01)
+            coalesce.bump_version()
+            after = pool.submit(coalesce.coalesce, "GET /x", "a@example.com", (), load("new"))
+            while len(runs) < 2:
+                time.sleep(0.01)
+            release.set()
+            assert (before.result(5), after.result(5)) == ("old", "new")
+
+    def test_read_after_commit_does_not_join_flight_started_during_it(self, tmp_path, monkeypatch):
+        """Test a flight started while the DBAPI commit runs is not shared with reads after it"""
+        coalesce.track_writes()
+        engine = create_engine(f"sqlite:///{tmp_path / 'commit.db'}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        release = threading.Event()
+        runs = []
+
+        def load(value):
+            def fn():
+                runs.append(value)
+                release.wait(5)
+                return value
+            return fn
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            during = []
+            do_commit = engine.dialect.do_commit
+
+            def commit_with_read_in_flight(dbapi_connection):
+                # A read that starts before the rows are visible still sees the old data
+                during.append(pool.submit(coalesce.coalesce, "GET /x", "a@example.com", (), load("old")))
+                while coalesce.FLIGHTS.in_flight() == 0:
+                    time.sleep(0.01)
+                do_commit(dbapi_connection)
+
+            monkeypatch.setattr(engine.dialect, "do_commit", commit_with_read_in_flight)
+            with Session(engine) as session:
+                session.execute(text("INSERT INTO t VALUES (1)"))
+                session.commit()
+
+            after = pool.submit(coalesce.coalesce, "GET /x", "a@example.com", (), load("new"))
+            deadline = time.monotonic() + 2
+            while len(runs) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            release.set()
+            assert (during[0].result(5), after.result(5)) == ("old", "new")
+        engine.dispose()
+
+    def test_disabled_runs_every_call(self, monkeypatch):
+        """Test COALESCE_ENABLED=false bypasses the flights"""
+        monkeypatch.setattr(coalesce, "COALESCE_ENABLED", False)
+        started = threading.Event()
+
+        def fn():
+            started.set()
+            return 1
+
+        assert coalesce.coalesce("GET /x", "a@example.com", (), fn) == 1
+        assert started.is_set()
+        assert coalesce.FLIGHTS.in_flight() == 0
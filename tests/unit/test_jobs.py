@@ -0,0 +1,108 @@
+# tests/unit/test_jobs.py
+import pytest
+
+from app.services import jobs
+
+
+class _FakeControl:
+    """Stands in for the control session: records updates, answers the cancel flag"""
+
+    def __init__(self):
+        self.updates = 0
+        self.cancel = False
+
+    def execute(self, stmt):
+        self.updates += 1
+
+    def scalar(self, stmt):
+        return self.cancel
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _FakeJob:
+    id = 1
+    user_id = 7
+    params = {"format": "csv"}
+
+
+class TestJobContext:
+    """Unit tests for progress reporting and cancellation checks"""
+
+    def test_progress_is_throttled(self):
+        """Test only the first of several quick progress calls is written"""
+        control = _FakeControl()
+        ctx = jobs.JobContext(_FakeJob(), db=None, control=control)
+
+        for done in range(5):
+            ctx.progress(done, 10)
+
+        assert control.updates == 1
+        ctx.progress(5, 10, force=True)
+        assert control.updates == 2
+
+    def test_progress_raises_once_cancel_is_requested(self):
+        """Test the progress report after a cancel request stops the handler"""
+        control = _FakeControl()
+        ctx = jobs.JobContext(_FakeJob(), db=None, control=control)
+        ctx.progress(1)
+        control.cancel = True
+
+        with pytest.raises(jobs.JobCancelled):
+            ctx.progress(2, force=True)
+        assert ctx.is_set()
+
+    def test_params_are_copied(self):
+        """Test handlers cannot mutate the job's stored parameters"""
+        job = _FakeJob()
+        ctx = jobs.JobContext(job, db=None, control=_FakeControl())
+        ctx.params["format"] = "ndjson"
+        assert job.params == {"format": "csv"}
+
+
+class TestJobKinds:
+    """Unit tests for the handler registry and parameter validation"""
+
+    def test_builtin_kinds_are_registered(self):
+        """Test every documented kind has a handler"""
+        assert {"export", "import", "bulk_update", "bulk_delete", "retention"} <= set(jobs.HANDLERS)
+        assert jobs.HANDLERS["retention"].admin_only
+        assert jobs.HANDLERS["import"].upload_only
+
+    def test_register_adds_a_kind(self, monkeypatch):
+        """Test the decorator registers a handler under its kind"""
+        monkeypatch.setattr(jobs, "HANDLERS", dict(jobs.HANDLERS))
+
+        @jobs.register("noop")
+        def noop(ctx, params):
+            return {}
+
+        assert jobs.HANDLERS["noop"].handler is noop
+
+    def test_unknown_kind_is_rejected(self):
+        """Test enqueueing an unknown kind fails before touching the database"""
+        with pytest.raises(jobs.JobError, match="Unknown job kind 'nope'"):
+            jobs.enqueue(None, 1, "nope")
+
+    @pytest.mark.parametrize("kind,params,message", [
+        ("export", {"format": "xml"}, "format must be"),
+        ("bulk_delete", {}, "At least one filter criterion"),
+        ("bulk_update", {"filter": {"ids": [1]}, "update": {}}, "At least one field"),
+        ("retention", {"max_age_days": 30, "mode": "shred"}, "mode must be"),
+        ("retention", {"max_age_days": 30, "colour": "red"}, "Invalid retention params"),
+    ])
+    def test_invalid_params_are_rejected(self, kind, params, message):
+        """Test parameters are validated when the job is queued"""
+        with pytest.raises(jobs.JobError, match=message):
+            jobs.HANDLERS[kind].validate(params)
+
+    def test_retention_without_limits_is_rejected(self, monkeypatch):
+        """Test a retention job needs a limit from params or RETENTION_* settings"""
+        monkeypatch.delenv("RETENTION_MAX_AGE_DAYS", raising=False)
+        monkeypatch.delenv("RETENTION_MAX_ROWS_PER_USER", raising=False)
+        with pytest.raises(jobs.JobError, match="max_age_days or max_rows_per_user"):
+            jobs.HANDLERS["retention"].validate({})
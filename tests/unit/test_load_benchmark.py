@@ -0,0 +1,59 @@
+# tests/unit/test_load_benchmark.py
+import argparse
+
+import pytest
+
+from benchmarks.load import compare, parse_mix, percentile, scaling_summary
+
+
+def _result(p95_ms=10.0, rps=100.0):
+    stats = {"count": 100, "errors": 0, "rps": rps, "mean_ms": 5.0, "p50_ms": 5.0, "p95_ms": p95_ms, "p99_ms": 20.0}
+    return {"routes": {"GET /profile": stats}, "total": stats}
+
+
+class TestLoadBenchmark:
+    """Unit tests for the load benchmark's statistics and comparison"""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) == 0.0
+
+    def test_parse_mix(self):
+        """Test parsing action weights"""
+        assert parse_mix("browse=3, add=1") == {"browse": 3, "add": 1}
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix("teleport=1")
+
+    def test_compare_within_threshold(self):
+        """Test that small changes are not flagged"""
+        assert compare(_result(), _result(p95_ms=11.0, rps=95.0), threshold=0.15) == []
+
+    def test_compare_flags_latency_and_throughput(self):
+        """Test regressions in percentiles and RPS are reported per route"""
+        regressions = compare(_result(), _result(p95_ms=13.0, rps=80.0), threshold=0.15)
+        assert any(message.startswith("GET /profile: p95_ms") for message in regressions)
+        assert any(message.startswith("TOTAL: rps") for message in regressions)
+
+    def test_compare_flags_missing_route(self):
+        """Test that a route absent from the new run is reported"""
+        current = _result()
+        current["routes"] = {}
+        assert compare(_result(), current, threshold=0.15) == ["GET /profile: missing from current run"]
+
+    def test_scaling_summary(self):
+        """Test speedup and efficiency are relative to per-worker throughput of the first run"""
+        runs = []
+        for workers, rps in ((1, 100.0), (2, 180.0), (4, 300.0)):
+            result = _result(rps=rps)
+            result["meta"] = {"workers": workers}
+            runs.append(result)
+
+        rows = scaling_summary(runs)
+
+        assert [row["speedup"] for row in rows] == [1.0, 1.8, 3.0]
+        assert [row["efficiency"] for row in rows] == [1.0, 0.9, 0.75]
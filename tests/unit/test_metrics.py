@@ -0,0 +1,65 @@
+import pytest
+from app.metrics import Counter, Gauge, Histogram, Registry, route_template
+
+
+class TestMetricsRegistry:
+    """Unit tests for the in-process metrics registry"""
+
+    def test_counter_renders_labels(self):
+        """Test counters render one sample per label set"""
+        registry = Registry()
+        counter = Counter("jobs_total", "Jobs run", ("kind",), registry=registry)
+        counter.labels("export").inc()
+        counter.labels("export").inc(2)
+        counter.labels("import").inc()
+
+        text = registry.render()
+
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="export"} 3' in text
+        assert 'jobs_total{kind="import"} 1' in text
+
+    def test_gauge_goes_up_and_down(self):
+        """Test gauge inc/dec/set"""
+        registry = Registry()
+        gauge = Gauge("in_flight", "Requests in flight", registry=registry)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert "in_flight 1" in registry.render()
+        gauge.set(7)
+        assert "in_flight 7" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        registry = Registry()
+        histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1), registry=registry)
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_sum 5.55" in text
+        assert "latency_seconds_count 3" in text
+
+    def test_label_count_is_checked(self):
+        """Test that the wrong number of label values is rejected"""
+        counter = Counter("checked_total", "Checked", ("a", "b"), registry=Registry())
+        with pytest.raises(ValueError):
+            counter.labels("only-one")
+
+    def test_duplicate_names_are_rejected(self):
+        """Test that a metric name can only be registered once"""
+        registry = Registry()
+        Counter("dup_total", "Duplicate", registry=registry)
+        with pytest.raises(ValueError):
+            Counter("dup_total", "Duplicate", registry=registry)
+
+    def test_route_template_for_mounts(self):
+        """Test mounted apps are labelled by their mount path"""
+        scope = {"root_path": "/static", "app_root_path": ""}
+        assert route_template(scope) == "/static/{path}"
+        assert route_template({}) == "unmatched"
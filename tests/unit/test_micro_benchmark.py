@@ -0,0 +1,28 @@
+# tests/unit/test_micro_benchmark.py
+from benchmarks.micro import bench, compare
+
+
+class TestMicroBenchmark:
+    """Unit tests for the microbenchmark timer and comparison"""
+
+    def test_bench_reports_statistics(self):
+        """Test that a case is calibrated and summarised"""
+        stats = bench(lambda: sum(range(10)), rounds=3, min_time=0.001, warmup=0)
+        assert stats["rounds"] == 3
+        assert stats["loops"] >= 1
+        assert 0 < stats["min_ns"] <= stats["median_ns"]
+
+    def test_compare_flags_slower_median(self):
+        """Test that only cases beyond the threshold are reported"""
+        baseline = {"cases": {"fast": {"median_ns": 100.0}, "slow": {"median_ns": 100.0}}}
+        current = {"cases": {"fast": {"median_ns": 105.0}, "slow": {"median_ns": 150.0}}}
+
+        regressions = compare(baseline, current, threshold=0.1)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("slow: median")
+
+    def test_compare_ignores_cases_not_run(self):
+        """Test that a filtered run is not treated as a regression"""
+        baseline = {"cases": {"jwt.decode_token": {"median_ns": 100.0}}}
+        assert compare(baseline, {"cases": {}}, threshold=0.1) == []
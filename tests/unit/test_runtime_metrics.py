@@ -0,0 +1,105 @@
+# tests/unit/test_runtime_metrics.py
+import asyncio
+import gc
+import threading
+import time
+
+import anyio
+import anyio.to_thread
+
+from app import metrics, runtime_metrics
+
+
+class TestThreadpoolMetrics:
+    """Unit tests for threadpool sizing and saturation gauges"""
+
+    def test_configure_sets_capacity(self, monkeypatch):
+        """Test THREADPOOL_TOKENS is applied to the default limiter"""
+        monkeypatch.setattr(runtime_metrics, "_limiter", None)
+        async def scenario():
+            limiter = runtime_metrics.configure_threadpool(7)
+            assert anyio.to_thread.current_default_thread_limiter().total_tokens == 7
+            return limiter
+
+        asyncio.run(scenario())
+        runtime_metrics.collect()
+        assert metrics.THREADPOOL_TOKENS_TOTAL.labels().value == 7
+
+    def test_saturation_is_visible(self, monkeypatch):
+        """Test borrowed tokens and waiting calls show up while the pool is exhausted"""
+        monkeypatch.setattr(runtime_metrics, "_limiter", None)
+        release = threading.Event()
+        snapshot = {}
+
+        async def scenario():
+            runtime_metrics.configure_threadpool(2)
+            calls = [asyncio.create_task(anyio.to_thread.run_sync(release.wait)) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            runtime_metrics.collect()
+            snapshot["borrowed"] = metrics.THREADPOOL_TOKENS_BORROWED.labels().value
+            snapshot["waiting"] = metrics.THREADPOOL_TASKS_WAITING.labels().value
+            release.set()
+            await asyncio.gather(*calls)
+
+        asyncio.run(scenario())
+        assert snapshot == {"borrowed": 2, "waiting": 1}
+
+
+class TestLoopLagMonitor:
+    """Unit tests for the event-loop lag probe"""
+
+    def test_blocked_loop_records_lag(self):
+        """Test a blocking call on the loop shows up as lag"""
+        before = metrics.LOOP_LAG.labels().sum
+
+        async def scenario():
+            monitor = runtime_metrics.LoopLagMonitor(interval=0.01)
+            monitor.start()
+            await asyncio.sleep(0.02)
+            time.sleep(0.2)  # block the loop
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+        assert metrics.LOOP_LAG.labels().sum - before >= 0.15
+
+
+class TestGcMetrics:
+    """Unit tests for garbage collection pause tracking"""
+
+    def test_collection_is_recorded(self):
+        """Test a full collection records a pause and the objects it freed"""
+        runtime_metrics.install_gc_callbacks()
+        runtime_metrics.install_gc_callbacks()
+        assert gc.callbacks.count(runtime_metrics._gc_callback) == 1
+        runtime_metrics.flush_gc_stats()
+        pauses = metrics.GC_PAUSE.labels("2")
+        before_count, before_collected = pauses.count, metrics.GC_COLLECTED.labels("2").value
+
+        cycle = []
+        cycle.append(cycle)
+        del cycle
+        gc.collect()
+        runtime_metrics.flush_gc_stats()
+
+        assert pauses.count == before_count + 1
+        assert metrics.GC_COLLECTED.labels("2").value >= before_collected + 1
+
+    def test_collection_while_holding_a_metrics_lock(self):
+        """Test a collection triggered inside a metrics lock does not deadlock on the GC callback"""
+        runtime_metrics.install_gc_callbacks()
+        runtime_metrics.flush_gc_stats()
+        pauses = metrics.GC_PAUSE.labels("2")
+        before = pauses.count
+        finished = threading.Event()
+
+        def collect_under_lock():
+            with pauses._lock:
+                gc.collect()
+            finished.set()
+
+        threading.Thread(target=collect_under_lock, daemon=True).start()
+        assert finished.wait(5), "GC callback blocked on a metrics lock"
+        assert pauses.count == before
+        runtime_metrics.flush_gc_stats()
+        assert pauses.count == before + 1
@@ -0,0 +1,71 @@
+# tests/unit/test_serve.py
+import os
+
+from app import serve
+
+
+def _cgroup(tmp_path, files: dict[str, str]) -> str:
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return str(tmp_path)
+
+
+class TestCpuSizing:
+    """Unit tests for cgroup-aware worker sizing"""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        """Test cpu.max quota/period is read as a CPU count"""
+        assert serve.cgroup_cpu_limit(_cgroup(tmp_path, {"cpu.max": "150000 100000\n"})) == 1.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        """Test 'max' means no limit"""
+        assert serve.cgroup_cpu_limit(_cgroup(tmp_path, {"cpu.max": "max 100000\n"})) is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        """Test the v1 cfs quota is used when cpu.max is absent, and -1 means unlimited"""
+        root = _cgroup(tmp_path, {"cpu/cpu.cfs_quota_us": "200000", "cpu/cpu.cfs_period_us": "100000"})
+        assert serve.cgroup_cpu_limit(root) == 2.0
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1")
+        assert serve.cgroup_cpu_limit(root) is None
+
+    def test_no_cgroup(self, tmp_path):
+        """Test a missing cgroup filesystem means no limit"""
+        assert serve.cgroup_cpu_limit(str(tmp_path / "missing")) is None
+
+    def test_available_cpus_capped_by_quota(self, tmp_path, monkeypatch):
+        """Test the quota (rounded up) caps the affinity mask"""
+        monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(64)), raising=False)
+        assert serve.available_cpus(_cgroup(tmp_path, {"cpu.max": "150000 100000"})) == 2
+        assert serve.available_cpus(str(tmp_path / "missing")) == 64
+
+    def test_web_concurrency_overrides(self, tmp_path, monkeypatch):
+        """Test WEB_CONCURRENCY wins over detection"""
+        monkeypatch.setattr(serve, "WEB_CONCURRENCY", "3")
+        assert serve.default_workers(str(tmp_path)) == 3
+
+
+class TestServeArguments:
+    """Unit tests for the launcher command line"""
+
+    def test_flags_reach_uvicorn_config(self):
+        """Test tuning flags are passed through to uvicorn.Config"""
+        args = serve.parse_args([
+            "--port", "9000", "--workers", "2", "--backlog", "512", "--keep-alive", "15",
+            "--graceful-timeout", "7", "--limit-concurrency", "100", "--no-preload",
+        ])
+        config = serve.build_config(args)
+
+        assert args.workers == 2
+        assert args.preload is False
+        assert config.port == 9000
+        assert config.backlog == 512
+        assert config.timeout_keep_alive == 15
+        assert config.timeout_graceful_shutdown == 7
+        assert config.limit_concurrency == 100
+
+    def test_default_workers(self, monkeypatch):
+        """Test the worker count defaults to the detected CPUs"""
+        monkeypatch.setattr(serve, "default_workers", lambda: 5)
+        assert serve.parse_args([]).workers == 5
@@ -0,0 +1,107 @@
+# tests/unit/test_startup.py
+import asyncio
+import threading
+
+from app import metrics, security, warmup
+from app.tools import importtime
+from benchmarks.startup import check_budget
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |       2300 |     sqlalchemy.sql
+import time:      1000 |       3500 |   sqlalchemy
+import time:       200 |        200 |   jose
+some unrelated warning
+import time:      4000 |       7700 | app.main
+"""
+
+
+class TestImportTime:
+    """Unit tests for the -X importtime summary"""
+
+    def test_parse(self):
+        """Test records keep their times and nesting depth and other lines are skipped"""
+        records = importtime.parse(IMPORTTIME_OUTPUT.splitlines())
+        assert [(r.name, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+            ("_io", 120, 120, 1),
+            ("sqlalchemy.sql", 300, 2300, 2),
+            ("sqlalchemy", 1000, 3500, 1),
+            ("jose", 200, 200, 1),
+            ("app.main", 4000, 7700, 0),
+        ]
+
+    def test_summary(self):
+        """Test the total comes from the target module and packages sum their submodules"""
+        records = importtime.parse(IMPORTTIME_OUTPUT.splitlines())
+        summary = importtime.summarize(records, "app.main", top=2)
+
+        assert summary["total_ms"] == 7.7
+        assert summary["packages"] == [{"package": "app", "self_ms": 4.0}, {"package": "sqlalchemy", "self_ms": 1.3}]
+        assert [row["name"] for row in summary["modules"]] == ["app.main", "sqlalchemy"]
+        assert "import app.main: 7.7 ms, 5 modules" in importtime.format_summary(summary)
+
+    def test_budget_sets_exit_code(self, monkeypatch, capsys):
+        """Test the CLI exits 1 when the import is over budget"""
+        records = importtime.parse(IMPORTTIME_OUTPUT.splitlines())
+        monkeypatch.setattr(importtime, "measure", lambda module: records)
+
+        assert importtime.main(["--runs", "1", "--budget-ms", "10"]) == 0
+        assert importtime.main(["--runs", "1", "--budget-ms", "5"]) == 1
+        assert "over the 5 ms budget" in capsys.readouterr().err
+
+
+class TestStartupBudget:
+    """Unit tests for the cold-start benchmark's budget check"""
+
+    def test_within_budget(self):
+        """Test results under both budgets pass"""
+        result = {"import_ms": 800, "ready_ms": 1500, "lazy_loaded": []}
+        assert check_budget(result, 1000, 2000) == []
+
+    def test_over_budget_and_eager_imports(self):
+        """Test slow medians and eagerly imported lazy modules are reported"""
+        result = {"import_ms": 1200, "ready_ms": 2500, "lazy_loaded": ["jose"]}
+        failures = check_budget(result, 1000, 2000)
+        assert len(failures) == 3
+        assert failures[-1].endswith("jose")
+
+
+class TestWarmup:
+    """Unit tests for warm-up hooks and readiness"""
+
+    def test_not_ready_while_running(self):
+        """Test readiness is withheld until every hook has run"""
+        release = threading.Event()
+        seen = []
+        state = warmup.Warmup([("blocked", release.wait), ("after", lambda: seen.append(True))])
+        assert state.ready  # never started
+
+        async def scenario():
+            state.start()
+            assert not state.ready
+            release.set()
+            await state.wait()
+
+        asyncio.run(scenario())
+        assert state.ready and seen == [True]
+        assert metrics.STARTUP_PHASE.labels("warmup_blocked").value >= 0
+
+    def test_failing_hook_does_not_block_readiness(self, caplog):
+        """Test a failing hook is logged and the remaining hooks still run"""
+        seen = []
+
+        def broken():
+            raise RuntimeError("boom")
+
+        state = warmup.Warmup([("broken", broken), ("after", lambda: seen.append(True))])
+        state.run()
+
+        assert state.ready and seen == [True]
+        assert "Warm-up step broken failed" in caplog.text
+
+    def test_default_hooks_run(self):
+        """Test the built-in hooks open the pool and load hashing and JWT"""
+        warmup.Warmup().run()
+        assert security.get_pwd_context() is security.pwd_context
+        assert security.decode_token(security.create_access_token({"sub": "a@example.com"}))["sub"] == "a@example.com"
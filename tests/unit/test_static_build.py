@@ -0,0 +1,42 @@
+# tests/unit/test_static_build.py
+import gzip
+
+from app.static_assets import accepted_encodings
+from app.tools import build_static
+
+
+class TestStaticBuild:
+    """Unit tests for fingerprinting, reference rewriting and compression"""
+
+    def test_fingerprinted_name_follows_content(self):
+        """Test the hash goes before the extension and changes with the content"""
+        name = build_static.fingerprinted_name("profile.js", b"console.log(1)")
+        assert name.startswith("profile.") and name.endswith(".js")
+        assert len(name.split(".")[1]) == build_static.HASH_LENGTH
+        assert name == build_static.fingerprinted_name("profile.js", b"console.log(1)")
+        assert name != build_static.fingerprinted_name("profile.js", b"console.log(2)")
+
+    def test_rewrite_references(self):
+        """Test only exact /static/<asset> references are rewritten"""
+        html = ('<script src="/static/profile.js"></script>'
+                '<a href="/static/profile.html">'
+                '<script src="/static/profile.json"></script>'
+                '<script src="/vendor/profile.js"></script>')
+        rewritten = build_static.rewrite_references(html, {"profile.js": "profile.abc.js"})
+        assert rewritten == ('<script src="/static/profile.abc.js"></script>'
+                             '<a href="/static/profile.html">'
+                             '<script src="/static/profile.json"></script>'
+                             '<script src="/vendor/profile.js"></script>')
+
+    def test_compressed_variants_only_when_smaller(self):
+        """Test variants decompress to the input and are dropped when they do not help"""
+        data = b"<p>hello</p>" * 200
+        variants = build_static.compressed_variants(data)
+        assert gzip.decompress(variants[".gz"]) == data
+        assert build_static.compressed_variants(b"x") == {}
+
+    def test_accepted_encodings(self):
+        """Test Accept-Encoding parsing honours q=0"""
+        assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+        assert accepted_encodings("") == set()